@@ -3,6 +3,10 @@ Cold Chain Failure Prediction - Interactive Demo
 Streamlit web application for visualizing predictions
 """
 
+import os
+import sys
+sys.path.append('src')
+
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -11,6 +15,12 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 
+from admin_boundaries import CountyAssigner
+from facility_store import FacilityStore
+from rule_dsl import load_rules
+from dashboard_stats import FAILURE_COLUMNS, filter_facilities, failure_stats, daily_failures
+from refresh_daemon import read_status
+
 # Page configuration
 st.set_page_config(
     page_title="Cold Chain Failure Prediction",
@@ -56,31 +66,53 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Load data
-@st.cache_data
-def load_data():
-    """Load the processed dataset"""
-    df = pd.read_csv('data/processed/facilities_with_daily_weather_and_targets.csv')
+CSV_PATH = 'data/processed/facilities_with_daily_weather_and_targets.csv'
+STORE_PATH = 'data/processed/facilities_store.parquet'
+
+def data_version():
+    """Modification times of the processed files (the refresh daemon swaps them in atomically)"""
+    return tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in (CSV_PATH, STORE_PATH))
+
+# Load data (cached per data version, so a refreshed dataset shows up on the next rerun)
+@st.cache_data(max_entries=1)
+def load_data(version):
+    """Load the processed dataset (compact store if the pipeline wrote one)"""
+    csv_path, store_path = CSV_PATH, STORE_PATH
+
+    if os.path.exists(store_path) and os.path.getmtime(store_path) >= os.path.getmtime(csv_path):
+        df = FacilityStore.load(store_path).to_frame()
+    else:
+        df = pd.read_csv(csv_path)
+    df['region'] = assign_regions(df)
     return df
 
+def assign_regions(df):
+    """
+    Region per facility: county from local boundary polygons when available
+    (see src/admin_boundaries.py), otherwise the code in the facility_id
+    """
+    id_codes = df['facility_id'].str.split('_').str[1]
+
+    if 'county' in df.columns:
+        return df['county'].fillna(id_codes)
+
+    try:
+        return CountyAssigner().assign(df)['county'].fillna(id_codes)
+    except FileNotFoundError:
+        return id_codes
+
+# Risk tiers come from the rule file (config/cold_chain_rules.yaml)
+risk_rules = load_rules()
+
 # Calculate risk levels
 def get_risk_level(failure_count):
     """Convert failure count to risk level"""
-    if failure_count >= 3:
-        return "HIGH", "risk-high"
-    elif failure_count >= 1:
-        return "MEDIUM", "risk-medium"
-    else:
-        return "LOW", "risk-low"
+    tier = risk_rules.risk_tier(failure_count)
+    return tier['level'], tier['css']
 
 def get_risk_color(failure_count):
     """Get color for risk level"""
-    if failure_count >= 3:
-        return "#d62728"  # Red
-    elif failure_count >= 1:
-        return "#ff7f0e"  # Orange
-    else:
-        return "#2ca02c"  # Green
+    return risk_rules.risk_tier(failure_count)['color']
 
 # Main app
 def main():
@@ -90,7 +122,7 @@ def main():
 
     # Load data
     try:
-        df = load_data()
+        df = load_data(data_version())
     except FileNotFoundError:
         st.error("⚠️ Data file not found. Please run `python3 run_mvp.py` first to generate data.")
         return
@@ -98,8 +130,13 @@ def main():
     # Sidebar
     st.sidebar.title("🔍 Filters & Settings")
 
+    status = read_status()
+    if status and status.get('last_success'):
+        st.sidebar.caption(f"🔄 Data refreshed {status['last_success']} "
+                           f"(next: {status.get('next_run') or 'not scheduled'})")
+
     # Region filter
-    regions = df['facility_id'].str.split('_').str[1].unique()
+    regions = df['region'].unique()
     region_names = {
         'NRB': 'Nairobi',
         'TUR': 'Turkana',
@@ -118,32 +155,19 @@ def main():
     # Power source filter
     power_sources = st.sidebar.multiselect(
         "Power Source",
-        options=df['power_source'].unique(),
-        default=df['power_source'].unique()
+        options=df['power_source'].unique().tolist(),
+        default=df['power_source'].unique().tolist()
     )
 
     # Risk level filter
     risk_filter = st.sidebar.multiselect(
         "Risk Level",
-        options=['HIGH', 'MEDIUM', 'LOW'],
-        default=['HIGH', 'MEDIUM', 'LOW']
+        options=[t['level'] for t in risk_rules.risk_tiers],
+        default=[t['level'] for t in risk_rules.risk_tiers]
     )
 
-    # Filter data
-    df['region'] = df['facility_id'].str.split('_').str[1]
-    df_filtered = df[
-        (df['region'].isin(selected_regions)) &
-        (df['power_source'].isin(power_sources))
-    ].copy()
-
-    # Calculate total failures per facility
-    failure_cols = [f'failure_day{i}' for i in range(1, 6)]
-    df_filtered['total_failures'] = df_filtered[failure_cols].sum(axis=1)
-    df_filtered['risk_level'] = df_filtered['total_failures'].apply(lambda x: get_risk_level(x)[0])
-    df_filtered['risk_color'] = df_filtered['total_failures'].apply(get_risk_color)
-
-    # Apply risk filter
-    df_filtered = df_filtered[df_filtered['risk_level'].isin(risk_filter)]
+    # Filter data, then total failures and risk tier per facility
+    df_filtered = filter_facilities(df, selected_regions, power_sources, risk_filter, risk_rules)
 
     # Overall Statistics
     st.markdown("---")
@@ -153,7 +177,7 @@ def main():
         st.metric("Total Facilities", len(df_filtered))
 
     with col2:
-        high_risk = len(df_filtered[df_filtered['total_failures'] >= 3])
+        high_risk = int((df_filtered['risk_level'] == risk_rules.risk_tiers[0]['level']).sum())
         st.metric("High Risk Facilities", high_risk, delta=f"{high_risk/len(df_filtered)*100:.1f}%")
 
     with col3:
@@ -161,7 +185,7 @@ def main():
         st.metric("Avg Failures (5 days)", f"{avg_failures:.1f}")
 
     with col4:
-        failure_rate = df_filtered[failure_cols].sum().sum() / (len(df_filtered) * 5) * 100
+        failure_rate = df_filtered[FAILURE_COLUMNS].sum().sum() / (len(df_filtered) * 5) * 100
         st.metric("Overall Failure Rate", f"{failure_rate:.1f}%")
 
     st.markdown("---")
@@ -213,14 +237,10 @@ def main():
 
         # Risk summary by region
         st.subheader("Risk by Region")
-        region_stats = df_filtered.groupby('region').agg({
-            'total_failures': 'mean',
-            'facility_id': 'count',
-            'electrification_rate': 'mean',
-            'grid_reliability_score': 'mean'
-        }).round(2)
+        region_stats = failure_stats(df_filtered, 'region',
+                                     ['electrification_rate', 'grid_reliability_score']).round(2)
         region_stats.columns = ['Avg Failures', 'Facilities', 'Avg Electrification %', 'Avg Grid Reliability']
-        region_stats.index = region_stats.index.map(region_names)
+        region_stats.index = region_stats.index.map(lambda r: region_names.get(r, r))
 
         st.dataframe(region_stats, use_container_width=True)
 
@@ -352,10 +372,7 @@ def main():
                 labels=['Low (<60%)', 'Medium (60-80%)', 'High (>80%)']
             )
 
-            reliability_stats = df_filtered.groupby('reliability_category', observed=True).agg({
-                'total_failures': 'mean',
-                'facility_id': 'count'
-            }).reset_index()
+            reliability_stats = failure_stats(df_filtered, 'reliability_category').reset_index()
             reliability_stats.columns = ['Category', 'Avg Failures', 'Facilities']
 
             fig_reliability = px.bar(
@@ -381,10 +398,7 @@ def main():
                 labels=['Low (<40%)', 'Medium (40-70%)', 'High (>70%)']
             )
 
-            elec_stats = df_filtered.groupby('elec_category', observed=True).agg({
-                'total_failures': 'mean',
-                'facility_id': 'count'
-            }).reset_index()
+            elec_stats = failure_stats(df_filtered, 'elec_category').reset_index()
             elec_stats.columns = ['Category', 'Avg Failures', 'Facilities']
 
             fig_elec = px.bar(
@@ -426,7 +440,7 @@ def main():
             nbins=20,
             title='Facilities by Power Vulnerability (0=Best, 100=Worst)',
             labels={'power_vulnerability_score': 'Vulnerability Score'},
-            color_discrete_map={'LOW': 'green', 'MEDIUM': 'orange', 'HIGH': 'red'}
+            color_discrete_map={t['level']: t['color'] for t in risk_rules.risk_tiers}
         )
         fig_vuln.update_layout(height=400)
         st.plotly_chart(fig_vuln, use_container_width=True)
@@ -438,16 +452,7 @@ def main():
         # Failure distribution by day
         st.markdown("#### Failure Distribution by Day")
 
-        daily_failures = []
-        for day in range(1, 6):
-            count = df_filtered[f'failure_day{day}'].sum()
-            daily_failures.append({
-                'Day': f'Day {day}',
-                'Failures': count,
-                'Percentage': count / len(df_filtered) * 100
-            })
-
-        df_daily = pd.DataFrame(daily_failures)
+        df_daily = daily_failures(df_filtered)
 
         fig_daily = go.Figure()
         fig_daily.add_trace(go.Bar(
@@ -471,10 +476,7 @@ def main():
             # Failure by power source
             st.markdown("#### Failures by Power Source")
 
-            power_stats = df_filtered.groupby('power_source').agg({
-                'total_failures': 'mean',
-                'facility_id': 'count'
-            }).reset_index()
+            power_stats = failure_stats(df_filtered, 'power_source').reset_index()
             power_stats.columns = ['Power Source', 'Avg Failures', 'Facilities']
 
             fig_power = px.bar(
@@ -492,10 +494,7 @@ def main():
             # Failure by facility type
             st.markdown("#### Failures by Facility Type")
 
-            facility_stats = df_filtered.groupby('facility_type').agg({
-                'total_failures': 'mean',
-                'facility_id': 'count'
-            }).reset_index()
+            facility_stats = failure_stats(df_filtered, 'facility_type').reset_index()
             facility_stats.columns = ['Facility Type', 'Avg Failures', 'Facilities']
 
             fig_facility = px.bar(
@@ -0,0 +1,91 @@
+"""
+Facility Mapping Benchmark
+Row-wise vs vectorized facility-type mapping and power-source estimation
+
+Usage:
+    python benchmarks/bench_facility_mapping.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+import pandas as pd
+
+from facility_data_loader import KenyaFacilityLoader
+
+# Amenity strings as they appear in Healthsites / OSM tags, including case
+# variants, combinations and missing values
+AMENITIES = ['hospital', 'clinic', 'health centre', 'Health Center', 'dispensary', 'pharmacy',
+             'chemist', 'doctors', 'dentist', 'Hospital;clinic', 'community health post',
+             'maternity home', 'laboratory', '', None]
+
+
+def random_amenities(n: int, seed: int = 42) -> pd.Series:
+    """Amenity column with a realistic mix of values"""
+    rng = np.random.default_rng(seed)
+    return pd.Series(np.array(AMENITIES, dtype=object)[rng.integers(len(AMENITIES), size=n)], name='amenity')
+
+
+def rowwise_facility_types(loader: KenyaFacilityLoader, amenities: pd.Series) -> pd.Series:
+    """Reference implementation: one _map_facility_type call per row"""
+    return amenities.map(lambda a: loader._map_facility_type(a if isinstance(a, str) else ''))
+
+
+def rowwise_power_source(df: pd.DataFrame) -> pd.Series:
+    """Reference implementation: the original per-row heuristic"""
+    def estimate_power_source(row):
+        facility_type = row.get('facility_type', 'Unknown')
+        if facility_type == 'Hospital':
+            return 'Grid'
+        elif facility_type in ['Clinic', 'Dispensary']:
+            return 'Solar'
+        elif facility_type == 'Health Center':
+            return 'Diesel'
+        else:
+            return 'None'
+
+    return df.apply(estimate_power_source, axis=1)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Facility mapping benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    loader = KenyaFacilityLoader(transport=object())
+
+    print(f"{'rows':>10} | {'type: rowwise':>14} {'vectorized':>11} {'speedup':>8} | "
+          f"{'power: rowwise':>15} {'vectorized':>11} {'speedup':>8}")
+    print("-" * 92)
+
+    for n in args.sizes:
+        amenities = random_amenities(n)
+
+        # Facility type: one _map_facility_type call per row vs per distinct amenity
+        rowwise_types, t_type_row = timed(rowwise_facility_types, loader, amenities)
+        vector_types, t_type_vec = timed(loader.map_facility_types, amenities)
+        assert (vector_types.astype(object) == rowwise_types).all(), "facility type mismatch"
+
+        # Power source: row-wise apply vs factorized lookup
+        facilities = pd.DataFrame({'facility_type': rowwise_types})
+        rowwise_power, t_power_row = timed(rowwise_power_source, facilities)
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            vector_power, t_power_vec = timed(loader.add_power_source_estimates, facilities)
+        assert (vector_power['power_source'] == rowwise_power).all(), "power source mismatch"
+
+        print(f"{n:>10,} | {t_type_row:>13.3f}s {t_type_vec:>10.3f}s {t_type_row / t_type_vec:>7.0f}x | "
+              f"{t_power_row:>14.3f}s {t_power_vec:>10.3f}s {t_power_row / t_power_vec:>7.0f}x")
+
+    print("\n✓ Vectorized labels identical to row-wise at every size")
@@ -0,0 +1,114 @@
+"""
+Failure Label Benchmark
+Row-wise predict_failure_per_day vs the vectorized FailureLabelEngine, with a label parity check
+
+The default rules in config/cold_chain_rules.yaml must label exactly like
+the row-wise reference; this exits non-zero on the first mismatch, so
+edits to either side that drift apart are caught.
+
+Usage:
+    python benchmarks/bench_failure_labels.py --sizes 20000 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+import pandas as pd
+
+from failure_labels import FailureLabelEngine
+from feature_engineering import predict_failure_per_day
+from run_length import rolling_mean
+
+DAYS = 5
+
+# Row-wise labelling is timed on at most this many rows and projected to the full size;
+# parity is checked on the same rows
+ROWWISE_ROWS = 20_000
+
+# Values the rules compare against, so both sides see every threshold boundary
+TEMP_THRESHOLDS = [30, 32, 33, 35, 38, 40]
+CLOUD_THRESHOLDS = [60, 65, 70]
+RELIABILITY_THRESHOLDS = [0.6, 0.7, 0.75]
+ELECTRIFICATION_THRESHOLDS = [30, 40]
+DISTANCE_THRESHOLDS = [30, 50]
+
+POWER_SOURCES = np.array(['Grid', 'Solar', 'Diesel', 'None', 'Unknown', None], dtype=object)
+
+
+def with_edges(rng, values: np.ndarray, edges: list, missing: float = 0.05) -> np.ndarray:
+    """Replace ~20% of values with exact thresholds and a few with NaN"""
+    values = values.astype(float)
+    at_edge = rng.random(values.shape) < 0.2
+    values[at_edge] = rng.choice(edges, at_edge.sum())
+    values[rng.random(values.shape) < missing] = np.nan
+    return values
+
+
+def random_dataset(n: int, seed: int = 42) -> pd.DataFrame:
+    """Weather and power features covering every rule branch, boundaries and missing values"""
+    rng = np.random.default_rng(seed)
+    temps = with_edges(rng, rng.uniform(25, 43, (n, DAYS)).round(1), TEMP_THRESHOLDS)
+    clouds = with_edges(rng, rng.uniform(0, 100, (n, DAYS)).round(), CLOUD_THRESHOLDS)
+
+    df = pd.DataFrame({
+        'power_source': POWER_SOURCES[rng.choice(len(POWER_SOURCES), n, p=[.3, .3, .2, .15, .03, .02])],
+        'grid_reliability_score': with_edges(rng, rng.uniform(0.3, 1.0, n).round(2), RELIABILITY_THRESHOLDS),
+        'electrification_rate': with_edges(rng, rng.uniform(10, 100, n).round(1), ELECTRIFICATION_THRESHOLDS),
+        'distance_to_grid_km': with_edges(rng, rng.uniform(0, 80, n).round(1), DISTANCE_THRESHOLDS),
+        'heat_wave_indicator': with_edges(rng, rng.integers(0, 2, n), [0, 1])
+    })
+    for day in range(1, DAYS + 1):
+        df[f'temp_max_day{day}'] = temps[:, day - 1]
+        df[f'clouds_day{day}'] = clouds[:, day - 1]
+    return df
+
+
+def rowwise_labels(df: pd.DataFrame) -> np.ndarray:
+    """Reference implementation: one predict_failure_per_day call per row"""
+    clouds = rolling_mean(df[[f'clouds_day{day}' for day in range(1, DAYS + 1)]].to_numpy(), 3)
+    temps = rolling_mean(df[[f'temp_max_day{day}' for day in range(1, DAYS + 1)]].to_numpy(), 3)
+    return np.array([predict_failure_per_day(row, clouds[i], temps[i])
+                     for i, (_, row) in enumerate(df.iterrows())])
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Failure label benchmark and parity check")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20_000, 1_000_000])
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    engine = FailureLabelEngine(days=DAYS)
+
+    print(f"{'rows':>10} | {'rowwise':>10} {'projected':>10} {'vectorized':>11} {'speedup':>8} | {'failures':>9}")
+    print("-" * 72)
+
+    for n in args.sizes:
+        df = random_dataset(n, args.seed)
+
+        vector_labels, t_vec = timed(engine.compute, df)
+        sample = df.iloc[:ROWWISE_ROWS]
+        rowwise, t_row = timed(rowwise_labels, sample)
+
+        mismatch = np.flatnonzero((vector_labels.to_numpy()[:len(sample)] != rowwise).any(axis=1))
+        assert not len(mismatch), (
+            f"failure label mismatch on {len(mismatch)} rows (rules {engine.rules.version}), first:\n"
+            f"{sample.iloc[mismatch[0]].to_dict()}\n"
+            f"engine {vector_labels.iloc[mismatch[0]].tolist()} vs rowwise {rowwise[mismatch[0]].tolist()}"
+        )
+
+        projected = t_row / len(sample) * n
+        print(f"{n:>10,} | {t_row:>9.3f}s {projected:>9.3f}s {t_vec:>10.3f}s {projected / t_vec:>7.0f}x | "
+              f"{int(vector_labels.to_numpy().sum()):>9,}")
+
+    print(f"\n✓ FailureLabelEngine labels identical to predict_failure_per_day (rules {engine.rules.version})")
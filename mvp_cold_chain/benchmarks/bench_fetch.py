@@ -0,0 +1,73 @@
+"""
+Offline Fetch Load Test
+Benchmarks ForecastFetcher against the local API stand-in
+
+Usage:
+    python benchmarks/bench_fetch.py --facilities 10000 --latency-ms 80 --rate 500
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+import pandas as pd
+
+from mock_api_server import MockAPIServer, KENYA_BBOX
+
+
+def random_facilities(n: int, seed: int = 42) -> pd.DataFrame:
+    """Uniformly scattered facilities inside Kenya"""
+    rng = np.random.default_rng(seed)
+    lat_min, lat_max, lon_min, lon_max = KENYA_BBOX
+    return pd.DataFrame({
+        'facility_id': [f'KE_LT_{i:06d}' for i in range(n)],
+        'name': [f'Load Test Facility {i + 1}' for i in range(n)],
+        'latitude': rng.uniform(lat_min, lat_max, n),
+        'longitude': rng.uniform(lon_min, lon_max, n),
+        'facility_type': rng.choice(['Hospital', 'Health Center', 'Clinic', 'Dispensary'], n),
+        'power_source': rng.choice(['Grid', 'Solar', 'Diesel', 'None'], n)
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline forecast fetch benchmark")
+    parser.add_argument('--facilities', type=int, default=10000)
+    parser.add_argument('--latency-ms', type=float, default=80.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--server-rate-limit', type=float, default=None)
+    parser.add_argument('--rate', type=float, default=500.0, help="client calls/second")
+    parser.add_argument('--workers', type=int, default=64)
+    parser.add_argument('--grid-deg', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockAPIServer(port=0, latency_ms=args.latency_ms, error_rate=args.error_rate,
+                           rate_limit=args.server_rate_limit).start()
+    os.environ['OPENWEATHER_API_ROOT'] = server.url
+
+    # Imported after OPENWEATHER_API_ROOT is set
+    from forecast_fetcher import ForecastFetcher
+    from http_transport import HttpTransport
+    from spatial_grid import GridPlanner
+    from weather_api_v2 import WeatherAPI
+
+    facilities = random_facilities(args.facilities)
+    weather_api = WeatherAPI(api_key='offline', use_cache=False,
+                             transport=HttpTransport(pool_size=args.workers, backoff_factor=0.05))
+    fetcher = ForecastFetcher(weather_api, calls_per_second=args.rate, calls_per_day=None,
+                              max_workers=args.workers)
+    planner = GridPlanner(args.grid_deg) if args.grid_deg > 0 else None
+
+    start = time.perf_counter()
+    weather_data, failed = fetcher.fetch(facilities, days=5, planner=planner)
+    elapsed = time.perf_counter() - start
+
+    print(f"\nFacilities: {args.facilities}  fetched: {len(weather_data)}  failed: {len(failed)}")
+    print(f"Wall time: {elapsed:.1f}s  ({args.facilities / elapsed:.0f} facilities/s)")
+    print(f"Server: {server.counts}")
+    weather_api.transport.print_metrics()
+
+    server.stop()
@@ -0,0 +1,339 @@
+"""
+Benchmark Suite
+Offline timings of the forecast parsing, feature, labelling and dashboard hot paths at several facility counts
+
+Results are written as JSON (one file per run) so runs on different
+commits can be compared; --compare exits non-zero when a benchmark is
+slower than the baseline by more than --threshold.
+
+Usage:
+    python benchmarks/bench_suite.py --sizes 50 10000 1000000
+    python benchmarks/bench_suite.py --only parse_forecast_to_daily failure_label_frame --sizes 10000
+    python benchmarks/bench_suite.py --compare benchmarks/results/<baseline>.json
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, '..', 'src'))
+
+import numpy as np
+import pandas as pd
+
+from dashboard_stats import filter_facilities, failure_stats, daily_failures
+from facility_data_loader import KenyaFacilityLoader
+from feature_engineering import (POWER_COLUMNS, estimate_power_features, power_feature_frame,
+                                 predict_failure_per_day, failure_label_frame)
+from failure_labels import FailureLabelEngine
+from forecast_cache import ForecastCache
+from forecast_parser import BatchForecastParser
+from mock_api_server import KENYA_BBOX, synthetic_forecast
+from run_length import detect_runs, rolling_mean
+from weather_api_v2 import WeatherAPI
+
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# Fixed issuance time so every run parses the same payloads
+ISSUED_AT = 1_700_000_000
+
+# Distinct forecast payloads; larger sizes reuse them (the parse cost is per payload)
+PAYLOAD_POOL = 2000
+
+# Row-wise reference functions are timed on at most this many calls and
+# projected to the full size
+SAMPLE_CALLS = 2000
+
+# Batch forecast parsing runs in chunks, as the streaming pipeline does
+PARSE_CHUNK = 50_000
+
+REGIONS = ['NRB', 'MBA', 'KIS', 'NKU', 'ELD', 'GAR', 'TUR', 'MRU']
+FACILITY_TYPES = ['Hospital', 'Health Center', 'Clinic', 'Dispensary']
+POWER_SOURCES = ['Grid', 'Solar', 'Diesel', 'None']
+
+
+class SyntheticData:
+    """Seeded facilities, forecast payloads and model datasets, built once per size"""
+
+    def __init__(self, seed: int = 42):
+        self.seed = seed
+
+    @functools.lru_cache(maxsize=None)
+    def payload_pool(self) -> list:
+        rng = np.random.default_rng(self.seed)
+        lat_min, lat_max, lon_min, lon_max = KENYA_BBOX
+        return [synthetic_forecast(lat, lon, now=ISSUED_AT)
+                for lat, lon in zip(rng.uniform(lat_min, lat_max, PAYLOAD_POOL).round(2),
+                                    rng.uniform(lon_min, lon_max, PAYLOAD_POOL).round(2))]
+
+    def payloads(self, n: int) -> list:
+        pool = self.payload_pool()
+        return [pool[i % len(pool)] for i in range(n)]
+
+    @functools.lru_cache(maxsize=None)
+    def pool_features(self) -> pd.DataFrame:
+        return BatchForecastParser().features(self.payload_pool()).reset_index(drop=True)
+
+    @functools.lru_cache(maxsize=None)
+    def facilities(self, n: int) -> pd.DataFrame:
+        """Facility list; about 2% are near-duplicates a few metres from another row"""
+        rng = np.random.default_rng(self.seed + n)
+        lat_min, lat_max, lon_min, lon_max = KENYA_BBOX
+        regions = rng.choice(REGIONS, n)
+        lat, lon = rng.uniform(lat_min, lat_max, n), rng.uniform(lon_min, lon_max, n)
+
+        dupes = rng.random(n) < 0.02
+        source = rng.integers(0, n, n)
+        lat[dupes] = lat[source[dupes]] + rng.normal(0, 1e-4, dupes.sum())
+        lon[dupes] = lon[source[dupes]] + rng.normal(0, 1e-4, dupes.sum())
+
+        return pd.DataFrame({
+            'facility_id': [f'KE_{r}_{i:07d}' for r, i in zip(regions, range(n))],
+            'name': [f'Benchmark Facility {i + 1}' for i in range(n)],
+            'latitude': lat,
+            'longitude': lon,
+            'facility_type': rng.choice(FACILITY_TYPES, n),
+            'power_source': rng.choice(POWER_SOURCES, n),
+            'completeness': rng.integers(1, 6, n)
+        })
+
+    @functools.lru_cache(maxsize=None)
+    def dataset(self, n: int) -> pd.DataFrame:
+        """Model dataset: facilities, weather features, power features and labels"""
+        facilities = self.facilities(n).drop(columns='completeness')
+        weather = self.pool_features()
+        weather = weather.iloc[np.arange(n) % len(weather)].reset_index(drop=True)
+
+        df = pd.concat([facilities, weather], axis=1)
+        df = pd.concat([df, power_feature_frame(df, seed=self.seed)], axis=1)
+        df = pd.concat([df, failure_label_frame(df)], axis=1)
+        df['facility_name'] = df['name']
+        df['region'] = df['facility_id'].str.split('_').str[1]
+        return df
+
+
+# ============================================================================
+# BENCHMARKS: setup(data, n) → (callable to time, number of calls it makes)
+# 'full' benchmarks process all n facilities; 'sampled' ones time up to
+# SAMPLE_CALLS per-facility calls and are projected to n
+# ============================================================================
+BENCHMARKS = {}
+
+
+def benchmark(name: str, mode: str = 'full'):
+    def register(setup):
+        BENCHMARKS[name] = {'mode': mode, 'setup': setup}
+        return setup
+    return register
+
+
+def offline_api(**kwargs) -> WeatherAPI:
+    return WeatherAPI(api_key='offline', **kwargs)
+
+
+@benchmark('parse_forecast_to_daily', mode='sampled')
+def setup_parse(data, n):
+    api, payloads = offline_api(use_cache=False), data.payloads(min(n, SAMPLE_CALLS))
+    return lambda: [api.parse_forecast_to_daily(p) for p in payloads], len(payloads)
+
+
+@benchmark('get_forecast_features', mode='sampled')
+def setup_forecast_features(data, n):
+    # Warm forecast cache (no network): cache read + parse per facility
+    payloads = data.payloads(min(n, SAMPLE_CALLS))
+    cache = ForecastCache(path=os.path.join(tempfile.mkdtemp(prefix='bench-'), 'forecast_cache.sqlite'),
+                          ttl_seconds=10 ** 9, max_entries=PAYLOAD_POOL * 2)
+    coords = [(p['city']['coord']['lat'], p['city']['coord']['lon']) for p in payloads]
+    for (lat, lon), payload in zip(coords, payloads):
+        cache.put('forecast', lat, lon, payload)
+    api = offline_api(cache=cache)
+    return lambda: [api.get_forecast_features(lat, lon) for lat, lon in coords], len(coords)
+
+
+@benchmark('batch_forecast_features')
+def setup_batch_parse(data, n):
+    parser, payloads = BatchForecastParser(), data.payloads(n)
+    return lambda: [parser.features(payloads[i:i + PARSE_CHUNK]) for i in range(0, n, PARSE_CHUNK)], n
+
+
+@benchmark('_detect_heat_wave', mode='sampled')
+def setup_heat_wave(data, n):
+    api = offline_api(use_cache=False)
+    frames = [api.parse_forecast_to_daily(p) for p in data.payloads(min(n, SAMPLE_CALLS))]
+    return lambda: [api._detect_heat_wave(df) for df in frames], len(frames)
+
+
+@benchmark('heat_wave_batch')
+def setup_heat_wave_batch(data, n):
+    temp_max = data.dataset(n)[[f'temp_max_day{day}' for day in range(1, 6)]].to_numpy()
+    return lambda: detect_runs(temp_max, 35.0, 3), n
+
+
+@benchmark('estimate_power_features', mode='sampled')
+def setup_power_rowwise(data, n):
+    rows = [row for _, row in data.dataset(n).iloc[:SAMPLE_CALLS].iterrows()]
+    np.random.seed(data.seed)
+    return lambda: [estimate_power_features(row) for row in rows], len(rows)
+
+
+@benchmark('power_feature_frame')
+def setup_power(data, n):
+    df = data.dataset(n).drop(columns=POWER_COLUMNS)
+    return lambda: power_feature_frame(df, seed=data.seed), n
+
+
+@benchmark('predict_failure_per_day', mode='sampled')
+def setup_labels_rowwise(data, n):
+    df = data.dataset(n).iloc[:SAMPLE_CALLS]
+    clouds = rolling_mean(df[[f'clouds_day{day}' for day in range(1, 6)]].to_numpy(), 3)
+    temps = rolling_mean(df[[f'temp_max_day{day}' for day in range(1, 6)]].to_numpy(), 3)
+    rows = [row for _, row in df.iterrows()]
+    return lambda: [predict_failure_per_day(row, clouds[i], temps[i]) for i, row in enumerate(rows)], len(rows)
+
+
+@benchmark('failure_label_frame')
+def setup_labels(data, n):
+    df, engine = data.dataset(n), FailureLabelEngine()
+    return lambda: failure_label_frame(df, engine), n
+
+
+@benchmark('prepare_for_model')
+def setup_prepare(data, n):
+    loader, df = KenyaFacilityLoader(transport=object()), data.facilities(n)
+
+    def run():
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            return loader.prepare_for_model(df)
+    return run, n
+
+
+@benchmark('dashboard_filter')
+def setup_dashboard_filter(data, n):
+    df, rules = data.dataset(n), FailureLabelEngine().rules
+    regions, levels = REGIONS[:-1], [t['level'] for t in rules.risk_tiers]
+    return lambda: filter_facilities(df, regions, POWER_SOURCES, levels, rules), n
+
+
+@benchmark('dashboard_groupby')
+def setup_dashboard_groupby(data, n):
+    rules = FailureLabelEngine().rules
+    df = filter_facilities(data.dataset(n), REGIONS, POWER_SOURCES, [t['level'] for t in rules.risk_tiers], rules)
+
+    def run():
+        stats = [failure_stats(df, 'region', ['electrification_rate', 'grid_reliability_score'])]
+        stats += [failure_stats(df, by) for by in ['power_source', 'facility_type']]
+        stats.append(failure_stats(df.assign(reliability_category=pd.cut(
+            df['grid_reliability_score'], bins=[0, 0.6, 0.8, 1.0])), 'reliability_category'))
+        stats.append(daily_failures(df))
+        return stats
+    return run, n
+
+
+# ============================================================================
+# RUNNER
+# ============================================================================
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=BENCH_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(name: str, data: SyntheticData, n: int, repeat: int) -> dict:
+    spec = BENCHMARKS[name]
+    func, calls = spec['setup'](data, n)
+    if calls <= SAMPLE_CALLS:
+        func()  # warm-up (first-call caches); negligible next to large full-size runs
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    median = float(np.median(times))
+    return {
+        'benchmark': name, 'size': n, 'mode': spec['mode'], 'calls': calls, 'repeat': repeat,
+        'min_seconds': round(min(times), 6), 'median_seconds': round(median, 6),
+        'per_facility_us': round(median / calls * 1e6, 3),
+        # Sampled benchmarks: the time the full size would take
+        'projected_seconds': round(median / calls * n, 4)
+    }
+
+
+def compare(results: list, baseline_path: str, threshold: float) -> list:
+    """Print per-facility time ratios against a baseline run; return regressions"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r['benchmark'], r['size']): r['per_facility_us'] for r in baseline['results']}
+
+    print(f"\nCompared with {baseline.get('commit') or os.path.basename(baseline_path)} "
+          f"(regression > {threshold:.2f}x):")
+    regressions = []
+    for r in results:
+        base = before.get((r['benchmark'], r['size']))
+        if not base:
+            continue
+        ratio = r['per_facility_us'] / base
+        flag = ''
+        if ratio > threshold:
+            flag = '  ⚠️  REGRESSION'
+            regressions.append({**r, 'ratio': ratio})
+        print(f"  {r['benchmark']:<26} {r['size']:>10,} {ratio:>7.2f}x{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmark suite")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 10_000, 1_000_000])
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="results JSON (default: benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument('--compare', metavar='BASELINE', help="results JSON of an earlier run")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="per-facility slowdown vs the baseline that counts as a regression")
+    args = parser.parse_args()
+
+    data = SyntheticData(args.seed)
+    names = args.only or list(BENCHMARKS)
+    commit = git_commit()
+
+    print(f"{'benchmark':<26} {'size':>10} {'mode':>8} {'median':>10} {'per facility':>13} {'projected':>10}")
+    print("-" * 82)
+
+    results = []
+    for n in args.sizes:
+        for name in names:
+            result = run_benchmark(name, data, n, args.repeat)
+            results.append(result)
+            print(f"{name:<26} {n:>10,} {result['mode']:>8} {result['median_seconds']:>9.4f}s "
+                  f"{result['per_facility_us']:>11.2f}µs {result['projected_seconds']:>9.3f}s")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'commit': commit, 'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+            'machine': platform.machine(), 'cpu_count': os.cpu_count(),
+            'seed': args.seed, 'sample_calls': SAMPLE_CALLS, 'results': results
+        }, f, indent=2)
+    print(f"\n✓ Results: {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
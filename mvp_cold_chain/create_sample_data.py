@@ -1,85 +1,57 @@
 """
 Create sample Kenya facility data for MVP testing
+Seeded synthetic facilities (and optionally 3-hourly forecasts) from config/sample_regions.yaml
+
+Usage:
+    python create_sample_data.py
+    python create_sample_data.py --facilities 2000000 --output data/synthetic/facilities.parquet \\
+        --forecasts data/synthetic/forecasts.parquet
 """
 
-import pandas as pd
-import numpy as np
+import sys
+sys.path.append('src')
+
+import argparse
 import os
 
-# Create sample facilities across Kenya
-# Using real Kenya coordinates but fictional facility names
+from synthetic_data import SyntheticGenerator, load_regions
+
+OUTPUT_PATH = 'data/raw/kenya_facilities_sample.csv'
 
-facilities = []
 
-# Nairobi region (capital, more infrastructure)
-for i in range(10):
-    facilities.append({
-        'facility_id': f'KE_NRB_{i:03d}',
-        'name': f'Nairobi Health Center {i+1}',
-        'latitude': -1.2921 + np.random.uniform(-0.3, 0.3),
-        'longitude': 36.8219 + np.random.uniform(-0.3, 0.3),
-        'facility_type': np.random.choice(['Hospital', 'Health Center', 'Clinic'], p=[0.2, 0.5, 0.3]),
-        'power_source': np.random.choice(['Grid', 'Solar', 'Diesel'], p=[0.7, 0.2, 0.1])
-    })
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic facility and forecast data")
+    parser.add_argument('--facilities', type=int, default=50, help="number of facilities")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="facility file (.csv or .parquet)")
+    parser.add_argument('--forecasts', metavar='PATH',
+                        help="also write 3-hourly forecast rows (.csv or .parquet), 40 per facility")
+    parser.add_argument('--regions', default=os.getenv('SAMPLE_REGIONS_PATH'),
+                        help="region config (default: config/sample_regions.yaml)")
+    parser.add_argument('--seed', type=int, default=int(os.getenv('SAMPLE_SEED', 42)))
+    parser.add_argument('--chunk-size', type=int, default=100_000, help="facilities generated and written per chunk")
+    return parser.parse_args(argv)
 
-# Turkana region (northern, hot, less infrastructure)
-for i in range(15):
-    facilities.append({
-        'facility_id': f'KE_TUR_{i:03d}',
-        'name': f'Turkana Clinic {i+1}',
-        'latitude': 3.1167 + np.random.uniform(-0.5, 0.5),
-        'longitude': 35.5978 + np.random.uniform(-0.5, 0.5),
-        'facility_type': np.random.choice(['Clinic', 'Dispensary', 'Health Center'], p=[0.5, 0.3, 0.2]),
-        'power_source': np.random.choice(['Solar', 'None', 'Diesel'], p=[0.5, 0.3, 0.2])
-    })
 
-# Mombasa region (coastal)
-for i in range(10):
-    facilities.append({
-        'facility_id': f'KE_MBA_{i:03d}',
-        'name': f'Mombasa Health Facility {i+1}',
-        'latitude': -4.0435 + np.random.uniform(-0.2, 0.2),
-        'longitude': 39.6682 + np.random.uniform(-0.2, 0.2),
-        'facility_type': np.random.choice(['Hospital', 'Health Center', 'Clinic'], p=[0.3, 0.4, 0.3]),
-        'power_source': np.random.choice(['Grid', 'Solar', 'Diesel'], p=[0.6, 0.3, 0.1])
-    })
+def main(argv=None):
+    args = parse_args(argv)
 
-# Kisumu region (western)
-for i in range(10):
-    facilities.append({
-        'facility_id': f'KE_KIS_{i:03d}',
-        'name': f'Kisumu Dispensary {i+1}',
-        'latitude': -0.0917 + np.random.uniform(-0.3, 0.3),
-        'longitude': 34.7680 + np.random.uniform(-0.3, 0.3),
-        'facility_type': np.random.choice(['Clinic', 'Health Center', 'Dispensary'], p=[0.4, 0.4, 0.2]),
-        'power_source': np.random.choice(['Grid', 'Solar', 'Diesel'], p=[0.5, 0.4, 0.1])
-    })
+    generator = SyntheticGenerator(load_regions(args.regions), seed=args.seed)
+    report = generator.write(args.facilities, args.output, args.forecasts, args.chunk_size)
 
-# Garissa region (eastern, hot)
-for i in range(5):
-    facilities.append({
-        'facility_id': f'KE_GAR_{i:03d}',
-        'name': f'Garissa Clinic {i+1}',
-        'latitude': -0.4569 + np.random.uniform(-0.2, 0.2),
-        'longitude': 39.6582 + np.random.uniform(-0.2, 0.2),
-        'facility_type': np.random.choice(['Clinic', 'Dispensary'], p=[0.6, 0.4]),
-        'power_source': np.random.choice(['Solar', 'Diesel', 'None'], p=[0.5, 0.3, 0.2])
-    })
+    print(f"Created {report['facilities']:,} sample facilities (seed {args.seed}, "
+          f"{report['chunks']} chunks, {report['seconds']:.1f}s)")
+    print(f"\nFacility types:")
+    print(report['facility_type'].sort_values(ascending=False).to_string())
+    print(f"\nPower sources:")
+    print(report['power_source'].sort_values(ascending=False).to_string())
+    print(f"\nGeographic spread:")
+    print(f"  Latitude: {report['latitude'][0]:.2f}° to {report['latitude'][1]:.2f}°")
+    print(f"  Longitude: {report['longitude'][0]:.2f}° to {report['longitude'][1]:.2f}°")
 
-# Create DataFrame
-df = pd.DataFrame(facilities)
+    print(f"\n✓ Saved to: {args.output}")
+    if args.forecasts:
+        print(f"✓ Forecasts: {report['forecast_rows']:,} rows saved to: {args.forecasts}")
 
-print(f"Created {len(df)} sample facilities")
-print(f"\nFacility types:")
-print(df['facility_type'].value_counts())
-print(f"\nPower sources:")
-print(df['power_source'].value_counts())
-print(f"\nGeographic spread:")
-print(f"  Latitude: {df['latitude'].min():.2f}° to {df['latitude'].max():.2f}°")
-print(f"  Longitude: {df['longitude'].min():.2f}° to {df['longitude'].max():.2f}°")
 
-# Save to CSV
-os.makedirs('data/raw', exist_ok=True)
-output_path = 'data/raw/kenya_facilities_sample.csv'
-df.to_csv(output_path, index=False)
-print(f"\n✓ Saved to: {output_path}")
+if __name__ == '__main__':
+    main()
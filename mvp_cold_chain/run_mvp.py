@@ -6,378 +6,592 @@ Runs the complete pipeline from data collection to model training
 import sys
 sys.path.append('src')
 
+import argparse
+import functools
 import pandas as pd
-import numpy as np
 from datetime import datetime
-import time
-from tqdm import tqdm
+from types import SimpleNamespace
 import os
 
+import forecast_fetcher
+import forecast_parser
+import power_features
+import failure_labels
+import rule_dsl
+import run_length
+import sharded_pipeline
+import spatial_grid
+import refresh_scheduler
+import weather_api_v2
 from weather_api_v2 import WeatherAPI
-from facility_data_loader import KenyaFacilityLoader
+from forecast_fetcher import ForecastFetcher
+from spatial_grid import GridPlanner
+from refresh_scheduler import RefreshScheduler
+from incremental import IncrementalState, current_issuance, merge_into_previous
+from feature_engineering import (POWER_COLUMNS, FAILURE_COLUMNS, add_temporal_features,
+                                 power_feature_frame, failure_label_frame)
+from failure_labels import FailureLabelEngine
+from streaming_pipeline import StreamingPipeline, iter_facility_chunks
+from sharded_pipeline import ShardedPipeline
+from facility_store import FacilityStore
+from facility_ingest import file_hash
+from stage_cache import StagePipeline
+from profiling import StageProfiler
+from refresh_daemon import RefreshDaemon, check_health, read_status
+
+FACILITIES_PATH = 'data/raw/kenya_facilities_sample.csv'
+OUTPUT_PATH = 'data/processed/facilities_with_daily_weather_and_targets.csv'
+STORE_PATH = 'data/processed/facilities_store.parquet'
+DATASET_DIR = 'data/processed/facilities_dataset'
+SHARD_DIR = 'data/processed/shards'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cold chain failure prediction pipeline")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--incremental', action='store_true',
+                      help="only refetch/recompute facilities whose inputs changed and merge into the existing dataset")
+    mode.add_argument('--stream', action='store_true',
+                      help="process facilities in chunks and append each to a partitioned Parquet dataset")
+    mode.add_argument('--daemon', action='store_true',
+                      help="keep running: incremental refresh every forecast issuance window (see REFRESH_* settings)")
+    mode.add_argument('--health', action='store_true',
+                      help="print the refresh daemon's status and exit 1 if it is unhealthy")
+    parser.add_argument('--chunk-size', type=int, default=int(os.getenv('PIPELINE_CHUNK_SIZE', 1000)),
+                        help="facilities per chunk in --stream mode")
+    parser.add_argument('--workers', type=int, default=int(os.getenv('PIPELINE_WORKERS', 1)),
+                        help="processes for power features and labelling, sharded by --shard-by (1 = no sharding)")
+    parser.add_argument('--shard-by', default=os.getenv('PIPELINE_SHARD_BY', 'region'),
+                        help="shard key: region (facility_id prefix), country, or a column name")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="rerun every stage instead of reusing cached stage outputs")
+    parser.add_argument('--profile', action='store_true',
+                        help="measure every stage and write a JSON/CSV run report")
+    parser.add_argument('--cprofile', action='store_true',
+                        help="also run stages under cProfile and save the hottest stage's profile (implies --profile)")
+    parser.add_argument('--profile-dir', default=os.getenv('PROFILE_DIR'),
+                        help="run report directory (default: outputs/profiles)")
+    parser.add_argument('--profile-compare', metavar='REPORT',
+                        help="compare stage timings against an earlier run report (implies --profile)")
+    parser.add_argument('--max-runs', type=int, help="--daemon: stop after this many refreshes")
+    args = parser.parse_args(argv)
+    args.profile = args.profile or args.cprofile or bool(args.profile_compare)
+    return args
+
+
+@functools.lru_cache(maxsize=None)
+def build_scheduler():
+    """RefreshScheduler configured from the environment"""
+    # Spend today's quota on the highest-risk, stalest facilities first
+    return RefreshScheduler(calls_per_day=int(os.getenv('OPENWEATHER_CALLS_PER_DAY', 1000)))
+
+
+@functools.lru_cache(maxsize=None)
+def build_fetch_stack():
+    """WeatherAPI, ForecastFetcher, GridPlanner and RefreshScheduler configured from the environment"""
+    weather_api = WeatherAPI()
+
+    # Concurrent fetch under a token-bucket limiter; the daily quota is
+    # enforced by the refresh scheduler's shared ledger instead (each fetch
+    # is capped at the calls it reserved)
+    fetcher = ForecastFetcher(
+        weather_api,
+        calls_per_second=float(os.getenv('OPENWEATHER_CALLS_PER_SECOND', 1.0)),
+        calls_per_day=None,
+        max_workers=int(os.getenv('OPENWEATHER_MAX_WORKERS', 8))
+    )
+
+    # Snap facilities to forecast grid cells so each cell is fetched once
+    # (set OPENWEATHER_GRID_DEG=0 to fetch every facility individually)
+    grid_deg = float(os.getenv('OPENWEATHER_GRID_DEG', 0.25))
+    planner = GridPlanner(cell_size_deg=grid_deg) if grid_deg > 0 else None
+
+    return weather_api, fetcher, planner, build_scheduler()
+
+
+def print_fetch_metrics(weather_api):
+    if weather_api.cache:
+        cache_stats = weather_api.cache.stats()
+        print(f"  Cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"({cache_stats['hit_rate']*100:.0f}% hit rate)")
+    weather_api.transport.print_metrics()
+
+
+def fetch_counters():
+    """Cumulative API / retry / forecast cache counters (empty until the fetch stack is built)"""
+    if not build_fetch_stack.cache_info().currsize:
+        return {}
+    weather_api, fetcher, _, _ = build_fetch_stack()
+    # Replay transports report {'replay': {hits, misses}} rather than request counts
+    http = weather_api.transport.metrics().values()
+    cache_stats = weather_api.cache.stats() if weather_api.cache else {}
+    return {
+        'api_calls': fetcher.api_calls,
+        'http_requests': sum(m.get('requests', 0) for m in http),
+        'retries': sum(m.get('retries', 0) for m in http),
+        'cache_hits': cache_stats.get('hits', 0),
+        'cache_misses': cache_stats.get('misses', 0)
+    }
+
+
+def write_profile(profiler, args):
+    profiler.print_report(args.profile_compare)
+    paths = profiler.write(args.profile_dir, meta={
+        'mode': 'stream' if args.stream else 'incremental' if args.incremental else 'batch',
+        'args': vars(args)
+    })
+    print(f"\n📊 Run report: {paths['json']}")
+    if 'cprofile' in paths:
+        print(f"  cProfile ({os.path.basename(paths['cprofile'])}): {paths['cprofile_text']}")
 
-print("="*70)
-print(" MVP PLAN 2: TEMPORAL COLD CHAIN FAILURE PREDICTION")
-print("="*70)
-print(f"\nStarting at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
 
 # ============================================================================
-# STEP 1: LOAD KENYA FACILITIES
+# STREAMING MODE: fetch → features → labels per chunk, appended to Parquet
 # ============================================================================
-print("\n" + "="*70)
-print("STEP 1: Loading Kenya Health Facilities")
-print("="*70)
-
-# Use sample data for MVP (replace with Healthsites.io API when available)
-facilities = pd.read_csv('data/raw/kenya_facilities_sample.csv')
+def run_stream(args):
+    print("\n" + "="*70)
+    print(f"STREAMING: Processing facilities in chunks of {args.chunk_size}")
+    print("="*70)
+
+    weather_api, fetcher, planner, scheduler = build_fetch_stack()
+    pipeline = StreamingPipeline(fetcher, output_dir=DATASET_DIR, planner=planner, scheduler=scheduler)
+    summary = pipeline.run(iter_facility_chunks(FACILITIES_PATH, args.chunk_size),
+                           source={'file': file_hash(FACILITIES_PATH),
+                                   'chunk_size': args.chunk_size})
+
+    print(f"\n✓ Wrote {summary['rows']} rows to {DATASET_DIR} ({summary['files']} part files)")
+    if summary['skipped_chunks']:
+        print(f"  Resumed: {summary['skipped_chunks']} of {summary['chunks']} chunks already written")
+    print(f"✗ Failed: {summary['failed']} facilities")
+    if summary['facility_days']:
+        print(f"  Failure rate: {summary['failures']/summary['facility_days']*100:.1f}%")
+        for day, count in enumerate(summary['failures_by_day'], 1):
+            print(f"  Day {day}: {count} failures")
+        pipeline.labeler.print_rule_hits(summary['rule_hits'], summary['rule_seconds'])
+    print_fetch_metrics(weather_api)
 
-print(f"\n✓ Loaded {len(facilities)} facilities")
-print(f"\nFacility types:")
-print(facilities['facility_type'].value_counts())
-print(f"\nPower sources:")
-print(facilities['power_source'].value_counts())
 
 # ============================================================================
-# STEP 2: FETCH WEATHER FORECASTS
+# STAGES: each takes the run context and its upstream stage outputs
 # ============================================================================
-print("\n" + "="*70)
-print("STEP 2: Fetching 5-Day Weather Forecasts")
-print("="*70)
-print(f"Fetching forecasts for {len(facilities)} facilities...")
-print("Estimated time: 1-2 minutes\n")
+class UpToDate(Exception):
+    """Incremental run with nothing to recompute"""
 
-weather_api = WeatherAPI()
-weather_data = []
-failed_facilities = []
 
-for idx, facility in tqdm(facilities.iterrows(), total=len(facilities), desc="Fetching forecasts"):
-    try:
-        features = weather_api.get_forecast_features(
-            lat=facility['latitude'],
-            lon=facility['longitude'],
-            days=5
-        )
-
-        if features:
-            features['facility_id'] = facility['facility_id']
-            features['facility_name'] = facility['name']
-            features['latitude'] = facility['latitude']
-            features['longitude'] = facility['longitude']
-            features['facility_type'] = facility['facility_type']
-            features['power_source'] = facility['power_source']
-            weather_data.append(features)
-        else:
-            failed_facilities.append(facility['facility_id'])
+class FetchFailed(Exception):
+    """Forecasts were due but none could be fetched (API down, bad key, quota spent)"""
 
-        time.sleep(0.3)  # Rate limiting
+    def __init__(self, message: str, summary: dict):
+        super().__init__(message)
+        self.summary = summary
 
-    except Exception as e:
-        print(f"\nError for {facility['name']}: {e}")
-        failed_facilities.append(facility['facility_id'])
 
-print(f"\n✓ Successfully fetched weather for {len(weather_data)} facilities")
-print(f"✗ Failed: {len(failed_facilities)} facilities\n")
+def load_facilities(ctx):
+    # Use sample data for MVP (replace with Healthsites.io API when available)
+    return pd.read_csv(FACILITIES_PATH)
 
-# ============================================================================
-# STEP 3: CREATE DATASET
-# ============================================================================
-print("\n" + "="*70)
-print("STEP 3: Creating Model Dataset")
-print("="*70)
 
-df = pd.DataFrame(weather_data)
+def describe_facilities(facilities):
+    print(f"\n✓ Loaded {len(facilities)} facilities")
+    print(f"\nFacility types:")
+    print(facilities['facility_type'].value_counts())
+    print(f"\nPower sources:")
+    print(facilities['power_source'].value_counts())
 
-# Add temporal features
-current_month = datetime.now().month
-df['month'] = current_month
-df['is_dry_season'] = int(current_month in [1, 2, 3, 6, 7, 8, 9, 10])
-df['is_rainy_season'] = int(current_month in [4, 5, 11, 12])
 
-print(f"\nDataset shape: {df.shape}")
-print(f"Features: {len(df.columns)}")
-print(f"\nFacility types:")
-print(df['facility_type'].value_counts())
-print(f"\nPower sources:")
-print(df['power_source'].value_counts())
+def plan_refresh(ctx, facilities):
+    # Incremental mode: compare per-facility fingerprints with the last run
+    previous = pd.read_csv(OUTPUT_PATH) if ctx.args.incremental and os.path.exists(OUTPUT_PATH) else None
+    # Rule file content hash: a rule change relabels every facility
+    plan = ctx.state.plan(facilities, previous, ctx.labeler.rules.version)
+    return {'previous': previous, **plan}
+
+
+def describe_plan(plan):
+    previous = plan['previous']
+    if previous is not None:
+        print(f"\nIncremental run against {len(previous)} existing rows:")
+        print(f"  • Refetch: {len(plan['fetch'])} ({len(plan['new_power'])} new/changed facilities)")
+        print(f"  • Relabel only: {len(plan['relabel'])}")
+        print(f"  • Unchanged: {len(plan['unchanged'])}")
+    else:
+        print(f"\nFull run: {len(plan['fetch'])} facilities")
+
+
+def fetch_weather(ctx, facilities, plan):
+    to_fetch = facilities[facilities['facility_id'].isin(plan['fetch'])]
+    print(f"Fetching forecasts for {len(to_fetch)} facilities...")
+    print("Estimated time: 1-2 minutes\n")
+
+    weather_api, fetcher, planner, scheduler = build_fetch_stack()
+    if os.path.exists(OUTPUT_PATH):
+        previous = plan['previous']
+        scheduler.update_priorities(previous if previous is not None else pd.read_csv(OUTPUT_PATH))
+
+    refresh = scheduler.plan(to_fetch, planner=planner, cached=weather_api.has_cached_forecast)
+    print(f"Quota: {refresh['reserved']} calls reserved, {scheduler.ledger.remaining()} left today")
+    if refresh['deferred']:
+        print(f"⚠️  {len(refresh['deferred'])} lower-priority facilities deferred to a later run")
+
+    # The fetch stack is cached for the process (a daemon reuses it every run),
+    # so settle only the calls made by this fetch
+    calls_before = fetcher.api_calls
+    weather_data, failed_facilities = fetcher.fetch(refresh['selected'], days=5, planner=planner,
+                                                    max_calls=refresh['reserved'])
+    scheduler.complete(refresh, weather_data, fetcher.api_calls - calls_before)
+    failed_facilities += refresh['deferred']
+
+    print_fetch_metrics(weather_api)
+    return {'rows': pd.DataFrame(weather_data), 'failed': failed_facilities, 'deferred': refresh['deferred']}
 
-# ============================================================================
-# STEP 3.5: ADD POWER INFRASTRUCTURE FEATURES
-# ============================================================================
-print("\n" + "="*70)
-print("STEP 3.5: Adding Power Infrastructure Features")
-print("="*70)
-print("Estimating power features based on geography and facility type...\n")
 
-def estimate_power_features(row):
+def describe_weather(weather):
+    print(f"\n✓ Successfully fetched weather for {len(weather['rows'])} facilities")
+    print(f"✗ Failed: {len(weather['failed'])} facilities")
+    print()
+
+
+def build_dataset(ctx, weather, plan):
+    df = weather['rows'].copy()
+
+    if len(plan['fetch']) and df.empty:
+        deferred = len(weather['deferred'])
+        raise FetchFailed(f"No forecasts fetched: {len(weather['failed'])} of {len(plan['fetch'])} "
+                          f"facilities failed or were deferred",
+                          {'due': len(plan['fetch']), 'failed': len(weather['failed']) - deferred,
+                           'deferred': deferred})
+
+    # Rows whose weather is still current but whose labels are out of date
+    previous = plan['previous']
+    if previous is not None:
+        if not len(plan['fetch']) and not len(plan['relabel']):
+            raise UpToDate(f"No rows changed - {OUTPUT_PATH} is up to date")
+
+        relabel_rows = previous[previous['facility_id'].isin(plan['relabel'])]
+        derived = POWER_COLUMNS + FAILURE_COLUMNS
+        base = relabel_rows.drop(columns=[c for c in derived if c in relabel_rows.columns])
+        df = pd.concat([df, base], ignore_index=True) if len(df) else base.reset_index(drop=True)
+
+    # Add temporal features
+    return add_temporal_features(df, ctx.month)
+
+
+def describe_dataset(df):
+    print(f"\nDataset shape: {df.shape}")
+    print(f"Features: {len(df.columns)}")
+    print(f"\nFacility types:")
+    print(df['facility_type'].value_counts())
+    print(f"\nPower sources:")
+    print(df['power_source'].value_counts())
+
+
+def reused_power(dataset, plan):
+    """Rows needing new power estimates, and stored estimates for the rest (incremental runs)"""
+    needs_power = dataset['facility_id'].isin(plan['new_power']).to_numpy()
+    reused = pd.DataFrame(columns=POWER_COLUMNS)
+    if (~needs_power).any():
+        reused = plan['previous'].drop_duplicates('facility_id').set_index('facility_id').loc[
+            dataset.loc[~needs_power, 'facility_id'], POWER_COLUMNS]
+        reused.index = dataset.index[~needs_power]
+    return needs_power, reused
+
+
+def estimate_power(ctx, dataset, plan):
+    print("Estimating power features based on geography and facility type...\n")
+
+    # Apply power feature estimation to new/changed facilities; incremental
+    # runs reuse the stored estimates for everyone else
+    needs_power, reused = reused_power(dataset, plan)
+    if needs_power.any():
+        power_estimates = pd.concat([power_feature_frame(dataset[needs_power]), reused])
+    else:
+        power_estimates = reused
+
+    return power_estimates.reindex(index=dataset.index, columns=POWER_COLUMNS)
+
+
+def describe_power(df):
+    print(f"✓ Added 10 power infrastructure features")
+    print(f"\nPower Infrastructure Summary:")
+    print(f"  • Avg electrification rate: {df['electrification_rate'].mean():.1f}%")
+    print(f"  • Avg grid reliability: {df['grid_reliability_score'].mean():.2f}")
+    print(f"  • Avg distance to grid: {df['distance_to_grid_km'].mean():.1f} km")
+    print(f"  • High outage risk facilities: {df['high_outage_risk'].sum()} ({df['high_outage_risk'].sum()/len(df)*100:.1f}%)")
+    print(f"  • Very low power access: {df['very_low_power_access'].sum()} ({df['very_low_power_access'].sum()/len(df)*100:.1f}%)")
+    print(f"  • Remote from grid (>20km): {df['remote_from_grid'].sum()} ({df['remote_from_grid'].sum()/len(df)*100:.1f}%)")
+
+
+def create_labels(ctx, dataset, power):
+    print("Generating failure labels for each of 5 days...\n")
+
+    labels = failure_label_frame(pd.concat([dataset, power], axis=1), ctx.labeler)
+    labels.attrs['report'] = ctx.labeler.last_report
+    return labels
+
+
+def describe_labels(ctx, labels):
+    # Calculate failure statistics
+    total_failures = labels[FAILURE_COLUMNS].sum().sum()
+    total_facility_days = len(labels) * 5
+
+    print(f"Synthetic failures generated:")
+    print(f"  Total facility-days: {total_facility_days}")
+    print(f"  Predicted failures: {total_failures}")
+    print(f"  Failure rate: {total_failures/total_facility_days*100:.1f}%")
+    print(f"\nFailures by day:")
+    for day in range(1, 6):
+        count = labels[f'failure_day{day}'].sum()
+        print(f"  Day {day}: {count} failures ({count/len(labels)*100:.1f}% of facilities)")
+
+    report = labels.attrs.get('report', {})
+    ctx.labeler.print_rule_hits(report.get('rule_hits', {}), report.get('rule_seconds', {}))
+
+
+def sharded_features(ctx, dataset, plan):
+    # Power features (rows without reused estimates) and labels per shard in worker processes
+    needs_power, reused = reused_power(dataset, plan)
+    df = pd.concat([dataset, reused.reindex(index=dataset.index, columns=POWER_COLUMNS)], axis=1) \
+        if len(reused) else dataset
+
+    sharded = ShardedPipeline(workers=ctx.args.workers, by=ctx.args.shard_by, output_dir=SHARD_DIR,
+                              labeler=ctx.labeler)
+    df, summary = sharded.run(df, month=ctx.month)
+    print(f"✓ Processed {summary['shards']} shards (by {ctx.args.shard_by}) on {summary['workers']} workers "
+          f"in {summary['seconds']:.1f}s → {SHARD_DIR}\n")
+
+    features = df[POWER_COLUMNS + FAILURE_COLUMNS].set_axis(dataset.index)
+    features.attrs['report'] = summary
+    return features
+
+
+def describe_features(ctx, features):
+    describe_power(features)
+    print()
+    describe_labels(ctx, features)
+
+
+def save_outputs(ctx, facilities, plan, weather, dataset, *feature_frames):
+    df = pd.concat([dataset, *feature_frames], axis=1)
+    df.attrs = {}
+
+    # Feed the new labels back into refresh priorities for the next run
+    build_scheduler().update_priorities(df)
+
+    # Create directories if they don't exist
+    os.makedirs('data/processed', exist_ok=True)
+    os.makedirs('outputs/figures', exist_ok=True)
+
+    # Merge recomputed rows into the existing dataset (incremental mode)
+    recomputed = len(df)
+    previous = plan['previous']
+    df = merge_into_previous(previous, df, facilities)
+    ctx.state.save(facilities, weather['rows'].get('facility_id', pd.Series(dtype=object)).tolist(),
+                   plan['relabel'], ctx.labeler.rules.version)
+    if previous is not None:
+        print(f"\n✓ Merged {recomputed} recomputed rows into {len(df)} total")
+
+    # Save complete dataset and the compact columnar copy for the dashboard.
+    # Both are swapped in atomically, CSV last: readers see the old or the
+    # new dataset, never a partial file, and the store stays the newer one
+    output_path = OUTPUT_PATH
+    df.to_csv(output_path + '.tmp', index=False)
+
+    store = FacilityStore.from_frame(df)
+    store.save(STORE_PATH)
+    os.replace(output_path + '.tmp', output_path)
+    print(f"\n✓ Saved complete dataset to: {output_path}")
+    print(f"  Shape: {df.shape}")
+    print(f"\n✓ Saved compact store to: {STORE_PATH}")
+    store.print_memory_report()
+
+    # Save facilities only
+    facilities_only = df[['facility_id', 'facility_name', 'latitude', 'longitude',
+                          'facility_type', 'power_source']].copy()
+    facilities_only.to_csv('data/processed/kenya_facilities.csv.tmp', index=False)
+    os.replace('data/processed/kenya_facilities.csv.tmp', 'data/processed/kenya_facilities.csv')
+    print(f"\n✓ Saved facility list to: data/processed/kenya_facilities.csv")
+    return df
+
+
+def print_summary(df, current_month):
+    total_failures = df[FAILURE_COLUMNS].sum().sum()
+    total_facility_days = len(df) * 5
+
+    print("\n" + "="*70)
+    print("DATA COLLECTION COMPLETE! ✅")
+    print("="*70)
+
+    print(f"\n📊 Dataset Summary:")
+    print(f"  • Facilities: {len(df)}")
+    print(f"  • Features: {len(df.columns)}")
+    print(f"  • Days forecasted: 5")
+    print(f"  • Total facility-days: {len(df) * 5}")
+    print(f"  • Failure rate: {total_failures/total_facility_days*100:.1f}%")
+
+    print(f"\n🌍 Geographic Coverage:")
+    print(f"  • Latitude: {df['latitude'].min():.2f}° to {df['latitude'].max():.2f}°")
+    print(f"  • Longitude: {df['longitude'].min():.2f}° to {df['longitude'].max():.2f}°")
+
+    print(f"\n🌡️  Weather Summary (5-day forecast):")
+    print(f"  • Max temperature: {df['max_temp_7d'].max():.1f}°C")
+    print(f"  • Min temperature: {df['min_temp_7d'].min():.1f}°C")
+    print(f"  • Avg temperature: {df['avg_temp_7d'].mean():.1f}°C")
+    print(f"  • Facilities with heat wave: {df['heat_wave_indicator'].sum()}")
+
+    print(f"\n⚡ Power Infrastructure:")
+    for power, count in df['power_source'].value_counts().items():
+        print(f"  • {power}: {count} facilities ({count/len(df)*100:.1f}%)")
+
+    print(f"\n📅 Temporal Context:")
+    print(f"  • Current month: {current_month}")
+    print(f"  • Season: {'Dry' if df['is_dry_season'].iloc[0] == 1 else 'Rainy'}")
+
+    print(f"\n✅ NEXT STEPS:")
+    print(f"  1. Run EDA: jupyter notebook notebooks/02_eda.ipynb")
+    print(f"  2. Train model: jupyter notebook notebooks/03_model_training.ipynb")
+    print(f"  3. Create demo: jupyter notebook notebooks/04_prediction_demo.ipynb")
+
+
+def build_pipeline(ctx) -> StagePipeline:
     """
-    Estimate power infrastructure features based on geography
-    Uses latitude as proxy for infrastructure level (rough but realistic for Kenya)
+    Stage DAG for a batch run
+
+    Each cached stage is keyed by its code, its inputs' content and the
+    settings it depends on, so a rerun only recomputes what changed:
+    weather within one forecast issuance window, power features until the
+    dataset or seed changes, labels until the rules change.
     """
-    lat = row['latitude']
-    power = row['power_source']
-    facility_type = row['facility_type']
-
-    # Estimate electrification based on latitude (rough proxy for Kenya)
-    # Northern Kenya (Turkana) = very low, Nairobi area = high, Coastal = moderate
-    if lat > 2:  # Far north (Turkana region)
-        electrification_est = 25
-        grid_reliability_est = 0.35
-    elif lat > 0:  # Mid-north
-        electrification_est = 40
-        grid_reliability_est = 0.55
-    elif lat > -2:  # Central (Nairobi)
-        electrification_est = 80
-        grid_reliability_est = 0.85
-    else:  # Coastal/south (Mombasa, Garissa)
-        electrification_est = 60
-        grid_reliability_est = 0.70
-
-    # Adjust for facility type (hospitals/health centers in better locations)
-    if facility_type == 'Hospital':
-        electrification_est += 15
-        grid_reliability_est += 0.10
-    elif facility_type == 'Health Center':
-        electrification_est += 5
-        grid_reliability_est += 0.05
-
-    # Estimate distance to grid based on power source
-    if power == 'Grid':
-        distance_est = np.random.uniform(1, 15)  # Close to grid
-    elif power == 'Solar':
-        distance_est = np.random.uniform(15, 50)  # Farther from grid
-    elif power == 'Diesel':
-        distance_est = np.random.uniform(25, 60)  # Remote
-    else:  # None
-        distance_est = np.random.uniform(40, 80)  # Very remote
-
-    # Calculate derived features
-    electrification_final = min(electrification_est, 95)
-    grid_reliability_final = min(grid_reliability_est, 0.95)
-    avg_power_hours = grid_reliability_final * 24
-
-    # Binary risk indicators
-    high_outage_risk = 1 if grid_reliability_final < 0.6 else 0
-    very_low_power = 1 if electrification_final < 30 else 0
-    remote_from_grid = 1 if distance_est > 20 else 0
-
-    # Composite vulnerability score (0-100, higher = more vulnerable)
-    vulnerability = (
-        (100 - electrification_final) * 0.4 +
-        distance_est * 0.3 +
-        (100 - grid_reliability_final * 100) * 0.3
-    )
+    pipeline = StagePipeline(enabled=not ctx.args.no_cache)
+
+    pipeline.add('facilities', functools.partial(load_facilities, ctx),
+                 key={'path': FACILITIES_PATH, 'file': file_hash(FACILITIES_PATH)},
+                 title="Loading Kenya Health Facilities", describe=describe_facilities)
+    # Reads the incremental state and the previous dataset, so never cached
+    pipeline.add('plan', functools.partial(plan_refresh, ctx), inputs=['facilities'], cache=False,
+                 title="Planning Refresh", describe=describe_plan)
+    pipeline.add('weather', functools.partial(fetch_weather, ctx), inputs=['facilities', 'plan'],
+                 key={'issuance': current_issuance(), 'days': 5,
+                      'api_root': os.getenv('OPENWEATHER_API_ROOT', 'https://api.openweathermap.org'),
+                      'grid_deg': os.getenv('OPENWEATHER_GRID_DEG', '0.25')},
+                 code=(forecast_fetcher, forecast_parser, weather_api_v2, spatial_grid, refresh_scheduler),
+                 # A run with failed or deferred facilities is retried next time, not replayed
+                 cache_if=lambda weather: not weather['failed'],
+                 title="Fetching 5-Day Weather Forecasts", describe=describe_weather)
+    pipeline.add('dataset', functools.partial(build_dataset, ctx), inputs=['weather', 'plan'],
+                 key={'month': ctx.month}, code=(add_temporal_features,),
+                 title="Creating Model Dataset", describe=describe_dataset)
+
+    if ctx.args.workers > 1:
+        pipeline.add('features', functools.partial(sharded_features, ctx), inputs=['dataset', 'plan'],
+                     key={'seed': power_features.DEFAULT_SEED, 'rules': ctx.labeler.rules.version,
+                          'shard_by': ctx.args.shard_by},
+                     code=(reused_power, power_feature_frame, failure_label_frame, add_temporal_features,
+                           power_features, failure_labels, rule_dsl, run_length, sharded_pipeline),
+                     title="Power Features & Failure Labels (sharded)",
+                     describe=functools.partial(describe_features, ctx))
+        features = ['features']
+    else:
+        pipeline.add('power', functools.partial(estimate_power, ctx), inputs=['dataset', 'plan'],
+                     key={'seed': power_features.DEFAULT_SEED},
+                     code=(reused_power, power_feature_frame, power_features),
+                     title="Adding Power Infrastructure Features", describe=describe_power)
+        pipeline.add('labels', functools.partial(create_labels, ctx), inputs=['dataset', 'power'],
+                     key={'rules': ctx.labeler.rules.version},
+                     code=(failure_label_frame, failure_labels, rule_dsl, run_length),
+                     title="Creating Synthetic Target Variables",
+                     describe=functools.partial(describe_labels, ctx))
+        features = ['power', 'labels']
+
+    pipeline.add('save', functools.partial(save_outputs, ctx),
+                 inputs=['facilities', 'plan', 'weather', 'dataset', *features], cache=False,
+                 title="Saving Datasets")
+    return pipeline
+
+
+def refresh_once(args, state):
+    """One incremental refresh (daemon job); returns the summary kept in the status file"""
+    ctx = SimpleNamespace(args=args, month=datetime.now().month, labeler=FailureLabelEngine(), state=state)
+    try:
+        outputs = build_pipeline(ctx).run()
+    except UpToDate as e:
+        print(f"\n✓ {e}")
+        return {'outcome': 'up_to_date', 'rule_version': ctx.labeler.rules.version}
 
+    plan, weather, df = outputs['plan'], outputs['weather'], outputs['save']
+    deferred = len(weather['deferred'])
     return {
-        'electrification_rate': electrification_final,
-        'grid_reliability_score': grid_reliability_final,
-        'distance_to_grid_km': round(distance_est, 1),
-        'avg_power_hours_per_day': round(avg_power_hours, 1),
-        'high_outage_risk': high_outage_risk,
-        'very_low_power_access': very_low_power,
-        'remote_from_grid': remote_from_grid,
-        'power_vulnerability_score': round(vulnerability, 1),
-        'avg_outage_duration_hours': round(4.5 if high_outage_risk else 1.5, 1),
-        'outage_frequency_per_week': round(3.2 if high_outage_risk else 0.8, 1)
+        'outcome': 'updated', 'rows': len(df), 'refetched': len(weather['rows']),
+        'relabeled': len(plan['relabel']), 'unchanged': len(plan['unchanged']),
+        'failed': len(weather['failed']) - deferred, 'deferred': deferred,
+        'failures': int(df[FAILURE_COLUMNS].sum().sum()), 'rule_version': ctx.labeler.rules.version,
+        'quota_remaining': build_scheduler().ledger.remaining()
     }
 
-# Apply power feature estimation to all facilities
-power_estimates = df.apply(estimate_power_features, axis=1, result_type='expand')
-df = pd.concat([df, power_estimates], axis=1)
 
-print(f"✓ Added 10 power infrastructure features")
-print(f"\nPower Infrastructure Summary:")
-print(f"  • Avg electrification rate: {df['electrification_rate'].mean():.1f}%")
-print(f"  • Avg grid reliability: {df['grid_reliability_score'].mean():.2f}")
-print(f"  • Avg distance to grid: {df['distance_to_grid_km'].mean():.1f} km")
-print(f"  • High outage risk facilities: {df['high_outage_risk'].sum()} ({df['high_outage_risk'].sum()/len(df)*100:.1f}%)")
-print(f"  • Very low power access: {df['very_low_power_access'].sum()} ({df['very_low_power_access'].sum()/len(df)*100:.1f}%)")
-print(f"  • Remote from grid (>20km): {df['remote_from_grid'].sum()} ({df['remote_from_grid'].sum()/len(df)*100:.1f}%)")
+def main(argv=None):
+    args = parse_args(argv)
 
-# ============================================================================
-# STEP 4: CREATE TARGET VARIABLES (Synthetic for MVP)
-# ============================================================================
-print("\n" + "="*70)
-print("STEP 4: Creating Synthetic Target Variables")
-print("="*70)
-print("Generating failure labels for each of 5 days...\n")
+    if args.health:
+        healthy, reason = check_health()
+        status = read_status()
+        print(f"{'✓ healthy' if healthy else '✗ unhealthy'}: {reason}")
+        if status:
+            print(f"  state: {status['state']}, runs: {status['runs']}, failures: {status['failures']}, "
+                  f"next run: {status['next_run']}")
+        sys.exit(0 if healthy else 1)
 
-def predict_failure_per_day(row):
-    """
-    Enhanced failure prediction including power infrastructure
-    Incorporates grid reliability, electrification, and distance to grid
-    """
-    failures = []
-
-    # Extract power infrastructure features
-    grid_reliability = row['grid_reliability_score']
-    electrification = row['electrification_rate']
-    distance_to_grid = row['distance_to_grid_km']
-    power = row['power_source']
-
-    for day in range(1, 6):  # 5 days
-        temp = row[f'temp_max_day{day}']
-        clouds = row[f'clouds_day{day}']
-
-        failure = False
-
-        # ========== GRID POWER FACILITIES ==========
-        if power == 'Grid':
-            # Rule 1: Unreliable grid + heat
-            if grid_reliability < 0.6 and temp > 33:
-                failure = True  # Frequent outages during hot weather
-
-            # Rule 2: Low electrification area (proxy for poor grid)
-            if electrification < 40 and temp > 30:
-                failure = True  # Poor grid infrastructure can't handle load
-
-            # Rule 3: Heat wave strains grid
-            if row.get('heat_wave_indicator', 0) == 1 and grid_reliability < 0.75:
-                failure = True  # Grid fails under high AC demand
-
-        # ========== SOLAR POWER FACILITIES ==========
-        elif power == 'Solar':
-            # Rule 4: Cloudy + no grid backup
-            if clouds > 70 and temp > 32:
-                failure = True  # Battery drains, no backup
-
-            # Rule 5: Multi-day cloudy period
-            if day >= 3:
-                past_clouds = [row[f'clouds_day{d}'] for d in range(max(1, day-2), day+1)]
-                avg_clouds_3day = np.mean(past_clouds)
-                if avg_clouds_3day > 65:
-                    failure = True  # Battery fully depleted
-
-            # Rule 6: Heat + clouds combination
-            if temp > 35 and clouds > 60:
-                failure = True  # High cooling load + low charging
-
-        # ========== DIESEL BACKUP ==========
-        elif power == 'Diesel':
-            # Rule 7: Remote location (fuel supply issues)
-            if distance_to_grid > 50 and day >= 4:
-                failure = True  # Fuel runs out by day 4-5
-
-            # Rule 8: Extreme heat (generator overload)
-            if temp > 38:
-                failure = True  # Generator can't keep up with cooling load
-
-        # ========== NO POWER ==========
-        elif power == 'None':
-            # Rule 9: Any significant heat = failure
-            if temp > 32:
-                failure = True  # No refrigeration at all
-
-        # ========== UNIVERSAL RULES (All power types) ==========
-
-        # Rule 10: Extreme heat overwhelms any system
-        if temp > 40:
-            failure = True
-
-        # Rule 11: Low electrification area + unreliable power
-        if electrification < 30 and power in ['Grid', 'Diesel']:
-            if temp > 30:
-                failure = True  # Infrastructure too poor to support cold chain
-
-        # Rule 12: Very remote facilities (>30km from grid)
-        if distance_to_grid > 30 and power != 'Solar':
-            if temp > 32 and day >= 3:
-                failure = True  # Isolation + time = failure
-
-        # Rule 13: Heat accumulation (general)
-        if day >= 3:
-            past_temps = [row[f'temp_max_day{d}'] for d in range(max(1, day-2), day+1)]
-            avg_temp = np.mean(past_temps)
-            if avg_temp > 33 and grid_reliability < 0.7:
-                failure = True  # Accumulated stress + unreliable power
-
-        failures.append(1 if failure else 0)
-
-    return failures
-
-# Generate targets
-for day in range(1, 6):
-    df[f'failure_day{day}'] = 0
-
-for idx, row in df.iterrows():
-    failures = predict_failure_per_day(row)
-    for day, failure in enumerate(failures, 1):
-        df.at[idx, f'failure_day{day}'] = failure
-
-# Calculate failure statistics
-failure_cols = [f'failure_day{day}' for day in range(1, 6)]
-total_failures = df[failure_cols].sum().sum()
-total_facility_days = len(df) * 5
-
-print(f"Synthetic failures generated:")
-print(f"  Total facility-days: {total_facility_days}")
-print(f"  Predicted failures: {total_failures}")
-print(f"  Failure rate: {total_failures/total_facility_days*100:.1f}%")
-print(f"\nFailures by day:")
-for day in range(1, 6):
-    count = df[f'failure_day{day}'].sum()
-    print(f"  Day {day}: {count} failures ({count/len(df)*100:.1f}% of facilities)")
+    print("="*70)
+    print(" MVP PLAN 2: TEMPORAL COLD CHAIN FAILURE PREDICTION")
+    print("="*70)
+    print(f"\nStarting at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
 
-# ============================================================================
-# STEP 5: SAVE DATASETS
-# ============================================================================
-print("\n" + "="*70)
-print("STEP 5: Saving Datasets")
-print("="*70)
-
-# Create directories if they don't exist
-os.makedirs('data/processed', exist_ok=True)
-os.makedirs('outputs/figures', exist_ok=True)
-
-# Save complete dataset
-output_path = 'data/processed/facilities_with_daily_weather_and_targets.csv'
-df.to_csv(output_path, index=False)
-print(f"\n✓ Saved complete dataset to: {output_path}")
-print(f"  Shape: {df.shape}")
-
-# Save facilities only
-facilities_only = df[['facility_id', 'facility_name', 'latitude', 'longitude',
-                      'facility_type', 'power_source']].copy()
-facilities_only.to_csv('data/processed/kenya_facilities.csv', index=False)
-print(f"\n✓ Saved facility list to: data/processed/kenya_facilities.csv")
+    profiler = StageProfiler(fetch_counters, use_cprofile=args.cprofile) if args.profile else None
 
-# ============================================================================
-# SUMMARY
-# ============================================================================
-print("\n" + "="*70)
-print("DATA COLLECTION COMPLETE! ✅")
-print("="*70)
-
-print(f"\n📊 Dataset Summary:")
-print(f"  • Facilities: {len(df)}")
-print(f"  • Features: {len(df.columns)}")
-print(f"  • Days forecasted: 5")
-print(f"  • Total facility-days: {len(df) * 5}")
-print(f"  • Failure rate: {total_failures/total_facility_days*100:.1f}%")
-
-print(f"\n🌍 Geographic Coverage:")
-print(f"  • Latitude: {df['latitude'].min():.2f}° to {df['latitude'].max():.2f}°")
-print(f"  • Longitude: {df['longitude'].min():.2f}° to {df['longitude'].max():.2f}°")
-
-print(f"\n🌡️  Weather Summary (5-day forecast):")
-print(f"  • Max temperature: {df['max_temp_7d'].max():.1f}°C")
-print(f"  • Min temperature: {df['min_temp_7d'].min():.1f}°C")
-print(f"  • Avg temperature: {df['avg_temp_7d'].mean():.1f}°C")
-print(f"  • Facilities with heat wave: {df['heat_wave_indicator'].sum()}")
-
-print(f"\n⚡ Power Infrastructure:")
-for power, count in df['power_source'].value_counts().items():
-    print(f"  • {power}: {count} facilities ({count/len(df)*100:.1f}%)")
-
-print(f"\n📅 Temporal Context:")
-print(f"  • Current month: {current_month}")
-print(f"  • Season: {'Dry' if df['is_dry_season'].iloc[0] == 1 else 'Rainy'}")
-
-print(f"\n✅ NEXT STEPS:")
-print(f"  1. Run EDA: jupyter notebook notebooks/02_eda.ipynb")
-print(f"  2. Train model: jupyter notebook notebooks/03_model_training.ipynb")
-print(f"  3. Create demo: jupyter notebook notebooks/04_prediction_demo.ipynb")
-
-print(f"\n⏱️  Completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-print(f"\n{'='*70}\n")
-
-print("🚀 Ready to build the temporal prediction model!")
+    if args.stream:
+        # Chunks interleave fetch, features and labels, so the run is one stage
+        if profiler:
+            with profiler.stage('stream'):
+                run_stream(args)
+            write_profile(profiler, args)
+        else:
+            run_stream(args)
+        return
+
+    if args.daemon:
+        # Each refresh is an incremental run: due forecasts only, merged and swapped in
+        args.incremental = True
+        daemon = RefreshDaemon(functools.partial(refresh_once, args, IncrementalState()))
+        print(f"Refreshing every {daemon.interval / 60:g} min; status: {daemon.status_path}")
+        daemon.serve(max_runs=args.max_runs)
+        return
+
+    ctx = SimpleNamespace(args=args, month=datetime.now().month,
+                          labeler=FailureLabelEngine(), state=IncrementalState())
+    pipeline = build_pipeline(ctx)
+    pipeline.profiler = profiler
+    try:
+        outputs = pipeline.run()
+    except UpToDate as e:
+        print(f"\n✓ {e}")
+        if profiler:
+            write_profile(profiler, args)
+        return
+    except FetchFailed as e:
+        print(f"\n❌ {e}")
+        if profiler:
+            write_profile(profiler, args)
+        sys.exit(1)
+
+    print_summary(outputs['save'], ctx.month)
+    pipeline.print_report()
+    if profiler:
+        write_profile(profiler, args)
+
+    print(f"\n⏱️  Completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"\n{'='*70}\n")
+
+    print("🚀 Ready to build the temporal prediction model!")
+
+
+if __name__ == '__main__':
+    main()
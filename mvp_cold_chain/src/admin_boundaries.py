@@ -0,0 +1,214 @@
+"""
+Administrative Boundaries Module
+Assign facilities to counties / regions by point-in-polygon against local boundary files
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import shapely
+from shapely.geometry import shape
+
+DEFAULT_BOUNDARIES_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'external', 'kenya_counties.geojson'
+)
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'cache', 'county_assignments.sqlite'
+)
+
+# Attribute names that hold the county name in common boundary datasets
+# (IEBC / KNBS county files, GADM level 1, geoBoundaries ADM1)
+NAME_FIELDS = ['county', 'COUNTY', 'COUNTY_NAM', 'county_name', 'NAME_1', 'ADM1_EN', 'shapeName', 'name', 'NAME']
+
+# Kenya's 47 counties grouped by former province
+KENYA_COUNTY_REGIONS = {
+    'Nairobi': 'Nairobi',
+    **{c: 'Central' for c in ['Nyandarua', 'Nyeri', 'Kirinyaga', "Murang'a", 'Kiambu']},
+    **{c: 'Coast' for c in ['Mombasa', 'Kwale', 'Kilifi', 'Tana River', 'Lamu', 'Taita Taveta']},
+    **{c: 'Eastern' for c in ['Marsabit', 'Isiolo', 'Meru', 'Tharaka Nithi', 'Embu', 'Kitui',
+                              'Machakos', 'Makueni']},
+    **{c: 'North Eastern' for c in ['Garissa', 'Wajir', 'Mandera']},
+    **{c: 'Nyanza' for c in ['Siaya', 'Kisumu', 'Homa Bay', 'Migori', 'Kisii', 'Nyamira']},
+    **{c: 'Rift Valley' for c in ['Turkana', 'West Pokot', 'Samburu', 'Trans Nzoia', 'Uasin Gishu',
+                                  'Elgeyo Marakwet', 'Nandi', 'Baringo', 'Laikipia', 'Nakuru', 'Narok',
+                                  'Kajiado', 'Kericho', 'Bomet']},
+    **{c: 'Western' for c in ['Kakamega', 'Vihiga', 'Bungoma', 'Busia']}
+}
+
+
+def normalize_name(name) -> str:
+    """Comparable county name ("MURANG'A", "Muranga" and "Murang'a" all match)"""
+    return re.sub(r'[^a-z]', '', str(name).lower())
+
+
+_REGION_BY_NAME = {normalize_name(c): r for c, r in KENYA_COUNTY_REGIONS.items()}
+
+
+class BoundaryIndex:
+    """
+    STRtree over boundary polygons
+
+    The tree prefilters by bounding box and the exact predicate runs only
+    on candidates, so assigning n points to m polygons costs roughly
+    O(n log m) instead of O(n · m).
+    """
+
+    def __init__(self, names: List[str], geometries, fingerprint: str = ''):
+        """
+        Initialize index
+
+        Args:
+            names: County name per polygon
+            geometries: Shapely (multi)polygons
+            fingerprint: Identifies the boundary data (used as cache key)
+        """
+        self.names = np.asarray(names, dtype=object)
+        self.geometries = np.asarray(geometries, dtype=object)
+        self.fingerprint = fingerprint
+        self.tree = shapely.STRtree(self.geometries)
+
+    @classmethod
+    def from_file(cls, path: Optional[str] = None, name_field: Optional[str] = None) -> 'BoundaryIndex':
+        """
+        Load boundaries from GeoJSON (or a shapefile / GeoPackage if geopandas is installed)
+
+        Args:
+            path: Boundary file (default: COUNTY_BOUNDARIES_PATH or data/external/kenya_counties.geojson)
+            name_field: Attribute with the county name (default: first of NAME_FIELDS present)
+
+        Returns:
+            BoundaryIndex
+        """
+        path = path or os.getenv('COUNTY_BOUNDARIES_PATH') or DEFAULT_BOUNDARIES_PATH
+
+        with open(path, 'rb') as f:
+            fingerprint = hashlib.sha1(f.read()).hexdigest()
+
+        if path.lower().endswith(('.geojson', '.json')):
+            with open(path) as f:
+                features = json.load(f)['features']
+            properties = [feat.get('properties') or {} for feat in features]
+            geometries = [shape(feat['geometry']) for feat in features]
+        else:
+            import geopandas as gpd  # optional: only needed for shapefiles etc.
+            gdf = gpd.read_file(path).to_crs(epsg=4326)
+            properties = gdf.drop(columns='geometry').to_dict('records')
+            geometries = list(gdf.geometry)
+
+        field = name_field or next((f for f in NAME_FIELDS if properties and f in properties[0]), None)
+        if field is None:
+            raise ValueError(f"No county name field in {path}; pass name_field (tried {NAME_FIELDS})")
+
+        return cls([p.get(field) for p in properties], geometries, fingerprint)
+
+    def assign(self, lat, lon) -> np.ndarray:
+        """
+        County containing each point
+
+        Points on a shared border go to the first polygon in file order.
+
+        Args:
+            lat: Latitudes
+            lon: Longitudes
+
+        Returns:
+            County name per point (None outside every polygon)
+        """
+        points = shapely.points(np.asarray(lon, dtype=float), np.asarray(lat, dtype=float))
+        point_idx, poly_idx = self.tree.query(points, predicate='intersects')
+
+        # Lowest polygon index per point
+        order = np.lexsort((poly_idx, point_idx))
+        point_idx, poly_idx = point_idx[order], poly_idx[order]
+        first = np.r_[True, point_idx[1:] != point_idx[:-1]]
+
+        counties = np.full(len(points), None, dtype=object)
+        counties[point_idx[first]] = self.names[poly_idx[first]]
+        return counties
+
+
+def region_for_county(county) -> Optional[str]:
+    """Former province for a Kenyan county (None if unknown)"""
+    return _REGION_BY_NAME.get(normalize_name(county)) if county is not None else None
+
+
+class CountyAssigner:
+    """
+    County / region assignment with a per-facility SQLite cache
+
+    A cached assignment is reused while the facility's coordinates and the
+    boundary file are unchanged, so only new or moved facilities are
+    spatially joined.
+    """
+
+    def __init__(self, index: Optional[BoundaryIndex] = None, cache_path: Optional[str] = None):
+        """
+        Initialize assigner
+
+        Args:
+            index: BoundaryIndex (default: BoundaryIndex.from_file())
+            cache_path: SQLite file (default: data/cache/county_assignments.sqlite)
+        """
+        self.index = index or BoundaryIndex.from_file()
+        self.cache_path = os.path.abspath(cache_path or os.getenv('COUNTY_CACHE_PATH') or DEFAULT_CACHE_PATH)
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+
+        self._conn = sqlite3.connect(self.cache_path, timeout=30)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS county_assignments (
+                facility_id TEXT PRIMARY KEY,
+                latitude REAL NOT NULL,
+                longitude REAL NOT NULL,
+                boundaries TEXT NOT NULL,
+                county TEXT
+            )
+        """)
+        self._conn.commit()
+        self.last_report: Dict = {}
+
+    def assign(self, facilities: pd.DataFrame) -> pd.DataFrame:
+        """
+        County and region for each facility
+
+        Args:
+            facilities: DataFrame with facility_id, latitude, longitude
+
+        Returns:
+            DataFrame with county and region columns, same index as facilities
+        """
+        ids = facilities['facility_id'].astype(str).to_numpy()
+        lat = facilities['latitude'].to_numpy(dtype=float).round(6)
+        lon = facilities['longitude'].to_numpy(dtype=float).round(6)
+
+        cached = pd.read_sql_query(
+            "SELECT facility_id, latitude, longitude, county FROM county_assignments WHERE boundaries = ?",
+            self._conn, params=(self.index.fingerprint,)
+        ).set_index('facility_id').reindex(ids)
+
+        hit = (cached['latitude'].to_numpy() == lat) & (cached['longitude'].to_numpy() == lon)
+        counties = np.where(hit, cached['county'].to_numpy(dtype=object), None)
+
+        miss = ~hit
+        if miss.any():
+            counties[miss] = self.index.assign(lat[miss], lon[miss])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO county_assignments (facility_id, latitude, longitude, boundaries, county) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(fid, float(la), float(lo), self.index.fingerprint, c)
+                 for fid, la, lo, c in zip(ids[miss], lat[miss], lon[miss], counties[miss])]
+            )
+            self._conn.commit()
+
+        self.last_report = {'facilities': len(ids), 'cached': int(hit.sum()), 'joined': int(miss.sum()),
+                            'unassigned': int(pd.isna(counties).sum())}
+
+        return pd.DataFrame({
+            'county': counties,
+            'region': [region_for_county(c) for c in counties]
+        }, index=facilities.index)
@@ -0,0 +1,25 @@
+"""
+Config Loader Module
+Read YAML or JSON config files (rules, regions) by extension
+"""
+
+import json
+from typing import Dict
+
+
+def load_config_file(path: str) -> Dict:
+    """
+    Parse a YAML or JSON config file
+
+    Args:
+        path: .json file, or YAML for any other extension
+
+    Returns:
+        Parsed contents (empty dict for an empty YAML file)
+    """
+    with open(path) as f:
+        if path.lower().endswith('.json'):
+            return json.load(f)
+
+        import yaml  # pyyaml: only needed for YAML config files
+        return yaml.safe_load(f) or {}
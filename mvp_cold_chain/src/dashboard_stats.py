@@ -0,0 +1,73 @@
+"""
+Dashboard Stats Module
+Filtering, risk tiers and group-by summaries behind the Streamlit dashboard
+"""
+
+from typing import Iterable, List
+
+import pandas as pd
+
+from rule_dsl import RuleSet
+
+FAILURE_COLUMNS = [f'failure_day{day}' for day in range(1, 6)]
+
+
+def filter_facilities(df: pd.DataFrame, regions: Iterable, power_sources: Iterable,
+                      risk_levels: Iterable, rules: RuleSet) -> pd.DataFrame:
+    """
+    Apply the sidebar filters and add total_failures, risk_level and risk_color
+
+    Args:
+        df: Dataset with region, power_source and failure_dayN columns
+        regions: Selected regions
+        power_sources: Selected power sources
+        risk_levels: Selected risk tier levels
+        rules: RuleSet whose risk tiers map failure counts to levels
+
+    Returns:
+        Filtered copy
+    """
+    filtered = df[df['region'].isin(list(regions)) & df['power_source'].isin(list(power_sources))].copy()
+
+    filtered['total_failures'] = filtered[FAILURE_COLUMNS].sum(axis=1)
+    filtered['risk_level'] = rules.risk_tiers_for(filtered['total_failures'], 'level')
+    filtered['risk_color'] = rules.risk_tiers_for(filtered['total_failures'], 'color')
+
+    return filtered[filtered['risk_level'].isin(list(risk_levels))]
+
+
+def failure_stats(df: pd.DataFrame, by: str, means: List[str] = ()) -> pd.DataFrame:
+    """
+    Average failures and facility count per group
+
+    Args:
+        df: Output of filter_facilities
+        by: Group column
+        means: Extra columns to average
+
+    Returns:
+        DataFrame indexed by group with total_failures, facility_id (count) and `means`
+    """
+    return df.groupby(by, observed=True).agg({
+        'total_failures': 'mean',
+        'facility_id': 'count',
+        **{col: 'mean' for col in means}
+    })
+
+
+def daily_failures(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Failures per forecast day
+
+    Args:
+        df: Output of filter_facilities
+
+    Returns:
+        DataFrame with Day, Failures and Percentage (of facilities)
+    """
+    counts = df[FAILURE_COLUMNS].sum().to_numpy()
+    return pd.DataFrame({
+        'Day': [f'Day {day}' for day in range(1, len(FAILURE_COLUMNS) + 1)],
+        'Failures': counts,
+        'Percentage': counts / len(df) * 100
+    })
@@ -3,10 +3,38 @@ Kenya Health Facility Data Loader
 Fetches facility data from various sources
 """
 
+import numpy as np
 import pandas as pd
 import requests
 from typing import Dict, List, Optional
 import json
+import os
+
+from http_transport import HttpTransport, get_default_transport
+from healthsites_crawler import HealthsitesCrawler
+from spatial_index import deduplicate_facilities
+from facility_ingest import SchemaCSVLoader
+from admin_boundaries import CountyAssigner, BoundaryIndex, normalize_name
+from facility_store import FacilityStore
+
+# Amenity keyword rules, checked in order - the first match wins
+FACILITY_TYPE_RULES = [
+    (('hospital',), 'Hospital'),
+    (('clinic', 'health'), 'Clinic'),
+    (('center', 'centre'), 'Health Center'),
+    (('dispensary',), 'Dispensary'),
+    (('pharmacy', 'chemist'), 'Pharmacy'),
+]
+
+FACILITY_TYPES = [facility_type for _, facility_type in FACILITY_TYPE_RULES] + ['Other']
+
+# Heuristic power source per facility type (anything else: 'None')
+POWER_SOURCE_BY_TYPE = {
+    'Hospital': 'Grid',         # Assume grid power
+    'Clinic': 'Solar',          # Conservative estimate
+    'Dispensary': 'Solar',
+    'Health Center': 'Diesel'   # Backup generators common
+}
 
 class KenyaFacilityLoader:
     """
@@ -17,8 +45,16 @@ class KenyaFacilityLoader:
     2. Kenya Master Health Facility List (KMHFL) - if available
     """
 
-    def __init__(self):
-        self.healthsites_api = "https://healthsites.io/api/v2/facilities"
+    def __init__(self, transport: Optional[HttpTransport] = None):
+        """
+        Initialize loader
+
+        Args:
+            transport: HTTP transport (default: shared pooled transport)
+        """
+        api_root = os.getenv('HEALTHSITES_API_ROOT', 'https://healthsites.io')
+        self.healthsites_api = f"{api_root}/api/v2/facilities"
+        self.transport = transport or get_default_transport()
 
     def fetch_from_healthsites(self, country: str = "Kenya", limit: int = 1000) -> pd.DataFrame:
         """
@@ -33,11 +69,11 @@ class KenyaFacilityLoader:
         """
         print(f"Fetching facilities from Healthsites.io for {country}...")
 
-        all_facilities = []
+        all_features = []
         page = 1
         page_size = 100
 
-        while len(all_facilities) < limit:
+        while len(all_features) < limit:
             params = {
                 'country': country,
                 'page': page,
@@ -45,28 +81,13 @@ class KenyaFacilityLoader:
             }
 
             try:
-                response = requests.get(self.healthsites_api, params=params, timeout=30)
-                response.raise_for_status()
+                response = self.transport.get(self.healthsites_api, params=params, timeout=30)
                 data = response.json()
 
                 if 'features' not in data or not data['features']:
                     break
 
-                for feature in data['features']:
-                    props = feature['properties']
-                    coords = feature['geometry']['coordinates']
-
-                    facility = {
-                        'facility_id': f"HS_{props.get('uuid', '')}",
-                        'name': props.get('name', 'Unknown'),
-                        'latitude': coords[1],
-                        'longitude': coords[0],
-                        'facility_type': self._map_facility_type(props.get('amenity', '')),
-                        'source': 'healthsites.io',
-                        'completeness': props.get('completeness', 0)
-                    }
-
-                    all_facilities.append(facility)
+                all_features.extend(data['features'])
 
                 print(f"  Page {page}: {len(data['features'])} facilities")
 
@@ -79,9 +100,100 @@ class KenyaFacilityLoader:
                 print(f"Error fetching page {page}: {e}")
                 break
 
-        print(f"\nTotal facilities fetched: {len(all_facilities)}")
+        print(f"\nTotal facilities fetched: {len(all_features)}")
 
-        return pd.DataFrame(all_facilities)
+        return self._parse_features(all_features)
+
+    def crawl_healthsites(self, countries: Optional[List[str]] = None, limit: Optional[int] = None,
+                          output_dir: Optional[str] = None, max_workers: int = 8,
+                          page_size: int = 100) -> Dict[str, Dict]:
+        """
+        Crawl Healthsites.io concurrently, writing each page to disk
+
+        Resumable: rerunning fetches only the pages missing from output_dir.
+        Read the result back with load_healthsites_crawl().
+
+        Args:
+            countries: Country names (default: Kenya)
+            limit: Optional maximum number of facilities per country
+            output_dir: Page file root (default: data/raw/healthsites)
+            max_workers: Pages in flight at once
+            page_size: Facilities per page request
+
+        Returns:
+            Crawl summary per country (see HealthsitesCrawler.crawl)
+        """
+        crawler = HealthsitesCrawler(self.transport, self.healthsites_api, self._parse_features,
+                                     output_dir, page_size, max_workers)
+        results = {}
+
+        for country in countries or ["Kenya"]:
+            print(f"Crawling Healthsites.io for {country}...")
+            result = crawler.crawl(country, limit=limit)
+            results[country] = result
+
+            if result['complete']:
+                status = "complete"
+            elif result['stopped']:
+                status = f"stopped ({result['stopped']}) - rerun to resume"
+            else:
+                status = f"{len(result['failed_pages'])} pages failed - rerun to resume"
+            print(f"  ✓ {result['pages']} pages on disk ({result['fetched']} fetched now, "
+                  f"{result['facilities']} facilities) - {status}")
+
+        return results
+
+    def load_healthsites_crawl(self, countries: Optional[List[str]] = None,
+                               output_dir: Optional[str] = None) -> pd.DataFrame:
+        """
+        Load facilities written by crawl_healthsites
+
+        Args:
+            countries: Country names (default: Kenya)
+            output_dir: Page file root (default: data/raw/healthsites)
+
+        Returns:
+            DataFrame with facility data
+        """
+        countries = countries or ["Kenya"]
+        crawler = HealthsitesCrawler(self.transport, self.healthsites_api, self._parse_features, output_dir)
+        frames = [crawler.load(country) for country in countries]
+        frames = [f for f in frames if not f.empty]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        print(f"Loaded {len(df)} crawled facilities")
+        return df
+
+    def _parse_features(self, features: List[Dict]) -> pd.DataFrame:
+        """
+        Convert Healthsites GeoJSON features to facility records
+
+        Amenities are mapped to facility types in one map_facility_types
+        call for the whole batch.
+
+        Args:
+            features: 'features' list from one or more Healthsites pages
+
+        Returns:
+            DataFrame with one row per facility
+        """
+        if not features:
+            return pd.DataFrame()
+
+        props = [feature['properties'] for feature in features]
+        coords = [feature['geometry']['coordinates'] for feature in features]
+
+        df = pd.DataFrame({
+            'facility_id': [f"HS_{p.get('uuid', '')}" for p in props],
+            'name': [p.get('name', 'Unknown') for p in props],
+            'latitude': [c[1] for c in coords],
+            'longitude': [c[0] for c in coords],
+            'facility_type': pd.Series([p.get('amenity', '') for p in props], dtype=object),
+            'source': 'healthsites.io',
+            'completeness': [p.get('completeness', 0) for p in props]
+        })
+        df['facility_type'] = self.map_facility_types(df['facility_type'])
+
+        return df
 
     def _map_facility_type(self, amenity: str) -> str:
         """
@@ -95,56 +207,112 @@ class KenyaFacilityLoader:
         """
         amenity_lower = amenity.lower()
 
-        if 'hospital' in amenity_lower:
-            return 'Hospital'
-        elif 'clinic' in amenity_lower or 'health' in amenity_lower:
-            return 'Clinic'
-        elif 'center' in amenity_lower or 'centre' in amenity_lower:
-            return 'Health Center'
-        elif 'dispensary' in amenity_lower:
-            return 'Dispensary'
-        elif 'pharmacy' in amenity_lower or 'chemist' in amenity_lower:
-            return 'Pharmacy'
-        else:
-            return 'Other'
+        for keywords, facility_type in FACILITY_TYPE_RULES:
+            if any(keyword in amenity_lower for keyword in keywords):
+                return facility_type
 
-    def load_from_csv(self, filepath: str) -> pd.DataFrame:
+        return 'Other'
+
+    def map_facility_types(self, amenities: pd.Series) -> pd.Series:
+        """
+        Vectorized _map_facility_type for a whole column
+
+        Each distinct amenity string is mapped once and the result is
+        broadcast through the category codes, so cost scales with the
+        number of distinct amenities rather than rows.
+
+        Args:
+            amenities: Amenity strings from Healthsites (missing = 'Other')
+
+        Returns:
+            Categorical Series of standard facility types, same index
+        """
+        codes, uniques = pd.factorize(amenities.fillna('').astype(str))
+        type_codes = np.array([FACILITY_TYPES.index(self._map_facility_type(a)) for a in uniques], dtype=np.int8)
+
+        return pd.Series(
+            pd.Categorical.from_codes(type_codes[codes], categories=FACILITY_TYPES),
+            index=amenities.index, name='facility_type'
+        )
+
+    def load_from_csv(self, filepath: str, column_map: Optional[Dict[str, str]] = None,
+                      chunksize: Optional[int] = None, use_cache: bool = True) -> pd.DataFrame:
         """
         Load facilities from CSV file (e.g., from KMHFL download)
 
+        Reads only FACILITY_SCHEMA columns with compact dtypes and caches the
+        typed result next to the CSV (see SchemaCSVLoader). Raises if the file
+        is missing or lacks facility_id/latitude/longitude.
+
         Args:
             filepath: Path to CSV file
+            column_map: Source header → schema column renames (e.g. {'lat': 'latitude'})
+            chunksize: Rows per chunk for very large files (None = one pass)
+            use_cache: Use the Parquet cache
 
         Returns:
             DataFrame with facility data
         """
         print(f"Loading facilities from {filepath}...")
 
-        try:
-            df = pd.read_csv(filepath)
-            print(f"Loaded {len(df)} facilities from CSV")
-            return df
+        csv_loader = SchemaCSVLoader(column_map=column_map, chunksize=chunksize, use_cache=use_cache)
+        df = csv_loader.load(filepath)
 
-        except Exception as e:
-            print(f"Error loading CSV: {e}")
-            return pd.DataFrame()
+        report = csv_loader.last_report
+        source = "cache" if report['cached'] else "CSV"
+        print(f"Loaded {report['parsed']} facilities from {source} in {report['seconds']:.2f}s "
+              f"({report['rejected']} rows rejected)")
+
+        return df
+
+    def assign_counties(self, df: pd.DataFrame, boundaries_path: Optional[str] = None) -> pd.DataFrame:
+        """
+        Add county and region columns from local boundary polygons
+
+        Args:
+            df: DataFrame with facility_id, latitude, longitude
+            boundaries_path: GeoJSON/shapefile of counties (default: COUNTY_BOUNDARIES_PATH
+                or data/external/kenya_counties.geojson)
+
+        Returns:
+            DataFrame with county and region columns added
+        """
+        assigner = CountyAssigner(BoundaryIndex.from_file(boundaries_path))
+        df = df.copy()
+        df[['county', 'region']] = assigner.assign(df)
 
-    def filter_by_county(self, df: pd.DataFrame, counties: List[str]) -> pd.DataFrame:
+        report = assigner.last_report
+        print(f"Assigned counties: {report['joined']} joined, {report['cached']} from cache, "
+              f"{report['unassigned']} outside all boundaries")
+
+        return df
+
+    def filter_by_county(self, df: pd.DataFrame, counties: List[str],
+                         boundaries_path: Optional[str] = None) -> pd.DataFrame:
         """
         Filter facilities by county
 
+        Data without a county column (e.g. Healthsites) is assigned counties
+        from boundary polygons first. Names match regardless of case and
+        punctuation.
+
         Args:
             df: DataFrame with facilities
             counties: List of county names
+            boundaries_path: Boundary file for data without a county column
 
         Returns:
             Filtered DataFrame
         """
         if 'county' not in df.columns:
-            print("Warning: 'county' column not found in data")
-            return df
+            try:
+                df = self.assign_counties(df, boundaries_path)
+            except FileNotFoundError as e:
+                print(f"Warning: 'county' column not found in data and no boundary file ({e.filename})")
+                return df
 
-        filtered = df[df['county'].isin(counties)].copy()
+        wanted = {normalize_name(c) for c in counties}
+        filtered = df[df['county'].map(normalize_name, na_action='ignore').isin(wanted)].copy()
         print(f"Filtered to {len(filtered)} facilities in {counties}")
 
         return filtered
@@ -167,33 +335,45 @@ class KenyaFacilityLoader:
         """
         df = df.copy()
 
-        # Simple heuristic if no electrification data
-        def estimate_power_source(row):
-            facility_type = row.get('facility_type', 'Unknown')
+        # Simple heuristic if no electrification data (could refine with
+        # electrification_data): one lookup per distinct facility type,
+        # broadcast through the factorized codes
+        if 'facility_type' in df.columns:
+            codes, uniques = pd.factorize(df['facility_type'])
+            lookup = np.array([POWER_SOURCE_BY_TYPE.get(t, 'None') for t in uniques] + ['None'], dtype=object)
+            df['power_source'] = lookup[codes]  # code -1 (missing type) → 'None'
+        else:
+            df['power_source'] = 'None'
 
-            # Hospitals more likely to have power
-            if facility_type == 'Hospital':
-                return 'Grid'  # Assume grid power
+        print("Power source estimates added (heuristic-based)")
 
-            # Clinics/Dispensaries less likely
-            elif facility_type in ['Clinic', 'Dispensary']:
-                # Could refine with electrification_data
-                return 'Solar'  # Conservative estimate
+        return df
 
-            # Health centers - mixed
-            elif facility_type == 'Health Center':
-                return 'Diesel'  # Backup generators common
+    def to_store(self, df: pd.DataFrame) -> FacilityStore:
+        """
+        Convert facilities to the compact columnar store
 
-            else:
-                return 'None'
+        Args:
+            df: Facility DataFrame
 
-        df['power_source'] = df.apply(estimate_power_source, axis=1)
+        Returns:
+            FacilityStore (see memory_report())
+        """
+        return FacilityStore.from_frame(df)
 
-        print("Power source estimates added (heuristic-based)")
+    def from_store(self, store: FacilityStore) -> pd.DataFrame:
+        """
+        Convert a compact store back to a plain DataFrame
 
-        return df
+        Args:
+            store: FacilityStore
+
+        Returns:
+            DataFrame with the original columns and dtypes
+        """
+        return store.to_frame(restore_dtypes=True)
 
-    def prepare_for_model(self, df: pd.DataFrame) -> pd.DataFrame:
+    def prepare_for_model(self, df: pd.DataFrame, duplicate_radius_m: float = 50.0) -> pd.DataFrame:
         """
         Prepare facility data for model training
 
@@ -206,6 +386,8 @@ class KenyaFacilityLoader:
 
         Args:
             df: Raw facility DataFrame
+            duplicate_radius_m: Facilities closer than this are merged, keeping
+                the most complete record (0 = exact coordinate matches only)
 
         Returns:
             Cleaned DataFrame ready for modeling
@@ -223,8 +405,12 @@ class KenyaFacilityLoader:
         # Remove facilities without GPS coordinates
         df_clean = df_clean.dropna(subset=['latitude', 'longitude'])
 
-        # Remove duplicates
-        df_clean = df_clean.drop_duplicates(subset=['latitude', 'longitude'])
+        # Remove duplicates - the same site from different registries is
+        # often a few metres apart, so match within a radius
+        before = len(df_clean)
+        df_clean = deduplicate_facilities(df_clean, radius_m=duplicate_radius_m)
+        if before > len(df_clean):
+            print(f"Merged {before - len(df_clean)} near-duplicate facilities (within {duplicate_radius_m:g} m)")
 
         # Add power source if not present
         if 'power_source' not in df_clean.columns:
@@ -239,8 +425,9 @@ class KenyaFacilityLoader:
 if __name__ == "__main__":
     loader = KenyaFacilityLoader()
 
-    # Fetch from Healthsites.io
-    facilities = loader.fetch_from_healthsites(country="Kenya", limit=200)
+    # Crawl Healthsites.io (resumable - rerun to pick up failed pages)
+    loader.crawl_healthsites(countries=["Kenya"])
+    facilities = loader.load_healthsites_crawl(countries=["Kenya"])
 
     if not facilities.empty:
         print("\nSample facilities:")
@@ -0,0 +1,189 @@
+"""
+Facility CSV Ingestion Module
+Schema-typed, optionally chunked CSV loading with a Parquet cache keyed by file hash
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Column → dtype for facility registries (Healthsites exports, KMHFL downloads)
+FACILITY_SCHEMA = {
+    'facility_id': 'string',
+    'name': 'string',
+    'latitude': 'float32',
+    'longitude': 'float32',
+    'facility_type': 'category',
+    'power_source': 'category',
+    'county': 'category',
+    'source': 'category',
+    'completeness': 'float32'
+}
+
+REQUIRED_COLUMNS = ['facility_id', 'latitude', 'longitude']
+
+# Only these count as missing - 'None' is a valid power_source
+NA_VALUES = ['', 'NA', 'N/A', 'NaN', 'nan', 'null', 'NULL']
+
+
+def file_hash(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-1 of a file's contents, read in blocks"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SchemaCSVLoader:
+    """
+    Load CSVs against a declared schema
+
+    Only schema columns are read; text is parsed once and cast to compact
+    dtypes (category, float32). Rows missing a required column or with
+    coordinates that don't parse or fall outside valid ranges are rejected
+    and counted. The typed result is cached as Parquet in a .cache
+    directory next to the CSV, keyed by the CSV's content hash and the
+    schema, so later loads skip parsing entirely.
+    """
+
+    def __init__(self, schema: Optional[Dict[str, str]] = None,
+                 required: Optional[List[str]] = None,
+                 column_map: Optional[Dict[str, str]] = None,
+                 chunksize: Optional[int] = None, use_cache: bool = True):
+        """
+        Initialize loader
+
+        Args:
+            schema: Column → dtype ('string', 'category', 'float32', ...); default FACILITY_SCHEMA
+            required: Columns a row must have (default: facility_id, latitude, longitude)
+            column_map: Source header → schema column renames (e.g. {'lat': 'latitude'})
+            chunksize: Rows per chunk (None = read in one pass)
+            use_cache: Read/write the Parquet cache (needs pyarrow)
+        """
+        self.schema = dict(schema or FACILITY_SCHEMA)
+        self.required = list(required or REQUIRED_COLUMNS)
+        self.column_map = dict(column_map or {})
+        self.chunksize = chunksize
+        self.use_cache = use_cache and HAS_PYARROW
+        self.last_report: Dict = {}
+
+    def cache_path(self, path: str) -> str:
+        """Parquet cache file for a CSV (content hash + schema)"""
+        signature = json.dumps([self.schema, self.required, self.column_map], sort_keys=True)
+        key = hashlib.sha1((file_hash(path) + signature).encode('utf-8')).hexdigest()[:16]
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(os.path.dirname(os.path.abspath(path)), '.cache', f"{stem}-{key}.parquet")
+
+    def _read_kwargs(self, path: str) -> Dict:
+        header = pd.read_csv(path, nrows=0).columns
+        source = {self.column_map.get(c, c): c for c in header}
+
+        missing = [c for c in self.required if c not in source]
+        if missing:
+            raise ValueError(f"{path} is missing required columns: {missing}")
+
+        usecols = [source[c] for c in self.schema if c in source]
+        # Parse numbers after reading so bad values become rejects, not errors
+        dtype = {source[c]: str if t == 'category' else t
+                 for c, t in self.schema.items() if c in source and not t.startswith(('float', 'int'))}
+
+        return {'usecols': usecols, 'dtype': dtype, 'na_values': NA_VALUES, 'keep_default_na': False}
+
+    def _clean(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        chunk = chunk.rename(columns=self.column_map)
+
+        for col, dtype in self.schema.items():
+            if col in chunk.columns and dtype.startswith(('float', 'int')):
+                chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+
+        valid = chunk[self.required].notna().all(axis=1)
+        if 'latitude' in chunk.columns:
+            valid = valid & chunk['latitude'].between(-90, 90)
+        if 'longitude' in chunk.columns:
+            valid = valid & chunk['longitude'].between(-180, 180)
+
+        self._rejected += int((~valid).sum())
+        return chunk[valid.to_numpy()]
+
+    def _cast(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.astype({c: t for c, t in self.schema.items() if c in df.columns})
+
+    def iter_chunks(self, path: str) -> Iterator[pd.DataFrame]:
+        """
+        Read a CSV chunk by chunk (bypasses the cache)
+
+        Args:
+            path: CSV file
+
+        Yields:
+            Cleaned, typed chunks; last_report is complete once exhausted
+        """
+        start = time.time()
+        self._rejected = 0
+        parsed = 0
+
+        for chunk in pd.read_csv(path, chunksize=self.chunksize or 100_000, **self._read_kwargs(path)):
+            chunk = self._cast(self._clean(chunk))
+            parsed += len(chunk)
+            yield chunk
+
+        self.last_report = {'parsed': parsed, 'rejected': self._rejected, 'cached': False,
+                            'seconds': time.time() - start}
+
+    def load(self, path: str) -> pd.DataFrame:
+        """
+        Load a CSV as a typed DataFrame
+
+        Args:
+            path: CSV file
+
+        Returns:
+            Typed DataFrame of accepted rows (see last_report for counts)
+        """
+        start = time.time()
+        cache = self.cache_path(path) if self.use_cache else None
+
+        if cache and os.path.exists(cache):
+            df = pd.read_parquet(cache)
+            self.last_report = {'parsed': len(df), 'rejected': int(df.attrs.get('rejected', 0)),
+                                'cached': True, 'seconds': time.time() - start}
+            return df
+
+        self._rejected = 0
+        kwargs = self._read_kwargs(path)
+
+        if self.chunksize:
+            chunks = [self._clean(c) for c in pd.read_csv(path, chunksize=self.chunksize, **kwargs)]
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=kwargs['usecols'])
+        else:
+            try:
+                raw = pd.read_csv(path, engine='pyarrow', **kwargs) if HAS_PYARROW else None
+            except (ValueError, TypeError):
+                raw = None  # option not supported by this pyarrow version
+            if raw is None:
+                raw = pd.read_csv(path, **kwargs)
+            df = self._clean(raw).reset_index(drop=True)
+
+        # Categories built once over the full column, so chunks agree
+        df = self._cast(df)
+        df.attrs['rejected'] = self._rejected
+
+        if cache:
+            os.makedirs(os.path.dirname(cache), exist_ok=True)
+            df.to_parquet(cache + '.tmp', index=False)
+            os.replace(cache + '.tmp', cache)
+
+        self.last_report = {'parsed': len(df), 'rejected': self._rejected, 'cached': False,
+                            'seconds': time.time() - start}
+        return df
@@ -0,0 +1,230 @@
+"""
+Facility Store Module
+Compact columnar representation of facility / feature frames with memory reporting
+"""
+
+import os
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    STRING_DTYPE = 'object'
+
+DEFAULT_STORE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'processed', 'facilities_store.parquet'
+)
+
+# Mostly-unique text kept as strings; every other text column becomes a categorical
+UNIQUE_TEXT_COLUMNS = ['name', 'facility_name']
+
+FAILURE_PATTERN = re.compile(r'^failure_day(\d+)$')
+
+# Number of set bits for every int8 bitset value
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int8)
+
+
+def frame_memory(df: pd.DataFrame) -> pd.Series:
+    """Bytes per column (deep, including string payloads)"""
+    return df.memory_usage(deep=True, index=False)
+
+
+class FacilityStore:
+    """
+    Compact columnar facility store
+
+    - facility_id is interned: a categorical whose codes are integer
+      facility indices and whose categories are the distinct IDs
+    - other repeated text (facility_type, power_source, weather_main_dayN,
+      county, ...) is categorical; names use Arrow-backed strings
+    - float64 columns are float32, integer columns the smallest int type
+    - failure_day1..N are packed into one int8 bitset column 'failures'
+      (bit d-1 set = failure on day d)
+
+    Values are stored at float32 precision, so compute labels before
+    compacting rather than on a round-tripped frame.
+    """
+
+    def __init__(self, data: pd.DataFrame, columns: List[str], failure_days: int,
+                 source_bytes: Optional[Dict[str, int]] = None):
+        """
+        Initialize store (use from_frame or load)
+
+        Args:
+            data: Compact frame
+            columns: Column order of the original frame
+            failure_days: Number of failure_dayN columns packed into 'failures'
+            source_bytes: Bytes per column of the original frame
+        """
+        self.data = data
+        self.columns = columns
+        self.failure_days = failure_days
+        self.source_bytes = source_bytes or {}
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'FacilityStore':
+        """
+        Compact a facility or feature frame
+
+        Args:
+            df: Frame from a loader or the pipeline
+
+        Returns:
+            FacilityStore
+        """
+        failure_cols = sorted((c for c in df.columns if FAILURE_PATTERN.match(c)),
+                              key=lambda c: int(FAILURE_PATTERN.match(c).group(1)))
+        if len(failure_cols) > 7:
+            raise ValueError("int8 bitset holds at most 7 failure days")
+
+        data = {}
+        for col in df.columns:
+            if col in failure_cols:
+                continue
+            series = df[col]
+
+            if col in UNIQUE_TEXT_COLUMNS:
+                data[col] = series.astype(STRING_DTYPE)
+            elif pd.api.types.is_float_dtype(series):
+                data[col] = series.astype(np.float32)
+            elif pd.api.types.is_bool_dtype(series):
+                data[col] = series
+            elif pd.api.types.is_integer_dtype(series):
+                data[col] = pd.to_numeric(series, downcast='integer')
+            else:
+                # Mixed objects (dates from a fetch next to strings read back from
+                # CSV in incremental runs) as text, so categories have one type
+                if pd.api.types.is_object_dtype(series):
+                    series = series.where(series.isna(), series.astype(str))
+                data[col] = series.astype('category')
+
+        if failure_cols:
+            bits = df[failure_cols].to_numpy().astype(bool)
+            data['failures'] = (bits << np.arange(len(failure_cols))).sum(axis=1).astype(np.int8)
+
+        compact = pd.DataFrame(data, index=pd.RangeIndex(len(df)))
+        return cls(compact, list(df.columns), len(failure_cols), frame_memory(df).to_dict())
+
+    @property
+    def ids(self) -> pd.Index:
+        """Distinct facility IDs (facility index → ID)"""
+        return self.data['facility_id'].cat.categories
+
+    @property
+    def facility_idx(self) -> np.ndarray:
+        """Integer facility index per row"""
+        return self.data['facility_id'].cat.codes.to_numpy()
+
+    def failure_matrix(self) -> np.ndarray:
+        """Failures as a bool (rows × days) matrix"""
+        bits = self.data['failures'].to_numpy().astype(np.uint8)
+        return (bits[:, None] >> np.arange(self.failure_days, dtype=np.uint8)) & 1 == 1
+
+    def total_failures(self) -> np.ndarray:
+        """Failure days per row (popcount of the bitset)"""
+        return _POPCOUNT[self.data['failures'].to_numpy().astype(np.uint8)]
+
+    def to_frame(self, restore_dtypes: bool = False) -> pd.DataFrame:
+        """
+        Expand back to the original column layout
+
+        Args:
+            restore_dtypes: Also restore object strings, float64 and int64
+                (default keeps the compact dtypes, which pandas / plotly handle directly)
+
+        Returns:
+            DataFrame with the original columns, including failure_dayN
+        """
+        df = self.data.drop(columns='failures') if self.failure_days else self.data.copy()
+
+        if self.failure_days:
+            matrix = self.failure_matrix().astype(np.int8)
+            for day in range(1, self.failure_days + 1):
+                df[f'failure_day{day}'] = matrix[:, day - 1]
+
+        df = df[self.columns]
+
+        if restore_dtypes:
+            for col in df.columns:
+                if isinstance(df[col].dtype, pd.CategoricalDtype) or col in UNIQUE_TEXT_COLUMNS:
+                    df[col] = df[col].astype(object)
+                elif pd.api.types.is_float_dtype(df[col]):
+                    df[col] = df[col].astype(np.float64)
+                elif pd.api.types.is_integer_dtype(df[col]):
+                    df[col] = df[col].astype(np.int64)
+
+        return df
+
+    def memory_report(self) -> pd.DataFrame:
+        """
+        Bytes per column before and after compaction
+
+        Returns:
+            DataFrame indexed by column (plus TOTAL) with before, after and ratio
+        """
+        after = frame_memory(self.data).to_dict()
+        packed = [c for c in self.columns if FAILURE_PATTERN.match(c)]
+
+        rows = []
+        for col in self.columns:
+            if col in packed:
+                continue
+            rows.append((col, self.source_bytes.get(col, np.nan), after.get(col, np.nan)))
+        if packed:
+            rows.append((f"failures ({', '.join(packed)})",
+                         sum(self.source_bytes.get(c, 0) for c in packed), after['failures']))
+
+        report = pd.DataFrame(rows, columns=['column', 'before', 'after']).set_index('column')
+        report.loc['TOTAL'] = report.sum()
+        report['ratio'] = (report['before'] / report['after']).round(1)
+        return report
+
+    def print_memory_report(self):
+        report = self.memory_report()
+        total = report.loc['TOTAL']
+        print(f"  Memory: {total['before'] / 1e6:.2f} MB → {total['after'] / 1e6:.2f} MB "
+              f"({total['ratio']:.1f}x smaller)")
+
+    def save(self, path: Optional[str] = None) -> str:
+        """
+        Write the store to Parquet (dictionary-encoded categoricals, float32, int8)
+
+        Args:
+            path: Output file (default: data/processed/facilities_store.parquet)
+
+        Returns:
+            Path written
+        """
+        path = os.path.abspath(path or DEFAULT_STORE_PATH)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        data = self.data.copy()
+        data.attrs = {'columns': self.columns, 'failure_days': self.failure_days,
+                      'source_bytes': {k: int(v) for k, v in self.source_bytes.items()}}
+        data.to_parquet(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+        return path
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'FacilityStore':
+        """
+        Read a store written by save()
+
+        Args:
+            path: Parquet file (default: data/processed/facilities_store.parquet)
+
+        Returns:
+            FacilityStore
+        """
+        data = pd.read_parquet(path or DEFAULT_STORE_PATH)
+        meta = data.attrs
+        data.attrs = {}
+        return cls(data, meta['columns'], meta['failure_days'], meta.get('source_bytes'))
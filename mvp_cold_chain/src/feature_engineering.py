@@ -0,0 +1,239 @@
+"""
+Feature Engineering Module
+Temporal, power infrastructure and failure-label features for the model dataset
+"""
+
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from power_features import POWER_COLUMNS, PowerFeatureEngine
+from failure_labels import FailureLabelEngine
+
+FAILURE_COLUMNS = [f'failure_day{day}' for day in range(1, 6)]
+
+DRY_SEASON_MONTHS = [1, 2, 3, 6, 7, 8, 9, 10]
+RAINY_SEASON_MONTHS = [4, 5, 11, 12]
+
+
+def add_temporal_features(df: pd.DataFrame, month: Optional[int] = None) -> pd.DataFrame:
+    """
+    Add month and season flags
+
+    Args:
+        df: Dataset (modified in place)
+        month: Month to use (default: current month)
+
+    Returns:
+        The same DataFrame
+    """
+    month = month or datetime.now().month
+    df['month'] = month
+    df['is_dry_season'] = int(month in DRY_SEASON_MONTHS)
+    df['is_rainy_season'] = int(month in RAINY_SEASON_MONTHS)
+    return df
+
+
+def estimate_power_features(row: pd.Series) -> dict:
+    """
+    Estimate power infrastructure features based on geography
+    Uses latitude as proxy for infrastructure level (rough but realistic for Kenya)
+
+    Row-wise reference for PowerFeatureEngine, which the pipeline uses
+    """
+    lat = row['latitude']
+    power = row['power_source']
+    facility_type = row['facility_type']
+
+    # Estimate electrification based on latitude (rough proxy for Kenya)
+    # Northern Kenya (Turkana) = very low, Nairobi area = high, Coastal = moderate
+    if lat > 2:  # Far north (Turkana region)
+        electrification_est = 25
+        grid_reliability_est = 0.35
+    elif lat > 0:  # Mid-north
+        electrification_est = 40
+        grid_reliability_est = 0.55
+    elif lat > -2:  # Central (Nairobi)
+        electrification_est = 80
+        grid_reliability_est = 0.85
+    else:  # Coastal/south (Mombasa, Garissa)
+        electrification_est = 60
+        grid_reliability_est = 0.70
+
+    # Adjust for facility type (hospitals/health centers in better locations)
+    if facility_type == 'Hospital':
+        electrification_est += 15
+        grid_reliability_est += 0.10
+    elif facility_type == 'Health Center':
+        electrification_est += 5
+        grid_reliability_est += 0.05
+
+    # Estimate distance to grid based on power source
+    if power == 'Grid':
+        distance_est = np.random.uniform(1, 15)  # Close to grid
+    elif power == 'Solar':
+        distance_est = np.random.uniform(15, 50)  # Farther from grid
+    elif power == 'Diesel':
+        distance_est = np.random.uniform(25, 60)  # Remote
+    else:  # None
+        distance_est = np.random.uniform(40, 80)  # Very remote
+
+    # Calculate derived features
+    electrification_final = min(electrification_est, 95)
+    grid_reliability_final = min(grid_reliability_est, 0.95)
+    avg_power_hours = grid_reliability_final * 24
+
+    # Binary risk indicators
+    high_outage_risk = 1 if grid_reliability_final < 0.6 else 0
+    very_low_power = 1 if electrification_final < 30 else 0
+    remote_from_grid = 1 if distance_est > 20 else 0
+
+    # Composite vulnerability score (0-100, higher = more vulnerable)
+    vulnerability = (
+        (100 - electrification_final) * 0.4 +
+        distance_est * 0.3 +
+        (100 - grid_reliability_final * 100) * 0.3
+    )
+
+    return {
+        'electrification_rate': electrification_final,
+        'grid_reliability_score': grid_reliability_final,
+        'distance_to_grid_km': round(distance_est, 1),
+        'avg_power_hours_per_day': round(avg_power_hours, 1),
+        'high_outage_risk': high_outage_risk,
+        'very_low_power_access': very_low_power,
+        'remote_from_grid': remote_from_grid,
+        'power_vulnerability_score': round(vulnerability, 1),
+        'avg_outage_duration_hours': round(4.5 if high_outage_risk else 1.5, 1),
+        'outage_frequency_per_week': round(3.2 if high_outage_risk else 0.8, 1)
+    }
+
+
+def power_feature_frame(df: pd.DataFrame, seed: Optional[int] = None) -> pd.DataFrame:
+    """
+    Power infrastructure features for each row
+
+    Args:
+        df: Frame with latitude, power_source and facility_type
+        seed: Random seed for distance draws (default: POWER_FEATURE_SEED or 42)
+
+    Returns:
+        Frame with POWER_COLUMNS, same index as df
+    """
+    return PowerFeatureEngine(seed).compute(df)
+
+
+def predict_failure_per_day(row: pd.Series, clouds_3day: np.ndarray, temps_3day: np.ndarray) -> list:
+    """
+    Enhanced failure prediction including power infrastructure
+    Incorporates grid reliability, electrification, and distance to grid
+
+    clouds_3day / temps_3day are this facility's trailing 3-day means
+    (index day-1), precomputed for all facilities with rolling_mean
+
+    Row-wise reference for the default rules in config/cold_chain_rules.yaml,
+    which the pipeline evaluates with FailureLabelEngine
+    """
+    failures = []
+
+    # Extract power infrastructure features
+    grid_reliability = row['grid_reliability_score']
+    electrification = row['electrification_rate']
+    distance_to_grid = row['distance_to_grid_km']
+    power = row['power_source']
+
+    for day in range(1, 6):  # 5 days
+        temp = row[f'temp_max_day{day}']
+        clouds = row[f'clouds_day{day}']
+
+        failure = False
+
+        # ========== GRID POWER FACILITIES ==========
+        if power == 'Grid':
+            # Rule 1: Unreliable grid + heat
+            if grid_reliability < 0.6 and temp > 33:
+                failure = True  # Frequent outages during hot weather
+
+            # Rule 2: Low electrification area (proxy for poor grid)
+            if electrification < 40 and temp > 30:
+                failure = True  # Poor grid infrastructure can't handle load
+
+            # Rule 3: Heat wave strains grid
+            if row.get('heat_wave_indicator', 0) == 1 and grid_reliability < 0.75:
+                failure = True  # Grid fails under high AC demand
+
+        # ========== SOLAR POWER FACILITIES ==========
+        elif power == 'Solar':
+            # Rule 4: Cloudy + no grid backup
+            if clouds > 70 and temp > 32:
+                failure = True  # Battery drains, no backup
+
+            # Rule 5: Multi-day cloudy period
+            if day >= 3:
+                avg_clouds_3day = clouds_3day[day - 1]
+                if avg_clouds_3day > 65:
+                    failure = True  # Battery fully depleted
+
+            # Rule 6: Heat + clouds combination
+            if temp > 35 and clouds > 60:
+                failure = True  # High cooling load + low charging
+
+        # ========== DIESEL BACKUP ==========
+        elif power == 'Diesel':
+            # Rule 7: Remote location (fuel supply issues)
+            if distance_to_grid > 50 and day >= 4:
+                failure = True  # Fuel runs out by day 4-5
+
+            # Rule 8: Extreme heat (generator overload)
+            if temp > 38:
+                failure = True  # Generator can't keep up with cooling load
+
+        # ========== NO POWER ==========
+        elif power == 'None':
+            # Rule 9: Any significant heat = failure
+            if temp > 32:
+                failure = True  # No refrigeration at all
+
+        # ========== UNIVERSAL RULES (All power types) ==========
+
+        # Rule 10: Extreme heat overwhelms any system
+        if temp > 40:
+            failure = True
+
+        # Rule 11: Low electrification area + unreliable power
+        if electrification < 30 and power in ['Grid', 'Diesel']:
+            if temp > 30:
+                failure = True  # Infrastructure too poor to support cold chain
+
+        # Rule 12: Very remote facilities (>30km from grid)
+        if distance_to_grid > 30 and power != 'Solar':
+            if temp > 32 and day >= 3:
+                failure = True  # Isolation + time = failure
+
+        # Rule 13: Heat accumulation (general)
+        if day >= 3:
+            avg_temp = temps_3day[day - 1]
+            if avg_temp > 33 and grid_reliability < 0.7:
+                failure = True  # Accumulated stress + unreliable power
+
+        failures.append(1 if failure else 0)
+
+    return failures
+
+
+def failure_label_frame(df: pd.DataFrame, engine: Optional[FailureLabelEngine] = None) -> pd.DataFrame:
+    """
+    Daily failure labels for each row
+
+    Args:
+        df: Frame with weather (temp_max_dayN, clouds_dayN, heat_wave_indicator),
+            power_source and POWER_COLUMNS
+        engine: FailureLabelEngine to use (pass one to choose the rules or read
+            its rule hit counts; default: rules from load_rules())
+
+    Returns:
+        Frame with FAILURE_COLUMNS (0/1), same index as df
+    """
+    return (engine or FailureLabelEngine(days=len(FAILURE_COLUMNS))).compute(df)
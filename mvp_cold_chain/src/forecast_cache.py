@@ -0,0 +1,225 @@
+"""
+Forecast Cache Module
+Persistent on-disk (SQLite) cache for raw OpenWeatherMap payloads
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'cache', 'forecast_cache.sqlite'
+)
+
+# The entry count is tracked in memory; re-read it from the table every
+# this many puts to pick up rows added or removed by other processes
+RECOUNT_EVERY = 1000
+
+
+class ForecastCache:
+    """
+    SQLite-backed forecast cache shared by pipeline runs and notebooks
+
+    Entries are keyed by endpoint, rounded lat/lon and forecast issuance
+    window, expire after a TTL, and are evicted least-recently-used once
+    the cache holds more than max_entries payloads.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: int = 3 * 3600,
+                 max_entries: int = 50000, precision: int = 2,
+                 issuance_window_seconds: int = 3 * 3600):
+        """
+        Initialize cache
+
+        Args:
+            path: SQLite file (or set FORECAST_CACHE_PATH in .env)
+            ttl_seconds: Maximum age of a cached payload
+            max_entries: Size cap before LRU eviction
+            precision: Decimal places lat/lon are rounded to (2 ≈ 1 km)
+            issuance_window_seconds: Forecast update cycle (OWM 5-day = 3 hours)
+        """
+        self.path = os.path.abspath(path or os.getenv('FORECAST_CACHE_PATH') or DEFAULT_CACHE_PATH)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.precision = precision
+        self.issuance_window_seconds = issuance_window_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS forecasts (
+                key TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON forecasts(last_access)")
+        self._conn.commit()
+
+        self._entries = self._count()
+        self._puts = 0
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM forecasts").fetchone()[0]
+
+    def make_key(self, endpoint: str, lat: float, lon: float, now: Optional[float] = None) -> str:
+        """
+        Build cache key for a request
+
+        Args:
+            endpoint: API endpoint name (e.g. 'forecast', 'onecall')
+            lat: Latitude
+            lon: Longitude
+            now: Timestamp used to pick the issuance window (default: current time)
+
+        Returns:
+            Cache key string
+        """
+        window = int((now or time.time()) // self.issuance_window_seconds)
+        return f"{endpoint}:{round(lat, self.precision):.{self.precision}f}:" \
+               f"{round(lon, self.precision):.{self.precision}f}:{window}"
+
+    def get(self, endpoint: str, lat: float, lon: float) -> Optional[Dict]:
+        """
+        Look up a cached payload
+
+        Args:
+            endpoint: API endpoint name
+            lat: Latitude
+            lon: Longitude
+
+        Returns:
+            Cached forecast JSON, or None on miss/expiry
+        """
+        now = time.time()
+        key = self.make_key(endpoint, lat, lon, now)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM forecasts WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE forecasts SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(zlib.decompress(row[0]))
+
+    def contains(self, endpoint: str, lat: float, lon: float) -> bool:
+        """
+        Check for a fresh entry without touching hit/miss counters
+
+        Args:
+            endpoint: API endpoint name
+            lat: Latitude
+            lon: Longitude
+
+        Returns:
+            True if get() would return a payload
+        """
+        now = time.time()
+        key = self.make_key(endpoint, lat, lon, now)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at FROM forecasts WHERE key = ?", (key,)
+            ).fetchone()
+
+        return row is not None and now - row[0] <= self.ttl_seconds
+
+    def put(self, endpoint: str, lat: float, lon: float, payload: Dict):
+        """
+        Store a payload, evicting least-recently-used entries over the size cap
+
+        Args:
+            endpoint: API endpoint name
+            lat: Latitude
+            lon: Longitude
+            payload: Forecast JSON from the API
+        """
+        now = time.time()
+        key = self.make_key(endpoint, lat, lon, now)
+        blob = zlib.compress(json.dumps(payload).encode('utf-8'))
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE forecasts SET payload = ?, created_at = ?, last_access = ? WHERE key = ?",
+                (blob, now, now, key)
+            )
+            if cursor.rowcount == 0:
+                self._conn.execute(
+                    "INSERT INTO forecasts (key, payload, created_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, blob, now, now)
+                )
+                self._entries += 1
+
+            self._puts += 1
+            if self._puts % RECOUNT_EVERY == 0:
+                self._entries = self._count()
+
+            if self._entries > self.max_entries:
+                cursor = self._conn.execute(
+                    "DELETE FROM forecasts WHERE key IN "
+                    "(SELECT key FROM forecasts ORDER BY last_access ASC LIMIT ?)",
+                    (self._entries - self.max_entries,)
+                )
+                self._entries -= cursor.rowcount
+                self.evictions += cursor.rowcount
+
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """
+        Delete entries older than the TTL
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM forecasts WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self._conn.commit()
+            self._entries -= cursor.rowcount
+            return cursor.rowcount
+
+    def clear(self):
+        """Remove every cached payload"""
+        with self._lock:
+            self._conn.execute("DELETE FROM forecasts")
+            self._conn.commit()
+            self._entries = 0
+
+    def stats(self) -> Dict:
+        """
+        Cache statistics
+
+        Returns:
+            Dictionary with hits, misses, hit_rate, evictions and entries
+        """
+        with self._lock:
+            entries = self._entries = self._count()
+
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': entries
+        }
@@ -0,0 +1,251 @@
+"""
+Forecast Fetcher Module
+Concurrent, rate-limited forecast fetching for many facilities
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from forecast_parser import BatchForecastParser
+from spatial_grid import GridPlanner
+
+
+class QuotaExhausted(Exception):
+    """Raised when the daily API quota has been used up"""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiter
+
+    Two buckets are kept:
+    - a per-second bucket (smooths bursts, caller blocks until a token is free)
+    - an optional per-day bucket (hard quota, caller is refused once empty)
+
+    Free tier reference: 60 calls/minute, 1,000 calls/day
+    """
+
+    def __init__(self, calls_per_second: float = 1.0, calls_per_day: Optional[int] = None,
+                 burst: Optional[int] = None):
+        """
+        Initialize limiter
+
+        Args:
+            calls_per_second: Sustained request rate
+            calls_per_day: Daily quota (None = unlimited)
+            burst: Max tokens available at once (defaults to one second of calls)
+        """
+        if calls_per_second <= 0:
+            raise ValueError("calls_per_second must be positive")
+
+        self.rate = float(calls_per_second)
+        self.capacity = float(burst or max(1, int(calls_per_second)))
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+
+        self.calls_per_day = calls_per_day
+        self.daily_tokens = float(calls_per_day) if calls_per_day else None
+        self.daily_rate = calls_per_day / 86400.0 if calls_per_day else 0.0
+
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self.last_refill
+        self.last_refill = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        if self.daily_tokens is not None:
+            self.daily_tokens = min(float(self.calls_per_day), self.daily_tokens + elapsed * self.daily_rate)
+
+    def acquire(self) -> bool:
+        """
+        Take one token, waiting for the per-second bucket if needed
+
+        Returns:
+            True if a call may be made, False if the daily quota is exhausted
+        """
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+
+                if self.daily_tokens is not None and self.daily_tokens < 1:
+                    return False
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    if self.daily_tokens is not None:
+                        self.daily_tokens -= 1
+                    return True
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+    @property
+    def remaining_today(self) -> Optional[int]:
+        """Calls left in the daily quota (None = unlimited)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return None if self.daily_tokens is None else int(self.daily_tokens)
+
+
+class ForecastFetcher:
+    """
+    Fetch forecast features for many facilities in parallel
+
+    Requests run on a thread pool; every request, transport retries
+    included, first takes a token from the limiter, so throughput is set by
+    the quota rather than by request latency.
+    Raw payloads are then parsed together by BatchForecastParser.
+    """
+
+    FACILITY_COLUMNS = {
+        'facility_id': 'facility_id',
+        'facility_name': 'name',
+        'latitude': 'latitude',
+        'longitude': 'longitude',
+        'facility_type': 'facility_type',
+        'power_source': 'power_source'
+    }
+
+    def __init__(self, weather_api, calls_per_second: float = 1.0,
+                 calls_per_day: Optional[int] = 1000, max_workers: int = 8):
+        """
+        Initialize fetcher
+
+        Args:
+            weather_api: WeatherAPI instance (weather_api_v2)
+            calls_per_second: Sustained request rate
+            calls_per_day: Daily quota (None = unlimited)
+            max_workers: Number of concurrent requests
+        """
+        self.weather_api = weather_api
+        self.limiter = TokenBucket(calls_per_second, calls_per_day)
+        self.max_workers = max_workers
+        self.parser = BatchForecastParser()
+        self.api_calls = 0
+        self._call_budget: Optional[int] = None
+        self._calls_lock = threading.Lock()
+
+    def _take_token(self):
+        # Called by the transport before every request it sends (retries
+        # included); cache hits never reach it and so don't spend quota
+        with self._calls_lock:
+            if self._call_budget is not None:
+                if self._call_budget <= 0:
+                    raise QuotaExhausted()
+                self._call_budget -= 1
+        if not self.limiter.acquire():
+            raise QuotaExhausted()
+        with self._calls_lock:
+            self.api_calls += 1
+
+    def _fetch_one(self, lat: float, lon: float) -> Optional[Dict]:
+        return self.weather_api.get_5day_forecast(lat=lat, lon=lon, before_request=self._take_token)
+
+    def fetch_locations(self, lats: List[float], lons: List[float], days: int = 5,
+                        labels: Optional[List[str]] = None,
+                        max_calls: Optional[int] = None) -> List[Optional[Dict]]:
+        """
+        Fetch forecast features for a list of coordinates
+
+        Args:
+            lats: Latitudes
+            lons: Longitudes
+            days: Number of forecast days per location
+            labels: Optional names used in error messages
+            max_calls: Hard cap on API calls for this fetch (e.g. the calls
+                reserved from a QuotaLedger); None = limiter only
+
+        Returns:
+            Feature dict (or None on failure) for each location, in input order
+        """
+        payloads: List[Optional[Dict]] = [None] * len(lats)
+        skipped_quota = 0
+
+        # Missing coordinates would be sent to the API as 'nan'
+        located = [i for i, (lat, lon) in enumerate(zip(lats, lons))
+                   if np.isfinite(lat) and np.isfinite(lon)]
+        if len(located) < len(lats):
+            print(f"⚠️  {len(lats) - len(located)} locations without valid coordinates skipped")
+
+        self._call_budget = max_calls
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._fetch_one, lats[i], lons[i]): i for i in located}
+
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Fetching forecasts"):
+                i = futures[future]
+
+                try:
+                    payloads[i] = future.result()
+                except QuotaExhausted:
+                    skipped_quota += 1
+                except Exception as e:
+                    label = labels[i] if labels else f"({lats[i]}, {lons[i]})"
+                    print(f"\nError for {label}: {e}")
+
+        self._call_budget = None
+
+        if skipped_quota:
+            print(f"\n⚠️  Daily quota exhausted: {skipped_quota} locations not fetched")
+
+        # Parse every payload in one vectorized pass
+        features = self.parser.features(payloads, days=days)
+        results: List[Optional[Dict]] = [None] * len(lats)
+        for i, row in zip(features.index, features.to_dict('records')):
+            results[i] = row
+
+        return results
+
+    def fetch(self, facilities: pd.DataFrame, days: int = 5, planner: Optional[GridPlanner] = None,
+              max_calls: Optional[int] = None) -> Tuple[List[Dict], List[str]]:
+        """
+        Fetch forecast features for every facility
+
+        Args:
+            facilities: DataFrame with facility_id, name, latitude, longitude,
+                facility_type and power_source columns
+            days: Number of forecast days per facility
+            planner: Optional GridPlanner - fetch once per grid cell and fan
+                the features out to every facility in the cell
+            max_calls: Hard cap on API calls (see fetch_locations)
+
+        Returns:
+            (weather_data, failed_facilities) - feature rows in input order and
+            the facility_ids that could not be fetched
+        """
+        records = facilities.to_dict('records')
+
+        if planner is not None:
+            cells, cell_index = planner.plan(facilities)
+            planner.print_report()
+            cell_features = self.fetch_locations(
+                cells['latitude'].tolist(), cells['longitude'].tolist(), days,
+                labels=cells['cell_id'].tolist(), max_calls=max_calls
+            )
+            per_facility = [cell_features[c] if c >= 0 else None for c in cell_index]
+        else:
+            per_facility = self.fetch_locations(
+                [rec['latitude'] for rec in records], [rec['longitude'] for rec in records], days,
+                labels=[rec['name'] for rec in records], max_calls=max_calls
+            )
+
+        weather_data = []
+        failed_facilities = []
+
+        for facility, features in zip(records, per_facility):
+            if not features:
+                failed_facilities.append(facility['facility_id'])
+                continue
+
+            row = dict(features)
+            for col, src in self.FACILITY_COLUMNS.items():
+                row[col] = facility[src]
+            weather_data.append(row)
+
+        return weather_data, failed_facilities
@@ -0,0 +1,227 @@
+"""
+Batch Forecast Parser Module
+Vectorized 3-hourly → daily aggregation for many facilities at once
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from run_length import detect_runs
+
+# Variables kept from each 3-hour step (order = last axis of ForecastBatch.values)
+VARIABLES = ['temp', 'clouds', 'humidity', 'wind_speed', 'pressure']
+
+# Daily aggregate → feature column prefix (temp_max → temp_max_day1, ...), in output order
+DAILY_FEATURES = {
+    'temp_max': 'temp_max_day',
+    'temp_min': 'temp_min_day',
+    'temp_day': 'temp_day',
+    'clouds': 'clouds_day',
+    'humidity': 'humidity_day',
+    'wind_speed': 'wind_speed_day'
+}
+
+
+class ForecastBatch:
+    """
+    N raw 5-day/3-hour payloads stacked into arrays
+
+    Attributes:
+        values: float array (facility × timestep × variable), NaN where missing
+        dt: int64 array (facility × timestep) of UTC timestamps
+        tz_offset: int64 array (facility,) of UTC offsets in seconds (city.timezone)
+        weather_code: int16 array (facility × timestep) indexing weather_labels, -1 where missing
+        weather_labels: list of weather_main strings
+        valid: bool array (facility × timestep)
+    """
+
+    def __init__(self, values, dt, tz_offset, weather_code, weather_labels, valid):
+        self.values = values
+        self.dt = dt
+        self.tz_offset = tz_offset
+        self.weather_code = weather_code
+        self.weather_labels = weather_labels
+        self.valid = valid
+
+    @property
+    def n_facilities(self) -> int:
+        return self.values.shape[0]
+
+
+class BatchForecastParser:
+    """
+    Parse many OpenWeatherMap 5-day/3-hour payloads in one pass
+
+    Days are bucketed in each location's own timezone and daily
+    min/max/mean/mode are computed with segment reductions, so the cost is
+    a fixed number of array operations regardless of facility count.
+    """
+
+    def __init__(self, max_steps: int = 40):
+        """
+        Initialize parser
+
+        Args:
+            max_steps: Max 3-hour steps per payload (5 days × 8 = 40)
+        """
+        self.max_steps = max_steps
+
+    def stack(self, payloads: List[Optional[Dict]]) -> ForecastBatch:
+        """
+        Stack raw payloads into a facility × timestep × variable array
+
+        Args:
+            payloads: Raw forecast JSON per facility (None for failed fetches)
+
+        Returns:
+            ForecastBatch
+        """
+        n, t = len(payloads), self.max_steps
+        values = np.full((n, t, len(VARIABLES)), np.nan)
+        dt = np.zeros((n, t), dtype=np.int64)
+        tz_offset = np.zeros(n, dtype=np.int64)
+        weather_code = np.full((n, t), -1, dtype=np.int16)
+        valid = np.zeros((n, t), dtype=bool)
+        labels: Dict[str, int] = {}
+
+        for i, payload in enumerate(payloads):
+            if not payload or not payload.get('list'):
+                continue
+
+            items = payload['list'][:t]
+            k = len(items)
+
+            values[i, :k] = [
+                (it['main']['temp'], it['clouds']['all'], it['main']['humidity'],
+                 it['wind']['speed'], it['main']['pressure'])
+                for it in items
+            ]
+            dt[i, :k] = [it['dt'] for it in items]
+            weather_code[i, :k] = [labels.setdefault(it['weather'][0]['main'], len(labels)) for it in items]
+            tz_offset[i] = payload.get('city', {}).get('timezone', 0)
+            valid[i, :k] = True
+
+        return ForecastBatch(values, dt, tz_offset, weather_code, list(labels), valid)
+
+    def daily(self, batch: ForecastBatch, days: int = 5, pad: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Aggregate a batch to daily values
+
+        Args:
+            batch: Stacked payloads
+            days: Number of days to keep
+            pad: Fill missing trailing days with the last available day
+
+        Returns:
+            Dictionary of (facility × day) arrays: local_day (days since
+            epoch in local time, -1 if missing), temp_min, temp_max, temp_day,
+            clouds, humidity, wind_speed, pressure, weather_main (codes), plus
+            'has_data' (facility,) bool
+        """
+        n = batch.n_facilities
+
+        # Local calendar day of every step, then dense rank within each facility
+        local_day = (batch.dt + batch.tz_offset[:, None]) // 86400
+        new_day = np.ones_like(batch.valid)
+        new_day[:, 1:] = local_day[:, 1:] != local_day[:, :-1]
+        day_rank = np.cumsum(new_day, axis=1) - 1
+
+        keep = batch.valid & (day_rank < days)
+        fac_idx, step_idx = np.nonzero(keep)
+        rank = day_rank[fac_idx, step_idx]
+
+        out = {name: np.full((n, days), np.nan) for name in
+               ['temp_min', 'temp_max', 'temp_day', 'clouds', 'humidity', 'wind_speed', 'pressure']}
+        out['weather_main'] = np.full((n, days), -1, dtype=np.int16)
+        out['local_day'] = np.full((n, days), -1, dtype=np.int64)
+
+        if len(fac_idx) == 0:
+            out['has_data'] = np.zeros(n, dtype=bool)
+            return out
+
+        # Segments = runs of steps sharing (facility, day); rows are already ordered
+        seg_key = fac_idx * days + rank
+        starts = np.flatnonzero(np.r_[True, seg_key[1:] != seg_key[:-1]])
+        counts = np.diff(np.r_[starts, len(seg_key)])
+        seg_fac, seg_day = fac_idx[starts], rank[starts]
+        out['local_day'][seg_fac, seg_day] = local_day[fac_idx[starts], step_idx[starts]]
+
+        vals = batch.values[fac_idx, step_idx]
+        temp = vals[:, VARIABLES.index('temp')]
+
+        out['temp_min'][seg_fac, seg_day] = np.minimum.reduceat(temp, starts)
+        out['temp_max'][seg_fac, seg_day] = np.maximum.reduceat(temp, starts)
+
+        sums = np.add.reduceat(vals, starts, axis=0) / counts[:, None]
+        out['temp_day'][seg_fac, seg_day] = sums[:, VARIABLES.index('temp')]
+        for name in ['clouds', 'humidity', 'wind_speed', 'pressure']:
+            out[name][seg_fac, seg_day] = sums[:, VARIABLES.index(name)]
+
+        # Mode of weather_main per segment via (segment × label) counts
+        n_labels = max(len(batch.weather_labels), 1)
+        seg_id = np.repeat(np.arange(len(starts)), counts)
+        codes = batch.weather_code[fac_idx, step_idx].astype(np.int64)
+        label_counts = np.bincount(seg_id * n_labels + codes,
+                                   minlength=len(starts) * n_labels).reshape(len(starts), n_labels)
+        out['weather_main'][seg_fac, seg_day] = label_counts.argmax(axis=1)
+
+        has_day = out['local_day'] >= 0
+
+        if pad:
+            # Repeat the last available day; padded days continue the calendar
+            last = np.maximum.accumulate(np.where(has_day, np.arange(days), 0), axis=1)
+            rows = np.arange(n)[:, None]
+            for name in out:
+                out[name] = out[name][rows, last]
+            out['local_day'] = np.where(has_day[:, :1], out['local_day'] + np.arange(days) - last, -1)
+
+        out['has_data'] = has_day[:, 0]
+        return out
+
+    def features(self, payloads: List[Optional[Dict]], days: int = 5,
+                 heat_threshold: float = 35.0, heat_days: int = 3) -> pd.DataFrame:
+        """
+        Build the model feature frame for every payload at once
+
+        Output columns match WeatherAPI.get_forecast_features
+        (forecast_date, num_days, aggregates, heat_wave_indicator, then
+        temp_max_dayN / temp_min_dayN / temp_dayN / clouds_dayN /
+        humidity_dayN / wind_speed_dayN).
+
+        Args:
+            payloads: Raw forecast JSON per facility (None for failed fetches)
+            days: Number of forecast days
+            heat_threshold: Heat wave temperature threshold (°C)
+            heat_days: Minimum consecutive hot days for a heat wave
+
+        Returns:
+            DataFrame indexed by payload position; failed payloads are omitted
+        """
+        daily = self.daily(self.stack(payloads), days)
+        ok = daily['has_data']
+        d = {name: arr[ok] for name, arr in daily.items() if name != 'has_data'}
+
+        heat_wave = detect_runs(d['temp_max'], heat_threshold, heat_days)
+
+        columns = {
+            'forecast_date': datetime.now().date(),
+            'num_days': days,
+            'max_temp_7d': d['temp_max'].max(axis=1),
+            'min_temp_7d': d['temp_min'].min(axis=1),
+            'avg_temp_7d': d['temp_day'].mean(axis=1),
+            'temp_above_35_days': (d['temp_max'] > 35).sum(axis=1),
+            'temp_above_38_days': (d['temp_max'] > 38).sum(axis=1),
+            'avg_cloud_cover_7d': d['clouds'].mean(axis=1),
+            'cloudy_days': (d['clouds'] > 60).sum(axis=1),
+            'avg_humidity_7d': d['humidity'].mean(axis=1),
+            'heat_wave_indicator': heat_wave['indicator']
+        }
+
+        for day in range(days):
+            for name, prefix in DAILY_FEATURES.items():
+                columns[f'{prefix}{day + 1}'] = d[name][:, day]
+
+        return pd.DataFrame(columns, index=np.flatnonzero(ok))
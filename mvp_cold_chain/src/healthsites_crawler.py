@@ -0,0 +1,223 @@
+"""
+Healthsites Crawler Module
+Concurrent, resumable crawl of the paginated Healthsites.io facility API
+"""
+
+import glob
+import json
+import math
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+import pandas as pd
+import requests
+from tqdm import tqdm
+
+from http_transport import CircuitOpenError
+
+DEFAULT_OUTPUT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'raw', 'healthsites'
+)
+
+STATE_FILE = '_crawl_state.json'
+
+
+def _slug(country: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', country.lower()).strip('_')
+
+
+class HealthsitesCrawler:
+    """
+    Crawl Healthsites.io pages concurrently with on-disk checkpoints
+
+    Each completed page is written straight to its own CSV
+    (<output_dir>/<country>/page-00001.csv), so finished pages double as
+    the checkpoint: an interrupted or partly failed crawl picks up only the
+    pages that are missing. The last page number, once seen, is kept in
+    _crawl_state.json so a resumed crawl doesn't probe past the end.
+    """
+
+    def __init__(self, transport, api_url: str, parse_features: Callable[[List[Dict]], pd.DataFrame],
+                 output_dir: Optional[str] = None, page_size: int = 100, max_workers: int = 8,
+                 max_consecutive_failures: int = 10):
+        """
+        Initialize crawler
+
+        Args:
+            transport: HTTP transport with get(url, params, timeout)
+            api_url: Healthsites facilities endpoint
+            parse_features: Turns a page of GeoJSON features into a facility DataFrame
+            output_dir: Root for page files (default: data/raw/healthsites)
+            page_size: Facilities per page request
+            max_workers: Pages in flight at once
+            max_consecutive_failures: Failed pages in a row before the crawl stops
+        """
+        self.transport = transport
+        self.api_url = api_url
+        self.parse_features = parse_features
+        self.output_dir = os.path.abspath(output_dir or DEFAULT_OUTPUT_DIR)
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.max_consecutive_failures = max_consecutive_failures
+
+    def country_dir(self, country: str) -> str:
+        return os.path.join(self.output_dir, _slug(country))
+
+    def _page_path(self, country: str, page: int) -> str:
+        return os.path.join(self.country_dir(country), f"page-{page:05d}.csv")
+
+    def _load_state(self, country: str) -> Dict:
+        path = os.path.join(self.country_dir(country), STATE_FILE)
+        if not os.path.exists(path):
+            return {'page_size': self.page_size, 'last_page': None}
+        with open(path) as f:
+            return json.load(f)
+
+    def _save_state(self, country: str, state: Dict):
+        path = os.path.join(self.country_dir(country), STATE_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(state, f)
+        os.replace(path + '.tmp', path)
+
+    def done_pages(self, country: str) -> Set[int]:
+        """Page numbers already on disk for a country"""
+        files = glob.glob(os.path.join(self.country_dir(country), 'page-*.csv'))
+        return {int(os.path.basename(f)[5:10]) for f in files}
+
+    def _fetch_page(self, country: str, page: int) -> int:
+        params = {'country': country, 'page': page, 'page_size': self.page_size}
+        response = self.transport.get(self.api_url, params=params, timeout=30)
+        features = response.json().get('features') or []
+
+        if features:
+            path = self._page_path(country, page)
+            self.parse_features(features).to_csv(path + '.tmp', index=False)
+            os.replace(path + '.tmp', path)
+
+        return len(features)
+
+    def crawl(self, country: str = "Kenya", limit: Optional[int] = None) -> Dict:
+        """
+        Fetch every missing page for a country
+
+        Pages are requested in order with up to max_workers in flight; no
+        pages are requested past the first short page. Failed pages (after
+        the transport's retries) are skipped and picked up by the next crawl.
+        No new pages are requested once the endpoint's circuit is open or
+        max_consecutive_failures pages have failed in a row; pages already
+        in flight finish and the crawl is left incomplete for the next run.
+
+        Args:
+            country: Country name
+            limit: Optional maximum number of facilities (rounded up to whole pages)
+
+        Returns:
+            Dictionary with pages (on disk), fetched (this run), facilities
+            (this run), failed_pages, last_page, complete and stopped (why
+            the crawl gave up early, or None)
+        """
+        os.makedirs(self.country_dir(country), exist_ok=True)
+        state = self._load_state(country)
+        done = self.done_pages(country)
+
+        if state['page_size'] != self.page_size and done:
+            raise ValueError(f"Existing crawl of {country} used page_size={state['page_size']}; "
+                             f"resume with the same page size or use a new output_dir")
+        state['page_size'] = self.page_size
+
+        max_page = math.ceil(limit / self.page_size) if limit else None
+        last_page = state['last_page']
+        failed: List[int] = []
+        fetched = 0
+        facilities = 0
+        consecutive_failures = 0
+        stopped: Optional[str] = None
+
+        def bound() -> Optional[int]:
+            known = [p for p in (last_page, max_page) if p is not None]
+            return min(known) if known else None
+
+        next_page = 1
+        in_flight = {}
+        progress = tqdm(desc=f"Crawling {country}", unit='page', initial=len(done))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                while (not stopped and len(in_flight) < self.max_workers
+                       and (bound() is None or next_page <= bound())):
+                    if next_page not in done:
+                        in_flight[pool.submit(self._fetch_page, country, next_page)] = next_page
+                    next_page += 1
+
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    page = in_flight.pop(future)
+
+                    try:
+                        count = future.result()
+                    except (requests.exceptions.RequestException, ValueError) as e:
+                        print(f"\nError fetching page {page}: {e}")
+                        failed.append(page)
+                        consecutive_failures += 1
+                        if isinstance(e, CircuitOpenError):
+                            stopped = stopped or "circuit open"
+                        elif consecutive_failures >= self.max_consecutive_failures:
+                            stopped = stopped or f"{consecutive_failures} pages failed in a row"
+                        continue
+
+                    consecutive_failures = 0
+
+                    if count < self.page_size:
+                        end = page if count else page - 1
+                        last_page = end if last_page is None else min(last_page, end)
+                        state['last_page'] = last_page
+                        self._save_state(country, state)
+
+                    if count:
+                        done.add(page)
+                        fetched += 1
+                        facilities += count
+                        progress.update(1)
+
+        progress.close()
+        self._save_state(country, state)
+        if stopped:
+            print(f"\n⚠️  Stopped crawling {country} after page {next_page - 1}: {stopped}")
+
+        end = bound()
+        # Pages past the end that errored before the end was known don't count
+        failed = [p for p in failed if end is None or p <= end]
+        complete = end is not None and not failed and all(p in done for p in range(1, end + 1))
+
+        return {
+            'pages': len(done),
+            'fetched': fetched,
+            'facilities': facilities,
+            'failed_pages': sorted(failed),
+            'last_page': last_page,
+            'complete': complete,
+            'stopped': stopped
+        }
+
+    def iter_pages(self, country: str) -> Iterator[pd.DataFrame]:
+        """
+        Read crawled pages back in page order
+
+        Args:
+            country: Country name
+
+        Yields:
+            One DataFrame per page
+        """
+        for page in sorted(self.done_pages(country)):
+            yield pd.read_csv(self._page_path(country, page))
+
+    def load(self, country: str) -> pd.DataFrame:
+        """All crawled facilities for a country"""
+        pages = list(self.iter_pages(country))
+        return pd.concat(pages, ignore_index=True) if pages else pd.DataFrame()
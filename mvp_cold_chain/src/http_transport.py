@@ -0,0 +1,327 @@
+"""
+HTTP Transport Module
+Shared requests session with connection pooling, retries and circuit breaking
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised when an endpoint's circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker
+
+    closed    → requests flow; consecutive failures are counted
+    open      → requests are refused until reset_timeout has passed
+    half-open → one trial request at a time; success closes, failure re-opens
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        """
+        Initialize breaker
+
+        Args:
+            failure_threshold: Consecutive failures before opening
+            reset_timeout: Seconds to wait before a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        # Start of the in-flight half-open trial; a trial that never reports
+        # back is abandoned after reset_timeout so another can go out
+        self._trial_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'open':
+                return False
+
+            now = time.monotonic()
+            if self._trial_at is not None and now - self._trial_at < self.reset_timeout:
+                return False
+            self._trial_at = now
+            return True
+
+    def release(self):
+        """End a trial that neither succeeded nor failed (e.g. a 4xx response)"""
+        with self._lock:
+            self._trial_at = None
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._trial_at = None
+            self.failures += 1
+            if self.state == 'half-open' or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class EndpointMetrics:
+    """Latency and error counters for one endpoint"""
+
+    def __init__(self, window: int = 1000):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.rejected = 0
+        self.status_counts: Dict[int, int] = {}
+        self.latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def incr(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def record(self, seconds: float, status: Optional[int] = None):
+        with self._lock:
+            self.latencies.append(seconds)
+            if status is not None:
+                self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def summary(self) -> Dict:
+        with self._lock:
+            latencies = sorted(self.latencies)
+        n = len(latencies)
+
+        def pct(p):
+            return latencies[min(n - 1, int(p * n))] * 1000 if n else None
+
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'rejected': self.rejected,
+            'error_rate': self.errors / self.requests if self.requests else 0.0,
+            'latency_p50_ms': pct(0.50),
+            'latency_p95_ms': pct(0.95),
+            'latency_max_ms': latencies[-1] * 1000 if n else None,
+            'status_counts': dict(self.status_counts)
+        }
+
+
+class HttpTransport:
+    """
+    Shared HTTP client for all external APIs
+
+    - keep-alive connection pooling (one TLS handshake per pooled connection)
+    - exponential backoff with jitter on 429 / 5xx / connection errors
+      (honours Retry-After)
+    - per-endpoint circuit breaker
+    - per-endpoint latency and error metrics
+    """
+
+    def __init__(self, pool_size: int = 20, max_retries: int = 4, backoff_factor: float = 0.5,
+                 max_backoff: float = 30.0, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        """
+        Initialize transport
+
+        Args:
+            pool_size: Max pooled connections per host
+            max_retries: Retries after the first attempt
+            backoff_factor: Base delay (seconds) - doubles on each retry
+            max_backoff: Upper bound for a single delay
+            failure_threshold: Consecutive failed calls (after retries) before an endpoint's circuit opens
+            reset_timeout: Seconds before an open circuit allows a trial request
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._metrics: Dict[str, EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def endpoint_key(url: str) -> str:
+        """Endpoint identity used for breakers and metrics (host + path)"""
+        parts = urlsplit(url)
+        return f"{parts.netloc}{parts.path}"
+
+    def _endpoint(self, url: str):
+        key = self.endpoint_key(url)
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._metrics[key] = EndpointMetrics()
+            return self._breakers[key], self._metrics[key]
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.max_backoff)
+
+        delay = self.backoff_factor * (2 ** attempt)
+        return min(delay, self.max_backoff) * random.uniform(0.5, 1.0)
+
+    def get(self, url: str, params: Optional[Dict] = None, timeout: float = 10,
+            before_request: Optional[Callable[[], None]] = None) -> requests.Response:
+        """
+        GET with retries and circuit breaking
+
+        A logical call counts once towards the circuit breaker, after its
+        retries: success closes it, a final 5xx / connection error / timeout
+        counts as one failure. 429 means the endpoint is up but throttling
+        us, so it never counts as a failure.
+
+        Args:
+            url: Request URL
+            params: Query parameters
+            timeout: Per-attempt timeout in seconds
+            before_request: Called before every request actually sent (first
+                attempt and each retry), e.g. to take a rate-limiter token;
+                an exception raised by it aborts the call
+
+        Returns:
+            Successful response (raise_for_status already applied)
+
+        Raises:
+            CircuitOpenError: Endpoint circuit is open
+            requests.exceptions.RequestException: Request failed after all retries
+        """
+        breaker, metrics = self._endpoint(url)
+
+        if not breaker.allow():
+            metrics.incr('rejected')
+            raise CircuitOpenError(f"Circuit open for {self.endpoint_key(url)}")
+
+        for attempt in range(self.max_retries + 1):
+            if before_request is not None:
+                try:
+                    before_request()
+                except Exception:
+                    breaker.release()
+                    raise
+
+            metrics.incr('requests')
+            start = time.perf_counter()
+            response = None
+
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+                metrics.record(time.perf_counter() - start, response.status_code)
+
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    breaker.record_success()
+                    return response
+
+                error = requests.exceptions.HTTPError(
+                    f"{response.status_code} Error for url: {response.url}", response=response
+                )
+
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                metrics.record(time.perf_counter() - start)
+                error = e
+
+            except requests.exceptions.HTTPError:
+                # Non-retryable 4xx (bad key, bad params) - fail fast
+                metrics.incr('errors')
+                breaker.release()
+                raise
+
+            metrics.incr('errors')
+
+            # Stop early if other calls have opened the circuit meanwhile
+            if attempt == self.max_retries or breaker.state == 'open':
+                if response is not None and response.status_code == 429:
+                    breaker.release()
+                else:
+                    breaker.record_failure()
+                raise error
+
+            metrics.incr('retries')
+            time.sleep(self._backoff(attempt, response))
+
+    def metrics(self) -> Dict[str, Dict]:
+        """
+        Per-endpoint metrics
+
+        Returns:
+            Dictionary keyed by endpoint with request/error counts and latency percentiles
+        """
+        with self._lock:
+            items = list(self._metrics.items())
+            breakers = dict(self._breakers)
+
+        return {
+            key: {**m.summary(), 'circuit': breakers[key].state}
+            for key, m in items
+        }
+
+    def print_metrics(self):
+        """Print a one-line summary per endpoint"""
+        for key, m in self.metrics().items():
+            p50 = f"{m['latency_p50_ms']:.0f}ms" if m['latency_p50_ms'] is not None else "n/a"
+            p95 = f"{m['latency_p95_ms']:.0f}ms" if m['latency_p95_ms'] is not None else "n/a"
+            print(f"  {key}: {m['requests']} requests, {m['errors']} errors, "
+                  f"{m['retries']} retries, p50 {p50}, p95 {p95}, circuit {m['circuit']}")
+
+
+_default_transport: Optional[HttpTransport] = None
+_default_lock = threading.Lock()
+
+
+def get_default_transport() -> HttpTransport:
+    """
+    Process-wide shared transport (one connection pool for all clients)
+
+    Set HTTP_REPLAY_DIR to serve recorded payloads offline, or
+    HTTP_RECORD_DIR to save every response while running normally.
+    """
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            replay_dir = os.getenv('HTTP_REPLAY_DIR')
+            record_dir = os.getenv('HTTP_RECORD_DIR')
+
+            if replay_dir:
+                from replay import ReplayTransport
+                _default_transport = ReplayTransport(replay_dir)
+            elif record_dir:
+                from replay import RecordingTransport
+                _default_transport = RecordingTransport(HttpTransport(), record_dir)
+            else:
+                _default_transport = HttpTransport()
+
+        return _default_transport
@@ -0,0 +1,174 @@
+"""
+Incremental Run Module
+Per-facility input fingerprints so reruns only touch rows whose inputs changed
+"""
+
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_STATE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'cache', 'incremental_state.sqlite'
+)
+
+# Facility attributes that feed weather lookup and power features
+FACILITY_COLUMNS = ['facility_id', 'name', 'latitude', 'longitude', 'facility_type', 'power_source']
+
+# Forecast issuance cycle (OpenWeatherMap 5-day forecast updates every 3 hours)
+ISSUANCE_WINDOW_SECONDS = 3 * 3600
+
+
+def current_issuance(now: Optional[float] = None) -> int:
+    """Index of the current forecast issuance window"""
+    return int((now or time.time()) // ISSUANCE_WINDOW_SECONDS)
+
+
+def facility_fingerprints(facilities: pd.DataFrame) -> pd.Series:
+    """
+    Hash of each facility's attributes
+
+    Args:
+        facilities: Frame with FACILITY_COLUMNS
+
+    Returns:
+        Hex fingerprint per facility, indexed by facility_id
+    """
+    cols = [c for c in FACILITY_COLUMNS if c in facilities.columns]
+    hashes = pd.util.hash_pandas_object(facilities[cols], index=False)
+    return pd.Series(hashes.map('{:016x}'.format).to_numpy(), index=facilities['facility_id'].to_numpy())
+
+
+class IncrementalState:
+    """
+    Stored fingerprints for the rows in the processed dataset
+
+    Each row records the facility attribute hash, the forecast issuance
+    window its weather came from, and the rule version its labels were
+    computed with. plan() compares these with the current inputs.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize state
+
+        Args:
+            path: SQLite file (default: data/cache/incremental_state.sqlite)
+        """
+        self.path = os.path.abspath(path or os.getenv('INCREMENTAL_STATE_PATH') or DEFAULT_STATE_PATH)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                facility_id TEXT PRIMARY KEY,
+                facility_hash TEXT NOT NULL,
+                issuance INTEGER NOT NULL,
+                rule_version TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def load(self) -> pd.DataFrame:
+        """Stored fingerprints indexed by facility_id"""
+        return pd.read_sql_query("SELECT * FROM fingerprints", self._conn).set_index('facility_id')
+
+    def plan(self, facilities: pd.DataFrame, previous: Optional[pd.DataFrame],
+             rule_version: str, issuance: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        Decide what each facility needs
+
+        Args:
+            facilities: Current facility list
+            previous: Existing processed dataset (None = full run)
+            rule_version: Version of the failure rules
+            issuance: Current forecast issuance window (default: now)
+
+        Returns:
+            Dictionary of facility_id lists:
+            - 'fetch': needs a new forecast (new, changed, or forecast out of date)
+            - 'new_power': subset of fetch whose power features must be recomputed
+            - 'relabel': weather still current, labels from an older rule version
+            - 'unchanged': row can be reused as is
+        """
+        ids = facilities['facility_id'].astype(str).to_numpy()
+        current_hash = facility_fingerprints(facilities).to_numpy()
+
+        if previous is None or previous.empty:
+            return {'fetch': list(ids), 'new_power': list(ids), 'relabel': [], 'unchanged': []}
+
+        issuance = current_issuance() if issuance is None else issuance
+        stored = self.load().reindex(ids)
+        in_previous = np.isin(ids, previous['facility_id'].astype(str).to_numpy())
+
+        attrs_changed = ~in_previous | (stored['facility_hash'].to_numpy() != current_hash)
+        forecast_stale = stored['issuance'].fillna(-1).to_numpy() < issuance
+        rules_changed = stored['rule_version'].to_numpy() != rule_version
+
+        fetch = attrs_changed | forecast_stale
+        relabel = ~fetch & rules_changed
+
+        return {
+            'fetch': list(ids[fetch]),
+            'new_power': list(ids[attrs_changed]),
+            'relabel': list(ids[relabel]),
+            'unchanged': list(ids[~fetch & ~relabel])
+        }
+
+    def save(self, facilities: pd.DataFrame, refreshed_ids: List[str], relabeled_ids: List[str],
+             rule_version: str, issuance: Optional[int] = None):
+        """
+        Record fingerprints for rows written this run
+
+        Args:
+            facilities: Current facility list
+            refreshed_ids: Facilities whose forecast was fetched this run
+            relabeled_ids: Facilities whose labels were recomputed from stored weather
+            rule_version: Version of the failure rules used
+            issuance: Forecast issuance window of the fetched data (default: now)
+        """
+        issuance = current_issuance() if issuance is None else issuance
+        hashes = facility_fingerprints(facilities)
+
+        self._conn.executemany(
+            "INSERT INTO fingerprints (facility_id, facility_hash, issuance, rule_version) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(facility_id) DO UPDATE SET facility_hash = excluded.facility_hash, "
+            "issuance = excluded.issuance, rule_version = excluded.rule_version",
+            [(str(fid), hashes[fid], issuance, rule_version) for fid in refreshed_ids]
+        )
+        self._conn.executemany(
+            "UPDATE fingerprints SET rule_version = ? WHERE facility_id = ?",
+            [(rule_version, str(fid)) for fid in relabeled_ids]
+        )
+        self._conn.commit()
+
+
+def merge_into_previous(previous: Optional[pd.DataFrame], updated: pd.DataFrame,
+                        facilities: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge recomputed rows into the existing dataset
+
+    Updated rows replace their previous version, rows for facilities no
+    longer in the registry are dropped, and output follows facility order.
+
+    Args:
+        previous: Existing processed dataset (None = nothing to merge)
+        updated: Rows recomputed this run
+        facilities: Current facility list (defines membership and order)
+
+    Returns:
+        Merged dataset
+    """
+    if previous is None or previous.empty:
+        return updated.reset_index(drop=True)
+
+    keep = previous[~previous['facility_id'].isin(updated['facility_id'])
+                    & previous['facility_id'].isin(facilities['facility_id'])]
+    columns = list(updated.columns) if len(updated.columns) else list(previous.columns)
+    merged = pd.concat([keep, updated], ignore_index=True).reindex(columns=columns)
+
+    order = pd.Series(np.arange(len(facilities)), index=facilities['facility_id'].to_numpy())
+    merged = merged.iloc[np.argsort(merged['facility_id'].map(order).to_numpy(), kind='stable')]
+    return merged.reset_index(drop=True)
@@ -0,0 +1,317 @@
+"""
+Local API Stand-in
+Offline HTTP server mimicking OpenWeatherMap and Healthsites.io for load testing
+
+Endpoints:
+- /data/2.5/forecast    (5-day / 3-hour forecast)
+- /data/2.5/onecall     (7-day daily forecast)
+- /api/v2/facilities    (Healthsites paginated GeoJSON)
+
+Usage:
+    python src/mock_api_server.py --port 8765 --latency-ms 80 --error-rate 0.01 --rate-limit 60
+    OPENWEATHER_API_ROOT=http://127.0.0.1:8765 HEALTHSITES_API_ROOT=http://127.0.0.1:8765 python3 run_mvp.py
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from replay import recording_path
+
+AMENITIES = ['hospital', 'clinic', 'health centre', 'dispensary', 'pharmacy', 'doctors']
+
+# Kenya bounding box (lat_min, lat_max, lon_min, lon_max)
+KENYA_BBOX = (-4.7, 4.6, 33.9, 41.9)
+
+
+def _seed(*parts) -> int:
+    return int(hashlib.md5(repr(parts).encode('utf-8')).hexdigest()[:8], 16)
+
+
+def synthetic_forecast(lat: float, lon: float, now: Optional[float] = None, steps: int = 40) -> Dict:
+    """
+    Deterministic 5-day / 3-hour forecast payload for a location
+
+    Hotter and drier towards the north (Turkana), matching the sample data.
+
+    Args:
+        lat: Latitude
+        lon: Longitude
+        now: Issuance time (default: current time)
+        steps: Number of 3-hour steps
+
+    Returns:
+        Payload shaped like /data/2.5/forecast
+    """
+    now = int(now or time.time())
+    start = now - now % 10800 + 10800
+    rng = np.random.default_rng(_seed(round(lat, 2), round(lon, 2), start // 10800))
+
+    base = 27 + 3 * lat + rng.normal(0, 2)
+    hours = (np.arange(steps) * 3 + 3) % 24
+    temps = base + 6 * np.sin((hours - 9) / 24 * 2 * np.pi) + rng.normal(0, 1.5, steps)
+    clouds = np.clip(55 - 8 * lat + rng.normal(0, 25, steps), 0, 100).round()
+    humidity = np.clip(65 - 6 * lat + rng.normal(0, 10, steps), 5, 100).round()
+    wind = np.abs(rng.normal(4, 2, steps)).round(2)
+    pressure = (1012 + rng.normal(0, 3, steps)).round()
+    weather = np.where(clouds > 80, 'Rain', np.where(clouds > 30, 'Clouds', 'Clear'))
+
+    return {
+        'cod': '200',
+        'cnt': steps,
+        'list': [
+            {
+                'dt': start + i * 10800,
+                'main': {'temp': round(float(temps[i]), 2), 'humidity': int(humidity[i]),
+                         'pressure': int(pressure[i])},
+                'clouds': {'all': int(clouds[i])},
+                'wind': {'speed': float(wind[i])},
+                'weather': [{'main': str(weather[i])}]
+            }
+            for i in range(steps)
+        ],
+        'city': {'coord': {'lat': lat, 'lon': lon}, 'timezone': 10800}
+    }
+
+
+def synthetic_onecall(lat: float, lon: float, now: Optional[float] = None) -> Dict:
+    """
+    Deterministic 7-day daily forecast payload (/data/2.5/onecall shape)
+
+    Args:
+        lat: Latitude
+        lon: Longitude
+        now: Issuance time (default: current time)
+
+    Returns:
+        Payload with a 'daily' list
+    """
+    forecast = synthetic_forecast(lat, lon, now, steps=56)
+    daily = []
+
+    for d in range(7):
+        items = forecast['list'][d * 8:(d + 1) * 8]
+        temps = [it['main']['temp'] for it in items]
+        clouds = int(np.mean([it['clouds']['all'] for it in items]))
+        humidity = int(np.mean([it['main']['humidity'] for it in items]))
+        daily.append({
+            'dt': items[0]['dt'],
+            'temp': {'min': min(temps), 'max': max(temps), 'day': temps[4], 'night': temps[0]},
+            'feels_like': {'day': temps[4]},
+            'pressure': items[0]['main']['pressure'],
+            'humidity': humidity,
+            'dew_point': round(temps[4] - (100 - humidity) / 5, 2),
+            'wind_speed': items[4]['wind']['speed'],
+            'clouds': clouds,
+            'uvi': round(max(0.0, 11 - clouds / 10), 1),
+            'weather': [{'main': items[4]['weather'][0]['main'], 'description': ''}]
+        })
+
+    return {'lat': lat, 'lon': lon, 'timezone_offset': 10800, 'daily': daily}
+
+
+def synthetic_facilities_page(country: str, page: int, page_size: int, total: int) -> Dict:
+    """
+    Deterministic Healthsites page (GeoJSON features)
+
+    Args:
+        country: Country name
+        page: 1-based page number
+        page_size: Facilities per page
+        total: Total facilities in the country
+
+    Returns:
+        Payload with a 'features' list (empty past the last page)
+    """
+    first = (page - 1) * page_size
+    count = max(0, min(page_size, total - first))
+    rng = np.random.default_rng(_seed(country, page, page_size))
+    lat_min, lat_max, lon_min, lon_max = KENYA_BBOX
+
+    features = []
+    for i in range(count):
+        n = first + i
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [
+                round(float(rng.uniform(lon_min, lon_max)), 5),
+                round(float(rng.uniform(lat_min, lat_max)), 5)
+            ]},
+            'properties': {
+                'uuid': f"{_seed(country, n):08x}",
+                'name': f"{country} Facility {n + 1}",
+                'amenity': AMENITIES[int(rng.integers(len(AMENITIES)))],
+                'completeness': int(rng.integers(10, 100))
+            }
+        })
+
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+class MockAPIServer:
+    """
+    Threaded stand-in for OpenWeatherMap / Healthsites
+
+    Optional fault injection: fixed latency, random 5xx errors and 429
+    throttling above a requests-per-second limit. If record_dir is set,
+    recorded payloads are served in preference to synthetic ones.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, latency_ms: float = 0.0,
+                 error_rate: float = 0.0, rate_limit: Optional[float] = None,
+                 facilities_per_country: int = 2500, record_dir: Optional[str] = None):
+        """
+        Initialize server
+
+        Args:
+            host: Bind address
+            port: Port (0 = pick a free port)
+            latency_ms: Delay added to every response
+            error_rate: Fraction of requests answered with 503
+            rate_limit: Requests/second before answering 429 (None = unlimited)
+            facilities_per_country: Size of the synthetic Healthsites registry
+            record_dir: Optional RecordingTransport directory to serve from
+        """
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.facilities_per_country = facilities_per_country
+        self.record_dir = record_dir
+
+        self.counts = {'requests': 0, 'errors': 0, 'throttled': 0}
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _throttled(self) -> bool:
+        if not self.rate_limit:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+            return self._window_count > self.rate_limit
+
+    def _payload(self, path: str, params: Dict[str, str]) -> Optional[Dict]:
+        if self.record_dir:
+            recorded = recording_path(self.record_dir, path, params)
+            try:
+                with gzip.open(recorded, 'rt', encoding='utf-8') as f:
+                    return json.load(f)['payload']
+            except FileNotFoundError:
+                pass
+
+        if path == '/data/2.5/forecast':
+            return synthetic_forecast(float(params['lat']), float(params['lon']),
+                                      steps=int(params.get('cnt', 40)))
+        if path == '/data/2.5/onecall':
+            return synthetic_onecall(float(params['lat']), float(params['lon']))
+        if path == '/api/v2/facilities':
+            return synthetic_facilities_page(params.get('country', 'Kenya'), int(params.get('page', 1)),
+                                             int(params.get('page_size', 100)), self.facilities_per_country)
+        return None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _send(self, status: int, body: Dict, headers: Optional[Dict] = None):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                params = {k: v[0] for k, v in parse_qs(parts.query).items()}
+
+                with server._lock:
+                    server.counts['requests'] += 1
+
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000)
+
+                if server._throttled():
+                    with server._lock:
+                        server.counts['throttled'] += 1
+                    return self._send(429, {'cod': 429, 'message': 'rate limit'}, {'Retry-After': '1'})
+
+                if server.error_rate and random.random() < server.error_rate:
+                    with server._lock:
+                        server.counts['errors'] += 1
+                    return self._send(503, {'cod': 503, 'message': 'injected error'})
+
+                try:
+                    payload = server._payload(parts.path, params)
+                except (KeyError, ValueError):
+                    return self._send(400, {'cod': 400, 'message': 'bad request'})
+
+                if payload is None:
+                    return self._send(404, {'cod': 404, 'message': 'not found'})
+
+                self._send(200, payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'MockAPIServer':
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline OpenWeatherMap / Healthsites stand-in")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=None, help="requests/second before 429")
+    parser.add_argument('--facilities', type=int, default=2500, help="synthetic facilities per country")
+    parser.add_argument('--record-dir', default=None, help="serve recorded payloads from this directory")
+    args = parser.parse_args()
+
+    server = MockAPIServer(args.host, args.port, args.latency_ms, args.error_rate,
+                           args.rate_limit, args.facilities, args.record_dir)
+
+    print(f"Mock API serving at {server.url}")
+    print(f"  export OPENWEATHER_API_ROOT={server.url}")
+    print(f"  export HEALTHSITES_API_ROOT={server.url}")
+
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nStopped. {server.counts}")
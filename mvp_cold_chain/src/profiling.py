@@ -0,0 +1,267 @@
+"""
+Profiling Module
+Per-stage wall / CPU time, peak memory, row and API counters, written as a JSON / CSV run report
+"""
+
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+DEFAULT_PROFILE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'outputs', 'profiles'
+)
+
+COUNTERS = ['api_calls', 'http_requests', 'retries', 'cache_hits', 'cache_misses']
+
+# ru_maxrss is KiB on Linux, bytes on macOS
+_MAXRSS_UNIT = 1 if platform.system() == 'Darwin' else 1024
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (None where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _cpu_seconds() -> float:
+    # Own CPU plus reaped child processes (sharded workers)
+    if resource is None:
+        return time.process_time()
+    own, children = resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _maxrss(children: bool = False) -> Optional[int]:
+    # Process high-water mark in bytes (children: largest reaped worker)
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT
+
+
+def row_count(value) -> Optional[int]:
+    """Rows in a stage input / output (frames, or dicts / lists holding one)"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, dict):
+        frames = [v for v in value.values() if isinstance(v, pd.DataFrame)]
+        return len(frames[0]) if frames else None
+    if isinstance(value, (list, tuple)):
+        return len(value)
+    return None
+
+
+class _RSSSampler:
+    """Background thread tracking peak RSS between start() and stop()"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss() or 0)
+
+    def start(self):
+        self.peak = current_rss() or 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> int:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss() or 0)
+        return self.peak
+
+
+class StageProfiler:
+    """
+    Instrument pipeline stages
+
+    For each stage: wall and CPU time (including worker processes), peak
+    RSS during the stage (sampled; falls back to the process high-water
+    mark without /proc), rows in / out and deltas of the fetch counters
+    (API calls, HTTP requests, retries, forecast cache hits / misses).
+    With use_cprofile, every stage also runs under cProfile and the
+    hottest stage's profile is written with the report.
+    """
+
+    def __init__(self, counters: Optional[Callable[[], Dict[str, int]]] = None, use_cprofile: bool = False):
+        """
+        Initialize profiler
+
+        Args:
+            counters: Returns current cumulative counters (keys from COUNTERS)
+            use_cprofile: Also collect a cProfile per stage
+        """
+        self.counters = counters or (lambda: {})
+        self.use_cprofile = use_cprofile
+        self.records: List[Dict] = []
+        self.started = datetime.now()
+        self._start_wall = time.perf_counter()
+        self._start_cpu = _cpu_seconds()
+        self._profiles: Dict[str, cProfile.Profile] = {}
+
+    def _counter_values(self) -> Dict[str, int]:
+        values = self.counters() or {}
+        return {c: int(values.get(c, 0)) for c in COUNTERS}
+
+    @contextmanager
+    def stage(self, name: str, inputs=()):
+        """
+        Measure one stage
+
+        Args:
+            name: Stage name
+            inputs: Stage input values (rows_in is the largest of them)
+
+        Yields:
+            The stage record; set 'cached' and 'rows_out' on it
+        """
+        rows_in = [r for r in map(row_count, inputs) if r is not None]
+        record = {'stage': name, 'cached': False, 'rows_in': max(rows_in) if rows_in else None, 'rows_out': None}
+
+        counters_before = self._counter_values()
+        rss_before = current_rss()
+        sampler = _RSSSampler() if rss_before is not None else None
+        if sampler:
+            sampler.start()
+        profile = cProfile.Profile() if self.use_cprofile else None
+
+        wall, cpu = time.perf_counter(), _cpu_seconds()
+        if profile:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile:
+                profile.disable()
+                self._profiles[name] = profile
+            record['wall_seconds'] = round(time.perf_counter() - wall, 4)
+            record['cpu_seconds'] = round(_cpu_seconds() - cpu, 4)
+
+            peak = sampler.stop() if sampler else _maxrss()
+            record['peak_rss_mb'] = round(peak / 1e6, 1) if peak else None
+            record['rss_delta_mb'] = round((current_rss() - rss_before) / 1e6, 1) \
+                if rss_before is not None else None
+            workers = _maxrss(children=True)
+            record['worker_peak_rss_mb'] = round(workers / 1e6, 1) if workers else None
+
+            counters_after = self._counter_values()
+            record.update({c: counters_after[c] - counters_before[c] for c in COUNTERS})
+            self.records.append(record)
+
+    def hottest(self) -> Optional[Dict]:
+        """Record of the slowest stage that actually ran"""
+        ran = [r for r in self.records if not r['cached']] or self.records
+        return max(ran, key=lambda r: r['wall_seconds']) if ran else None
+
+    def report(self, meta: Optional[Dict] = None) -> Dict:
+        """
+        Run report
+
+        Args:
+            meta: Extra run metadata (mode, arguments, ...)
+
+        Returns:
+            Dictionary with run metadata, totals and per-stage records
+        """
+        peaks = [r['peak_rss_mb'] for r in self.records if r['peak_rss_mb'] is not None]
+        totals = {
+            'wall_seconds': round(time.perf_counter() - self._start_wall, 4),
+            'cpu_seconds': round(_cpu_seconds() - self._start_cpu, 4),
+            'peak_rss_mb': max(peaks) if peaks else None,
+            **{c: sum(r[c] for r in self.records) for c in COUNTERS}
+        }
+        hottest = self.hottest()
+        return {
+            'started': self.started.isoformat(timespec='seconds'),
+            'finished': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'cpu_count': os.cpu_count(),
+            **(meta or {}),
+            'totals': totals,
+            'hottest_stage': hottest['stage'] if hottest else None,
+            'stages': self.records
+        }
+
+    def write(self, directory: Optional[str] = None, meta: Optional[Dict] = None) -> Dict[str, str]:
+        """
+        Write the run report (JSON + per-stage CSV, plus cProfile output for the hottest stage)
+
+        Args:
+            directory: Output directory (default: PROFILE_DIR or outputs/profiles)
+            meta: Extra run metadata
+
+        Returns:
+            Dictionary of output kind → path
+        """
+        directory = os.path.abspath(directory or os.getenv('PROFILE_DIR') or DEFAULT_PROFILE_DIR)
+        os.makedirs(directory, exist_ok=True)
+        report = self.report(meta)
+        stem = os.path.join(directory, f"run-{self.started.strftime('%Y%m%d-%H%M%S')}")
+
+        paths = {'json': stem + '.json', 'csv': stem + '.csv'}
+        with open(paths['json'], 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        pd.DataFrame(self.records).to_csv(paths['csv'], index=False)
+
+        hottest = report['hottest_stage']
+        if hottest in self._profiles:
+            paths['cprofile'] = f"{stem}-{hottest}.prof"
+            self._profiles[hottest].dump_stats(paths['cprofile'])
+
+            text = io.StringIO()
+            pstats.Stats(self._profiles[hottest], stream=text).sort_stats('cumulative').print_stats(30)
+            paths['cprofile_text'] = f"{stem}-{hottest}.txt"
+            with open(paths['cprofile_text'], 'w') as f:
+                f.write(text.getvalue())
+
+        return paths
+
+    def print_report(self, baseline: Optional[str] = None):
+        """
+        Print per-stage measurements, optionally against a previous run report
+
+        Args:
+            baseline: Path to an earlier run report JSON
+        """
+        base = {}
+        if baseline:
+            with open(baseline) as f:
+                base = {r['stage']: r for r in json.load(f)['stages']}
+
+        print("\nProfile:")
+        print(f"  {'stage':<12} {'wall s':>8} {'cpu s':>8} {'peak MB':>8} {'rows in':>9} {'rows out':>9} "
+              f"{'api':>5} {'retry':>5} {'hits':>5}" + (f" {'vs base':>8}" if base else ""))
+        for r in self.records:
+            line = (f"  {r['stage']:<12} {r['wall_seconds']:>8.3f} {r['cpu_seconds']:>8.3f} "
+                    f"{r['peak_rss_mb'] if r['peak_rss_mb'] is not None else '-':>8} "
+                    f"{r['rows_in'] if r['rows_in'] is not None else '-':>9} "
+                    f"{r['rows_out'] if r['rows_out'] is not None else '-':>9} "
+                    f"{r['api_calls']:>5} {r['retries']:>5} {r['cache_hits']:>5}")
+            if base:
+                before = base.get(r['stage'], {}).get('wall_seconds')
+                line += f" {r['wall_seconds'] / before:>7.2f}x" if before else f" {'new':>8}"
+            print(line + ("  (cached)" if r['cached'] else ""))
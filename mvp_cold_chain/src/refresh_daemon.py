@@ -0,0 +1,190 @@
+"""
+Refresh Daemon Module
+Scheduled incremental refreshes with a JSON health / status file
+"""
+
+import json
+import os
+import signal
+import socket
+import time
+import traceback
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from incremental import ISSUANCE_WINDOW_SECONDS
+
+DEFAULT_STATUS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'processed', 'refresh_status.json'
+)
+
+
+def _timestamp(t: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(t).isoformat(timespec='seconds') if t else None
+
+
+def read_status(path: Optional[str] = None) -> Optional[Dict]:
+    """Last status written by a daemon (None if there is none)"""
+    path = path or os.getenv('REFRESH_STATUS_PATH') or DEFAULT_STATUS_PATH
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def check_health(path: Optional[str] = None, now: Optional[float] = None) -> Tuple[bool, str]:
+    """
+    Health of the daemon from its status file
+
+    Unhealthy when there is no status, the daemon stopped, its heartbeat is
+    older than its own stale_after_seconds, or the last successful refresh
+    is older than that.
+
+    Args:
+        path: Status file (default: REFRESH_STATUS_PATH or data/processed/refresh_status.json)
+        now: Current time (default: time.time())
+
+    Returns:
+        (healthy, reason)
+    """
+    status = read_status(path)
+    if status is None:
+        return False, "no status file"
+
+    now = now or time.time()
+    stale_after = status['stale_after_seconds']
+    if status['state'] == 'stopped':
+        return False, "daemon stopped"
+    if now - status['heartbeat_at'] > stale_after:
+        return False, f"no heartbeat for {now - status['heartbeat_at']:.0f}s"
+    if not status['last_success_at'] or now - status['last_success_at'] > stale_after:
+        return False, f"no successful refresh for {stale_after}s"
+    return True, f"last refresh {status['last_success']}"
+
+
+class RefreshDaemon:
+    """
+    Run a refresh job on a schedule and publish its status
+
+    Wakes offset_seconds after every interval boundary (by default each
+    forecast issuance window), so refreshes land just after the forecast
+    updates. A run fails when the job raises; it is retried after
+    retry_seconds, and an exception's `summary` dict (if any) is kept with
+    the error in the status. The status file
+    is rewritten atomically before and after every run and on each
+    heartbeat; SIGTERM / SIGINT finish the current run, then stop.
+    """
+
+    def __init__(self, job: Callable[[], Dict], interval_seconds: Optional[float] = None,
+                 offset_seconds: Optional[float] = None, retry_seconds: Optional[float] = None,
+                 status_path: Optional[str] = None, heartbeat_seconds: float = 60.0):
+        """
+        Initialize daemon
+
+        Args:
+            job: Runs one refresh and returns a summary dict (stored in the status)
+            interval_seconds: Schedule period (default: REFRESH_INTERVAL_SECONDS or 3 hours)
+            offset_seconds: Delay after each period boundary (default: REFRESH_OFFSET_SECONDS or 600)
+            retry_seconds: Delay before retrying a failed run (default: REFRESH_RETRY_SECONDS or 600)
+            status_path: Status file (default: REFRESH_STATUS_PATH or data/processed/refresh_status.json)
+            heartbeat_seconds: How often the status is rewritten while idle
+        """
+        self.job = job
+        self.interval = interval_seconds or float(os.getenv('REFRESH_INTERVAL_SECONDS', ISSUANCE_WINDOW_SECONDS))
+        self.offset = offset_seconds if offset_seconds is not None else float(os.getenv('REFRESH_OFFSET_SECONDS', 600))
+        self.retry = retry_seconds or float(os.getenv('REFRESH_RETRY_SECONDS', 600))
+        self.status_path = os.path.abspath(status_path or os.getenv('REFRESH_STATUS_PATH') or DEFAULT_STATUS_PATH)
+        self.heartbeat = heartbeat_seconds
+        self.stopping = False
+
+        self.status = {
+            'state': 'starting', 'pid': os.getpid(), 'host': socket.gethostname(),
+            'started': _timestamp(time.time()), 'interval_seconds': self.interval,
+            # Health checks fail once nothing has succeeded for two periods plus a retry
+            'stale_after_seconds': 2 * self.interval + self.retry,
+            'runs': 0, 'failures': 0, 'consecutive_failures': 0,
+            'last_run': None, 'last_success': None, 'last_success_at': None,
+            'next_run': None, 'next_run_at': None, 'heartbeat_at': None
+        }
+
+    def next_wake(self, now: float) -> float:
+        """First scheduled time (period boundary + offset) after now"""
+        wake = now - now % self.interval + self.offset
+        return wake if wake > now else wake + self.interval
+
+    def write_status(self, **updates):
+        self.status.update(updates, heartbeat_at=time.time())
+        os.makedirs(os.path.dirname(self.status_path), exist_ok=True)
+        with open(self.status_path + '.tmp', 'w') as f:
+            json.dump(self.status, f, indent=2, default=str)
+        os.replace(self.status_path + '.tmp', self.status_path)
+
+    def run_once(self) -> bool:
+        """
+        Run the job once and record the outcome
+
+        Returns:
+            True if the job succeeded
+        """
+        started = time.time()
+        self.write_status(state='running', current_run_started=_timestamp(started))
+
+        run = {'started': _timestamp(started)}
+        try:
+            run.update(self.job() or {})
+            ok = True
+        except Exception as e:
+            run.update(getattr(e, 'summary', None) or {})
+            run.update(outcome='error', error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc())
+            print(f"\n❌ Refresh failed: {run['error']}")
+            ok = False
+
+        finished = time.time()
+        run.update(finished=_timestamp(finished), seconds=round(finished - started, 2))
+
+        self.status['runs'] += 1
+        if ok:
+            self.status.update(last_success=run['finished'], last_success_at=finished, consecutive_failures=0)
+        else:
+            self.status['failures'] += 1
+            self.status['consecutive_failures'] += 1
+        self.write_status(state='idle', last_run=run, current_run_started=None)
+        return ok
+
+    def _stop(self, signum, frame):
+        print(f"\n🛑 Received signal {signum}; stopping after the current run")
+        self.stopping = True
+
+    def serve(self, max_runs: Optional[int] = None, run_now: bool = True):
+        """
+        Run until stopped
+
+        Args:
+            max_runs: Stop after this many runs (default: run forever)
+            run_now: Run immediately on start instead of waiting for the first slot
+        """
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self._stop)
+
+        runs = 0
+        wake = time.time() if run_now else self.next_wake(time.time())
+        while not self.stopping:
+            self.write_status(state='idle', next_run=_timestamp(wake), next_run_at=wake)
+            while not self.stopping and time.time() < wake:
+                time.sleep(min(self.heartbeat, max(wake - time.time(), 0)))
+                self.write_status()
+            if self.stopping:
+                break
+
+            print(f"\n🔄 Scheduled refresh at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            ok = self.run_once()
+            runs += 1
+            if max_runs is not None and runs >= max_runs:
+                break
+
+            now = time.time()
+            wake = min(self.next_wake(now), now + self.retry) if not ok else self.next_wake(now)
+            print(f"⏭️  Next refresh at {_timestamp(wake)}")
+
+        self.write_status(state='stopped', next_run=None, next_run_at=None)
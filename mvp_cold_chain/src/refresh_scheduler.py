@@ -0,0 +1,316 @@
+"""
+Refresh Scheduler Module
+Spend the daily forecast quota on the most valuable facility refreshes first
+"""
+
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_STATE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'cache', 'refresh_state.sqlite'
+)
+
+# Temperatures the failure rules key on (°C) - forecasts near these matter most
+RULE_TEMPERATURES = [30, 32, 33, 35, 38, 40]
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+class QuotaLedger:
+    """
+    Daily API call budget persisted in SQLite
+
+    Reservations run in an IMMEDIATE transaction, so several worker
+    processes pointing at the same file share one budget.
+    """
+
+    def __init__(self, calls_per_day: int = 1000, path: Optional[str] = None):
+        """
+        Initialize ledger
+
+        Args:
+            calls_per_day: Daily quota (free tier: 1,000)
+            path: SQLite file (default: data/cache/refresh_state.sqlite)
+        """
+        self.calls_per_day = calls_per_day
+        self.path = os.path.abspath(path or os.getenv('REFRESH_STATE_PATH') or DEFAULT_STATE_PATH)
+        self._conn = _connect(self.path)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS quota (day TEXT PRIMARY KEY, used INTEGER NOT NULL)")
+
+    @staticmethod
+    def _today() -> str:
+        # Provider quotas reset at UTC midnight
+        return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+    def used(self) -> int:
+        """Calls already spent today"""
+        row = self._conn.execute("SELECT used FROM quota WHERE day = ?", (self._today(),)).fetchone()
+        return row[0] if row else 0
+
+    def remaining(self) -> int:
+        """Calls left today"""
+        return max(0, self.calls_per_day - self.used())
+
+    def reserve(self, n: int) -> int:
+        """
+        Atomically reserve up to n calls from today's budget
+
+        Args:
+            n: Calls wanted
+
+        Returns:
+            Calls granted (0..n)
+        """
+        day = self._today()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute("SELECT used FROM quota WHERE day = ?", (day,)).fetchone()
+            used = row[0] if row else 0
+            granted = max(0, min(n, self.calls_per_day - used))
+            self._conn.execute(
+                "INSERT INTO quota (day, used) VALUES (?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET used = excluded.used", (day, used + granted)
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+        return granted
+
+    def settle(self, reserved: int, used: int):
+        """
+        Reconcile a reservation with the calls actually made
+
+        Unused calls (e.g. served from cache) go back to the budget; calls
+        beyond the reservation are charged.
+
+        Args:
+            reserved: Calls reserved with reserve()
+            used: Calls actually sent to the API
+        """
+        delta = used - reserved
+        if delta == 0:
+            return
+        self._conn.execute(
+            "INSERT INTO quota (day, used) VALUES (?, MAX(0, ?)) "
+            "ON CONFLICT(day) DO UPDATE SET used = MAX(0, used + ?)", (self._today(), delta, delta)
+        )
+
+
+class RefreshScheduler:
+    """
+    Rank facilities by risk and staleness and plan refreshes within quota
+
+    Priority (0-1) combines recent predicted failures, power vulnerability
+    and how close the forecast sits to a rule temperature threshold.
+    Facilities at or above high_risk_threshold are always refreshed first
+    once stale; everyone else is ranked by priority × staleness.
+    """
+
+    def __init__(self, calls_per_day: int = 1000, path: Optional[str] = None,
+                 max_age_hours: float = 24.0, min_interval_hours: float = 3.0,
+                 high_risk_threshold: float = 0.6, default_priority: float = 0.5):
+        """
+        Initialize scheduler
+
+        Args:
+            calls_per_day: Daily quota shared through the QuotaLedger
+            path: SQLite state file (default: data/cache/refresh_state.sqlite)
+            max_age_hours: Age at which a forecast counts as fully stale
+            min_interval_hours: Facilities refreshed more recently rank after stale ones
+            high_risk_threshold: Priority at which a facility jumps the queue
+            default_priority: Priority for facilities with no history yet
+        """
+        self.ledger = QuotaLedger(calls_per_day, path)
+        self.max_age_hours = max_age_hours
+        self.min_interval_hours = min_interval_hours
+        self.high_risk_threshold = high_risk_threshold
+        self.default_priority = default_priority
+
+        self._conn = _connect(self.ledger.path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS facility_state (
+                facility_id TEXT PRIMARY KEY,
+                last_refresh REAL,
+                priority REAL
+            )
+        """)
+
+    @staticmethod
+    def score_priority(df: pd.DataFrame, days: int = 5) -> pd.Series:
+        """
+        Risk-based priority from a processed dataset
+
+        Args:
+            df: Frame with facility_id and any of failure_dayN,
+                power_vulnerability_score, temp_max_dayN
+            days: Forecast days
+
+        Returns:
+            Priority in [0, 1] indexed by facility_id
+        """
+        n = len(df)
+
+        failure_cols = [f'failure_day{d}' for d in range(1, days + 1) if f'failure_day{d}' in df.columns]
+        failures = df[failure_cols].to_numpy().mean(axis=1) if failure_cols else np.full(n, 0.5)
+
+        if 'power_vulnerability_score' in df.columns:
+            vulnerability = np.clip(df['power_vulnerability_score'].to_numpy() / 100, 0, 1)
+        else:
+            vulnerability = np.full(n, 0.5)
+
+        temp_cols = [f'temp_max_day{d}' for d in range(1, days + 1) if f'temp_max_day{d}' in df.columns]
+        if temp_cols:
+            temps = df[temp_cols].to_numpy()[:, :, None]
+            distance = np.abs(temps - np.array(RULE_TEMPERATURES)).min(axis=(1, 2))
+            near_threshold = np.clip(1 - distance / 3, 0, 1)
+        else:
+            near_threshold = np.full(n, 0.5)
+
+        priority = 0.5 * failures + 0.3 * vulnerability + 0.2 * near_threshold
+        return pd.Series(priority, index=df['facility_id'].to_numpy())
+
+    def update_priorities(self, df: pd.DataFrame):
+        """
+        Store priorities computed from the latest processed dataset
+
+        Args:
+            df: Processed dataset (see score_priority)
+        """
+        priority = self.score_priority(df)
+        self._conn.execute("BEGIN")
+        self._conn.executemany(
+            "INSERT INTO facility_state (facility_id, priority) VALUES (?, ?) "
+            "ON CONFLICT(facility_id) DO UPDATE SET priority = excluded.priority",
+            [(str(fid), float(p)) for fid, p in priority.items()]
+        )
+        self._conn.execute("COMMIT")
+
+    def mark_refreshed(self, facility_ids: Iterable[str], when: Optional[float] = None):
+        """
+        Record successful refreshes
+
+        Args:
+            facility_ids: Facilities whose forecast was fetched
+            when: Timestamp (default: now)
+        """
+        when = when or time.time()
+        self._conn.execute("BEGIN")
+        self._conn.executemany(
+            "INSERT INTO facility_state (facility_id, last_refresh) VALUES (?, ?) "
+            "ON CONFLICT(facility_id) DO UPDATE SET last_refresh = excluded.last_refresh",
+            [(str(fid), when) for fid in facility_ids]
+        )
+        self._conn.execute("COMMIT")
+
+    def state(self, facility_ids: Iterable[str]) -> pd.DataFrame:
+        """
+        Staleness and priority for facilities
+
+        Args:
+            facility_ids: Facilities to look up
+
+        Returns:
+            Frame indexed by facility_id with age_hours, staleness, priority, high_risk, score
+        """
+        ids = [str(fid) for fid in facility_ids]
+        stored = pd.read_sql_query("SELECT facility_id, last_refresh, priority FROM facility_state",
+                                   self._conn).set_index('facility_id')
+        state = stored.reindex(ids)
+
+        age = (time.time() - state['last_refresh'].astype(float)) / 3600
+        state['age_hours'] = age.fillna(np.inf)
+        state['staleness'] = np.clip(state['age_hours'] / self.max_age_hours, 0, 2)
+        state['priority'] = state['priority'].astype(float).fillna(self.default_priority)
+        state['high_risk'] = state['priority'] >= self.high_risk_threshold
+        state['score'] = state['priority'] * (1 + state['staleness'])
+        return state
+
+    def plan(self, facilities: pd.DataFrame, planner=None,
+             cached: Optional[Callable[[float, float], bool]] = None) -> Dict:
+        """
+        Choose which facilities to refresh now and reserve quota for them
+
+        Only requests whose forecast is already cached for the current
+        issuance window are free (e.g. weather_api.has_cached_forecast);
+        every other request is ranked and granted quota in order: stale
+        ones (not refreshed within min_interval_hours) first, high-risk
+        first among them, then by score. With a GridPlanner, whole grid
+        cells are ranked (by their highest-scoring facility) since one call
+        serves the cell.
+
+        Args:
+            facilities: Frame with facility_id (and latitude/longitude if
+                planner or cached is given)
+            planner: Optional GridPlanner
+            cached: Optional (lat, lon) → True if the request would be served from cache
+
+        Returns:
+            Dictionary with 'selected' (facilities to fetch), 'deferred'
+            (facility_ids left for a later run), 'reserved' (calls reserved)
+            and 'refreshing' (facility_ids in the requests quota was reserved for)
+        """
+        state = self.state(facilities['facility_id'])
+        fresh = (state['age_hours'] < self.min_interval_hours).to_numpy()
+
+        if planner is not None:
+            cells, unit = planner.plan(facilities)
+            unit_lat, unit_lon = cells['latitude'].to_numpy(), cells['longitude'].to_numpy()
+        else:
+            unit = np.arange(len(facilities))
+            if cached is not None:
+                unit_lat, unit_lon = facilities['latitude'].to_numpy(), facilities['longitude'].to_numpy()
+
+        # Facilities without coordinates (unit -1) are never requested
+        units = pd.DataFrame({
+            'unit': unit,
+            'stale': ~fresh,
+            'high_risk': state['high_risk'].to_numpy(),
+            'score': state['score'].to_numpy()
+        })
+        units = units[units['unit'] >= 0].groupby('unit')[['stale', 'high_risk', 'score']].max()
+
+        if cached is not None:
+            is_cached = np.array([cached(unit_lat[u], unit_lon[u]) for u in units.index], dtype=bool)
+        else:
+            is_cached = np.zeros(len(units), dtype=bool)
+
+        ranked = units[~is_cached].sort_values(['stale', 'high_risk', 'score'], ascending=False)
+        reserved = self.ledger.reserve(len(ranked))
+        refreshing = np.isin(unit, ranked.index[:reserved])
+
+        mask = refreshing | np.isin(unit, units.index[is_cached]) | (unit < 0)
+        return {
+            'selected': facilities[mask],
+            'deferred': facilities.loc[~mask, 'facility_id'].tolist(),
+            'reserved': reserved,
+            'refreshing': facilities.loc[refreshing, 'facility_id'].tolist()
+        }
+
+    def complete(self, refresh: Dict, weather_data: List[Dict], calls: int):
+        """
+        Settle a plan() reservation and record the refreshes it paid for
+
+        Facilities served from cache keep their last_refresh, so it always
+        reflects when their forecast was last fetched from the API.
+
+        Args:
+            refresh: Result of plan()
+            weather_data: Rows the fetch returned (with facility_id)
+            calls: API calls the fetch actually made
+        """
+        self.ledger.settle(refresh['reserved'], calls)
+        refreshing = set(refresh['refreshing'])
+        self.mark_refreshed([row['facility_id'] for row in weather_data if row['facility_id'] in refreshing])
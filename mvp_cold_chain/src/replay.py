@@ -0,0 +1,137 @@
+"""
+Record / Replay Module
+Save raw API payloads to compressed files and serve them back offline
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+# Query parameters that must never be written to disk or affect the key
+SECRET_PARAMS = {'appid', 'api_key', 'key', 'token'}
+
+
+def request_key(url: str, params: Optional[Dict] = None) -> str:
+    """
+    Stable key for a GET request (path + sorted params, secrets removed)
+
+    Args:
+        url: Request URL
+        params: Query parameters
+
+    Returns:
+        Hex digest identifying the request
+    """
+    path = urlsplit(url).path
+    clean = sorted((k, str(v)) for k, v in (params or {}).items() if k not in SECRET_PARAMS)
+    return hashlib.sha1(json.dumps([path, clean]).encode('utf-8')).hexdigest()
+
+
+def recording_path(record_dir: str, url: str, params: Optional[Dict] = None) -> str:
+    """File a request is recorded to: <record_dir>/<endpoint>/<key>.json.gz"""
+    endpoint = urlsplit(url).path.strip('/').replace('/', '_') or 'root'
+    return os.path.join(record_dir, endpoint, f"{request_key(url, params)}.json.gz")
+
+
+class RecordingTransport:
+    """
+    Transport wrapper that saves every successful JSON response
+
+    Wraps an HttpTransport; files are gzip-compressed JSON containing the
+    request path, params (secrets stripped) and payload.
+    """
+
+    def __init__(self, inner, record_dir: str):
+        """
+        Initialize recorder
+
+        Args:
+            inner: Transport that performs the real requests
+            record_dir: Directory to write recordings to
+        """
+        self.inner = inner
+        self.record_dir = record_dir
+        self.recorded = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: Optional[Dict] = None, timeout: float = 10,
+            before_request: Optional[Callable[[], None]] = None) -> requests.Response:
+        response = self.inner.get(url, params=params, timeout=timeout, before_request=before_request)
+
+        path = recording_path(self.record_dir, url, params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        record = {
+            'path': urlsplit(url).path,
+            'params': {k: v for k, v in (params or {}).items() if k not in SECRET_PARAMS},
+            'payload': response.json()
+        }
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            json.dump(record, f)
+
+        with self._lock:
+            self.recorded += 1
+
+        return response
+
+    def metrics(self) -> Dict[str, Dict]:
+        return self.inner.metrics()
+
+    def print_metrics(self):
+        self.inner.print_metrics()
+        print(f"  Recorded {self.recorded} responses to {self.record_dir}")
+
+
+class ReplayTransport:
+    """
+    Offline transport that serves recorded payloads
+
+    A request without a recording raises ConnectionError (as if the
+    network were down), so callers exercise their normal failure path.
+    """
+
+    def __init__(self, record_dir: str):
+        """
+        Initialize replay
+
+        Args:
+            record_dir: Directory written by RecordingTransport
+        """
+        self.record_dir = record_dir
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: Optional[Dict] = None, timeout: float = 10,
+            before_request: Optional[Callable[[], None]] = None) -> requests.Response:
+        path = recording_path(self.record_dir, url, params)
+
+        if not os.path.exists(path):
+            with self._lock:
+                self.misses += 1
+            clean = {k: v for k, v in (params or {}).items() if k not in SECRET_PARAMS}
+            raise requests.exceptions.ConnectionError(f"No recording for {urlsplit(url).path} {clean}")
+
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            record = json.load(f)
+
+        with self._lock:
+            self.hits += 1
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers['Content-Type'] = 'application/json'
+        response._content = json.dumps(record['payload']).encode('utf-8')
+        return response
+
+    def metrics(self) -> Dict[str, Dict]:
+        return {'replay': {'hits': self.hits, 'misses': self.misses}}
+
+    def print_metrics(self):
+        print(f"  Replay ({self.record_dir}): {self.hits} served, {self.misses} missing")
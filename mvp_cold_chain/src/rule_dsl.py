@@ -0,0 +1,330 @@
+"""
+Rule DSL Module
+Declarative cold-chain failure rules and risk tiers (YAML / JSON) compiled to vectorized NumPy evaluators
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from config_loader import load_config_file
+from run_length import rolling_mean
+
+DEFAULT_RULES_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'cold_chain_rules.yaml'
+)
+
+OPERATORS = {
+    '<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal,
+    '==': np.equal, '!=': np.not_equal
+}
+
+# Trailing-window aggregates over the day axis (first window-1 days are NaN)
+AGGREGATES = {
+    'mean': rolling_mean,
+    'max': lambda values, window: _rolling(values, window, np.max),
+    'min': lambda values, window: _rolling(values, window, np.min),
+    'sum': lambda values, window: _rolling(values, window, np.sum)
+}
+
+# "temp_max > 33", "mean(clouds, 3) > 65", "power_source != Solar"
+_SHORTHAND = re.compile(
+    r'^\s*(?:(?P<agg>\w+)\(\s*(?P<rolled>\w+)\s*,\s*(?P<window>\d+)\s*\)|(?P<field>\w+))'
+    r'\s*(?P<op><=|>=|==|!=|<|>)\s*(?P<value>[^<>=!\s].*?)\s*$'
+)
+
+# Compiled rule sets by content hash
+_COMPILED: Dict[str, 'RuleSet'] = {}
+
+Condition = Callable[['RuleContext'], np.ndarray]
+
+
+def _rolling(values: np.ndarray, window: int, func) -> np.ndarray:
+    out = np.full(values.shape, np.nan)
+    if window <= values.shape[1]:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=1)
+        out[:, window - 1:] = func(windows, axis=-1)
+    return out
+
+
+def _parse_value(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text.strip('\'"')
+
+
+class RuleContext:
+    """
+    Columns of one frame as rule inputs
+
+    A field with <field>_day1..N columns is a (N, days) matrix; any other
+    column is a (N, 1) facility column that broadcasts across days. Values
+    and rolling aggregates are built once per evaluation and shared by
+    every rule that uses them.
+    """
+
+    def __init__(self, df: pd.DataFrame, days: int):
+        self.df = df
+        self.days = days
+        self._memo: Dict = {}
+
+    def _daily_columns(self, field: str) -> Optional[List[str]]:
+        columns = [f'{field}_day{day}' for day in range(1, self.days + 1)]
+        return columns if all(c in self.df.columns for c in columns) else None
+
+    def values(self, field: str, default=None) -> np.ndarray:
+        key = ('values', field)
+        if key not in self._memo:
+            daily = self._daily_columns(field)
+            if daily:
+                self._memo[key] = self.df[daily].to_numpy(dtype=float)
+            elif field in self.df.columns:
+                self._memo[key] = self.df[field].to_numpy(dtype=float)[:, None]
+            elif default is not None:
+                self._memo[key] = np.full((len(self.df), 1), float(default))
+            else:
+                raise KeyError(f"Rule field '{field}' is not a column (or {field}_dayN columns)")
+        return self._memo[key]
+
+    def rolled(self, field: str, agg: str, window: int) -> np.ndarray:
+        key = ('rolled', field, agg, window)
+        if key not in self._memo:
+            if not self._daily_columns(field):
+                raise KeyError(f"Rolling {agg} needs daily columns {field}_day1..{self.days}")
+            self._memo[key] = AGGREGATES[agg](self.values(field), window)
+        return self._memo[key]
+
+    def isin(self, field: str, options: List[str], default=None) -> np.ndarray:
+        key = ('isin', field, tuple(options))
+        if key not in self._memo:
+            if field in self.df.columns:
+                labels = self.df[field]
+            else:
+                labels = pd.Series(default, index=self.df.index, dtype=object)
+            self._memo[key] = labels.isin(options).to_numpy()[:, None]
+        return self._memo[key]
+
+
+def _compile_comparison(node: Dict) -> Condition:
+    field, op, value = node['field'], node['op'], node['value']
+    default = node.get('default')
+
+    # Text comparisons (power_source, facility_type, ...): missing values
+    # never equal anything, so != / not_in are true for them
+    if isinstance(value, str) or (isinstance(value, list) and all(isinstance(v, str) for v in value)):
+        options = [value] if isinstance(value, str) else value
+        if op in ('==', 'in'):
+            return lambda ctx: ctx.isin(field, options, default)
+        if op in ('!=', 'not_in'):
+            return lambda ctx: ~ctx.isin(field, options, default)
+        raise ValueError(f"Operator '{op}' not supported for text values ({field})")
+
+    if op not in OPERATORS:
+        raise ValueError(f"Unknown operator '{op}' ({field})")
+    try:
+        compare, threshold = OPERATORS[op], float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Threshold for '{field}' must be a number, got {value!r}") from None
+
+    rolling = node.get('rolling')
+    if rolling:
+        agg, window = rolling.get('agg', 'mean'), int(rolling['window'])
+        if agg not in AGGREGATES:
+            raise ValueError(f"Unknown rolling aggregate '{agg}' (use one of {sorted(AGGREGATES)})")
+        return lambda ctx: compare(ctx.rolled(field, agg, window), threshold)
+
+    return lambda ctx: compare(ctx.values(field, default), threshold)
+
+
+def compile_condition(node: Union[str, Dict, List]) -> Condition:
+    """
+    Compile a condition tree into a function of a RuleContext
+
+    Args:
+        node: Comparison ({field, op, value[, rolling, default]} or shorthand
+            string "field op value" / "agg(field, window) op value"),
+            {all: [...]}, {any: [...]}, {not: node}, or a list (= all)
+
+    Returns:
+        Function returning a bool array broadcastable to (N, days)
+    """
+    if isinstance(node, str):
+        match = _SHORTHAND.match(node)
+        if not match:
+            raise ValueError(f"Can't parse condition '{node}'")
+        parts = match.groupdict()
+        comparison = {'field': parts['field'] or parts['rolled'], 'op': parts['op'],
+                      'value': _parse_value(parts['value'])}
+        if parts['agg']:
+            comparison['rolling'] = {'agg': parts['agg'], 'window': int(parts['window'])}
+        return _compile_comparison(comparison)
+
+    if isinstance(node, list):
+        node = {'all': node}
+
+    if 'all' in node or 'any' in node:
+        combine = np.logical_and if 'all' in node else np.logical_or
+        children = [compile_condition(child) for child in node.get('all', node.get('any'))]
+        if not children:
+            raise ValueError("Empty all/any condition")
+
+        def evaluate(ctx):
+            result = children[0](ctx)
+            for child in children[1:]:
+                result = combine(result, child(ctx))
+            return result
+        return evaluate
+
+    if 'not' in node:
+        child = compile_condition(node['not'])
+        return lambda ctx: ~child(ctx)
+
+    return _compile_comparison(node)
+
+
+class CompiledRule:
+    """One failure rule: optional power-source filter, day window and condition tree"""
+
+    def __init__(self, spec: Dict):
+        """
+        Compile a rule
+
+        Args:
+            spec: {id, name, [power_source], [days: {from, to}], when}
+        """
+        self.id = spec['id']
+        self.name = spec.get('name', str(self.id))
+        self.day_from = int(spec.get('days', {}).get('from', 1))
+        self.day_to = spec.get('days', {}).get('to')
+
+        try:
+            conditions = [compile_condition(spec['when'])]
+            power = spec.get('power_source')
+            if power is not None:
+                conditions.insert(0, compile_condition({'field': 'power_source', 'op': 'in',
+                                                        'value': [power] if isinstance(power, str) else power}))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Rule {self.id}: {e}") from e
+        self._conditions = conditions
+
+    def day_mask(self, days: int) -> np.ndarray:
+        day = np.arange(1, days + 1)
+        return (day >= self.day_from) & (day <= (self.day_to or days))
+
+    def evaluate(self, ctx: RuleContext) -> np.ndarray:
+        """Bool (N, days) matrix of facility-days on which the rule fires"""
+        result = self.day_mask(ctx.days)
+        for condition in self._conditions:
+            result = result & condition(ctx)
+        return np.broadcast_to(result, (len(ctx.df), ctx.days))
+
+
+class RuleSet:
+    """
+    Compiled failure rules and risk tiers
+
+    version is the content hash of the rule definitions, so it changes
+    exactly when a rule or tier changes (not on comment or formatting edits).
+    Risk tiers must include one starting at 0 failures or below, so every
+    facility gets a tier; counts below every tier (e.g. NaN) get the lowest.
+    """
+
+    def __init__(self, spec: Dict, version: str):
+        """
+        Initialize rule set (use compile_rules or load_rules)
+
+        Args:
+            spec: Parsed rule definitions ({rules: [...], risk_tiers: [...]})
+            version: Content hash of spec
+        """
+        self.spec = spec
+        self.version = version
+        self.rules = [CompiledRule(rule) for rule in spec['rules']]
+
+        ids = [rule.id for rule in self.rules]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Rule ids must be unique")
+
+        tiers = spec.get('risk_tiers') or []
+        try:
+            self.risk_tiers = sorted(tiers, key=lambda t: float(t['min_failures']), reverse=True)
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Every risk tier needs a numeric min_failures") from None
+        if not self.risk_tiers or float(self.risk_tiers[-1]['min_failures']) > 0:
+            raise ValueError("risk_tiers must include a tier with min_failures <= 0")
+
+    @property
+    def names(self) -> Dict:
+        """Rule id → name"""
+        return {rule.id: rule.name for rule in self.rules}
+
+    def risk_tier(self, failure_count) -> Dict:
+        """
+        Tier for one facility's failure count
+
+        Args:
+            failure_count: Number of predicted failure days
+
+        Returns:
+            Tier definition (level, min_failures, css, color); the lowest
+            tier if the count is below all of them (as risk_tiers_for)
+        """
+        return next((t for t in self.risk_tiers if failure_count >= t['min_failures']), self.risk_tiers[-1])
+
+    def risk_tiers_for(self, failure_counts, key: str = 'level') -> np.ndarray:
+        """
+        Tier attribute for every facility at once
+
+        Args:
+            failure_counts: Failure days per facility
+            key: Tier attribute to return (level, css, color)
+
+        Returns:
+            object array, same length as failure_counts
+        """
+        counts = np.asarray(failure_counts, dtype=float)
+        tiers = self.risk_tiers
+        return np.select([counts >= t['min_failures'] for t in tiers[:-1]],
+                         [t[key] for t in tiers[:-1]], tiers[-1][key]).astype(object)
+
+
+def rule_hash(spec: Dict) -> str:
+    """Content hash of parsed rule definitions"""
+    return hashlib.sha1(json.dumps(spec, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:12]
+
+
+def compile_rules(spec: Dict) -> RuleSet:
+    """
+    Compile rule definitions (cached by content hash)
+
+    Args:
+        spec: Parsed rule definitions
+
+    Returns:
+        RuleSet
+    """
+    version = rule_hash(spec)
+    if version not in _COMPILED:
+        _COMPILED[version] = RuleSet(spec, version)
+    return _COMPILED[version]
+
+
+def load_rules(path: Optional[str] = None) -> RuleSet:
+    """
+    Load and compile a YAML or JSON rule file
+
+    Args:
+        path: Rule file (default: FAILURE_RULES_PATH or config/cold_chain_rules.yaml)
+
+    Returns:
+        RuleSet
+    """
+    path = path or os.getenv('FAILURE_RULES_PATH') or DEFAULT_RULES_PATH
+
+    return compile_rules(load_config_file(path))
@@ -0,0 +1,95 @@
+"""
+Run-Length & Rolling Window Module
+Consecutive-run and rolling-mean detection over (facility × day) arrays
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+def _as_2d(values) -> np.ndarray:
+    arr = np.asarray(values)
+    return arr.reshape(1, -1) if arr.ndim == 1 else arr
+
+
+def run_lengths(mask) -> np.ndarray:
+    """
+    Length of the current run of True values ending at each day
+
+    Args:
+        mask: bool array (facility × day)
+
+    Returns:
+        int array (facility × day), 0 where mask is False
+    """
+    mask = _as_2d(mask).astype(bool)
+    idx = np.arange(mask.shape[1])
+    last_break = np.maximum.accumulate(np.where(mask, -1, idx), axis=1)
+    return np.where(mask, idx - last_break, 0)
+
+
+def longest_run(mask) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Longest run of True values per facility
+
+    Args:
+        mask: bool array (facility × day)
+
+    Returns:
+        (lengths, start_days) - start_days is the 0-based first day of the
+        earliest longest run, -1 where there is no run
+    """
+    lengths = run_lengths(mask)
+    if lengths.shape[1] == 0:
+        empty = np.zeros(lengths.shape[0], dtype=np.int64)
+        return empty, empty - 1
+
+    longest = lengths.max(axis=1)
+    end = lengths.argmax(axis=1)
+    start = np.where(longest > 0, end - longest + 1, -1)
+    return longest, start
+
+
+def rolling_mean(values, window: int) -> np.ndarray:
+    """
+    Trailing rolling mean over the day axis
+
+    Args:
+        values: float array (facility × day)
+        window: Window length in days
+
+    Returns:
+        float array (facility × day); the first window-1 days are NaN
+    """
+    values = _as_2d(values).astype(float)
+    n, d = values.shape
+    out = np.full((n, d), np.nan)
+
+    if window <= d:
+        # Window sums in day order (not cumsum differences) so threshold
+        # comparisons match np.mean over the same days exactly
+        windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=1)
+        out[:, window - 1:] = windows.mean(axis=-1)
+
+    return out
+
+
+def detect_runs(values, threshold: float, min_days: int) -> Dict[str, np.ndarray]:
+    """
+    Detect runs of days above a threshold (e.g. heat waves)
+
+    Args:
+        values: float array (facility × day), e.g. temp_max
+        threshold: Value a day must exceed
+        min_days: Minimum consecutive days for a run to count
+
+    Returns:
+        Dictionary with 'indicator' (bool), 'longest' (int) and 'start_day' (int, -1 if none)
+    """
+    longest, start = longest_run(_as_2d(values) > threshold)
+    return {
+        'indicator': longest >= min_days,
+        'longest': longest,
+        'start_day': start
+    }
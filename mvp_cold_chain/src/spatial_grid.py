@@ -0,0 +1,101 @@
+"""
+Spatial Grid Module
+Snap facilities to forecast grid cells so each cell is fetched only once
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class GridPlanner:
+    """
+    Plan weather requests on a regular lat/lon grid
+
+    Forecast models are gridded (GFS/ECMWF ≈ 0.25°), so facilities in the
+    same cell get effectively the same forecast. The planner fetches one
+    forecast per cell (at the cell centre) and fans it back out.
+    """
+
+    def __init__(self, cell_size_deg: float = 0.25):
+        """
+        Initialize planner
+
+        Args:
+            cell_size_deg: Grid cell size in degrees (0.25° ≈ 28 km at the equator)
+        """
+        if cell_size_deg <= 0:
+            raise ValueError("cell_size_deg must be positive")
+
+        self.cell_size_deg = cell_size_deg
+        self.last_report: Dict = {}
+
+    def snap(self, lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Snap coordinates to grid cell indices
+
+        Args:
+            lat: Latitudes
+            lon: Longitudes
+
+        Returns:
+            (row, col) integer cell indices
+        """
+        row = np.floor(np.asarray(lat, dtype=float) / self.cell_size_deg).astype(np.int64)
+        col = np.floor(np.asarray(lon, dtype=float) / self.cell_size_deg).astype(np.int64)
+        return row, col
+
+    def plan(self, facilities: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
+        """
+        Group facilities into grid cells
+
+        Facilities with missing or non-finite coordinates are not snapped
+        (NaN would land in a bogus cell near int64 min) and get cell -1.
+
+        Args:
+            facilities: DataFrame with latitude and longitude columns
+
+        Returns:
+            (cells, cell_index) - one row per occupied cell (cell_id, latitude,
+            longitude of the cell centre, n_facilities) and, for every
+            facility, the position of its cell in `cells` (-1 = no valid location)
+        """
+        lat = pd.to_numeric(facilities['latitude'], errors='coerce').to_numpy(dtype=float)
+        lon = pd.to_numeric(facilities['longitude'], errors='coerce').to_numpy(dtype=float)
+        valid = np.isfinite(lat) & np.isfinite(lon)
+        row, col = self.snap(lat[valid], lon[valid])
+
+        keys = np.stack([row, col], axis=1)
+        unique_keys, valid_index, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+        cell_index = np.full(len(facilities), -1, dtype=np.int64)
+        cell_index[valid] = valid_index.reshape(-1)
+
+        cells = pd.DataFrame({
+            'cell_id': [f"G{r}_{c}" for r, c in unique_keys],
+            'latitude': (unique_keys[:, 0] + 0.5) * self.cell_size_deg,
+            'longitude': (unique_keys[:, 1] + 0.5) * self.cell_size_deg,
+            'n_facilities': counts
+        })
+
+        located = int(valid.sum())
+        self.last_report = {
+            'facilities': len(facilities),
+            'cells': len(cells),
+            'invalid': len(facilities) - located,
+            'calls_saved': located - len(cells),
+            'reduction': 1 - len(cells) / located if located else 0.0
+        }
+
+        return cells, cell_index
+
+    def print_report(self):
+        """Print API calls saved by the last plan"""
+        r = self.last_report
+        if not r:
+            return
+
+        print(f"  Grid ({self.cell_size_deg}°): {r['facilities']} facilities → {r['cells']} cells "
+              f"({r['calls_saved']} API calls saved, {r['reduction']*100:.0f}% fewer)")
+        if r['invalid']:
+            print(f"  ⚠️  {r['invalid']} facilities without valid coordinates skipped")
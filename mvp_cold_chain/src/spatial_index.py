@@ -0,0 +1,151 @@
+"""
+Spatial Index Module
+KD-tree over facility locations for radius / nearest-neighbour queries and near-duplicate merging
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_M = 6_371_008.8
+
+
+def to_unit_xyz(lat, lon) -> np.ndarray:
+    """
+    Project coordinates onto the unit sphere
+
+    Straight-line (chord) distance between projected points is a monotonic
+    function of great-circle distance, so a Euclidean KD-tree answers
+    metre-based queries exactly, with no distortion near the poles or the
+    antimeridian.
+
+    Args:
+        lat: Latitudes (degrees)
+        lon: Longitudes (degrees)
+
+    Returns:
+        (n, 3) array
+    """
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def metres_to_chord(metres):
+    return 2 * np.sin(np.asarray(metres, dtype=float) / (2 * EARTH_RADIUS_M))
+
+
+def chord_to_metres(chord):
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.clip(np.asarray(chord, dtype=float) / 2, 0, 1))
+
+
+class FacilityIndex:
+    """
+    KD-tree over facility coordinates
+
+    Build is O(n log n); radius and k-nearest queries are O(log n) per
+    point. Results refer to row positions in the frame the index was
+    built from.
+    """
+
+    def __init__(self, facilities: pd.DataFrame):
+        """
+        Build index
+
+        Args:
+            facilities: DataFrame with latitude and longitude columns (no missing values)
+        """
+        self.facilities = facilities
+        self.points = to_unit_xyz(facilities['latitude'].to_numpy(), facilities['longitude'].to_numpy())
+        self.tree = cKDTree(self.points)
+
+    def query_radius(self, lat, lon, radius_m: float) -> List[np.ndarray]:
+        """
+        Facilities within radius_m of each query point
+
+        Args:
+            lat: Query latitude(s)
+            lon: Query longitude(s)
+            radius_m: Search radius in metres
+
+        Returns:
+            For each query point, the sorted row positions within the radius
+        """
+        hits = self.tree.query_ball_point(to_unit_xyz(np.atleast_1d(lat), np.atleast_1d(lon)),
+                                          r=float(metres_to_chord(radius_m)))
+        return [np.sort(np.asarray(h, dtype=np.int64)) for h in hits]
+
+    def query_knn(self, lat, lon, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k nearest facilities to each query point
+
+        Args:
+            lat: Query latitude(s)
+            lon: Query longitude(s)
+            k: Number of neighbours
+
+        Returns:
+            (distances_m, positions), each shaped (n_queries, k)
+        """
+        k = min(k, len(self.points))
+        chord, positions = self.tree.query(to_unit_xyz(np.atleast_1d(lat), np.atleast_1d(lon)), k=k)
+        return chord_to_metres(chord).reshape(-1, k), np.asarray(positions).reshape(-1, k)
+
+    def cluster(self, radius_m: float) -> np.ndarray:
+        """
+        Group facilities connected by links shorter than radius_m
+
+        Single linkage: chains of close points form one cluster, so two
+        members can be further apart than radius_m.
+
+        Args:
+            radius_m: Link distance in metres (0 = identical coordinates only)
+
+        Returns:
+            Cluster label per row (0..n_clusters-1)
+        """
+        n = len(self.points)
+        pairs = self.tree.query_pairs(r=float(metres_to_chord(radius_m)), output_type='ndarray')
+        graph = coo_matrix((np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+        return labels
+
+
+def deduplicate_facilities(facilities: pd.DataFrame, radius_m: float = 50.0,
+                           score_col: str = 'completeness') -> pd.DataFrame:
+    """
+    Collapse near-duplicate facilities to one row each
+
+    Facilities within radius_m of each other (see FacilityIndex.cluster)
+    are treated as the same site; the row with the highest score_col is
+    kept (first row on ties or if the column is missing).
+
+    Args:
+        facilities: DataFrame with latitude and longitude (no missing values)
+        radius_m: Duplicate distance in metres
+        score_col: Column ranking which duplicate to keep
+
+    Returns:
+        Deduplicated DataFrame in original row order
+    """
+    if facilities.empty:
+        return facilities.copy()
+
+    labels = FacilityIndex(facilities).cluster(radius_m)
+
+    if score_col in facilities.columns:
+        score = pd.to_numeric(facilities[score_col], errors='coerce').fillna(-np.inf).to_numpy()
+    else:
+        score = np.zeros(len(facilities))
+
+    # Best score first, then original position; keep the first row per cluster
+    order = np.lexsort((np.arange(len(facilities)), -score, labels))
+    first = np.r_[True, labels[order][1:] != labels[order][:-1]]
+    keep = np.sort(order[first])
+
+    return facilities.iloc[keep].copy()
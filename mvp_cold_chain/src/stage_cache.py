@@ -0,0 +1,259 @@
+"""
+Stage Cache Module
+Content-addressed cache of pipeline stage outputs and a small DAG runner of memoized stages
+"""
+
+import functools
+import glob
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from profiling import StageProfiler, row_count
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'cache', 'stages'
+)
+
+
+def content_hash(value) -> str:
+    """
+    Hash of a stage output (frames, arrays, dicts, lists, scalars)
+
+    Frames hash their columns, dtypes and every value, so equal content
+    gives an equal hash regardless of where it came from.
+    """
+    digest = hashlib.sha1()
+
+    def update(v):
+        if isinstance(v, pd.DataFrame):
+            digest.update(json.dumps([list(map(str, v.columns)), list(map(str, v.dtypes))]).encode('utf-8'))
+            digest.update(pd.util.hash_pandas_object(v, index=True).to_numpy().tobytes())
+        elif isinstance(v, pd.Series):
+            update(v.to_frame())
+        elif isinstance(v, np.ndarray):
+            digest.update(str(v.dtype).encode('utf-8'))
+            digest.update(np.ascontiguousarray(v).tobytes())
+        elif isinstance(v, dict):
+            for k in sorted(v, key=str):
+                digest.update(repr(k).encode('utf-8'))
+                update(v[k])
+        elif isinstance(v, (list, tuple)):
+            digest.update(f'[{len(v)}'.encode('utf-8'))
+            for item in v:
+                update(item)
+        else:
+            digest.update(repr(v).encode('utf-8'))
+
+    update(value)
+    return digest.hexdigest()
+
+
+def code_version(*objects) -> str:
+    """
+    Hash of the source code of functions, classes or modules
+
+    Args:
+        objects: Anything inspect.getsource accepts, partials of it, or plain strings
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha1(pd.__version__.encode('utf-8'))
+    for obj in objects:
+        if isinstance(obj, functools.partial):
+            obj = obj.func
+        digest.update((obj if isinstance(obj, str) else inspect.getsource(obj)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class StageCache:
+    """
+    On-disk store of stage outputs keyed by input hash
+
+        <root>/<stage>/<key>.pkl
+
+    Entries are pickled with their content hash, so a hit doesn't rehash
+    the output. Writes are atomic; only the newest `keep` entries per
+    stage are kept.
+    """
+
+    def __init__(self, root: Optional[str] = None, keep: Optional[int] = None):
+        """
+        Initialize cache
+
+        Args:
+            root: Cache directory (default: STAGE_CACHE_DIR or data/cache/stages)
+            keep: Entries kept per stage (default: STAGE_CACHE_KEEP or 5)
+        """
+        self.root = os.path.abspath(root or os.getenv('STAGE_CACHE_DIR') or DEFAULT_CACHE_DIR)
+        self.keep = keep or int(os.getenv('STAGE_CACHE_KEEP', 5))
+
+    def _path(self, stage: str, key: str) -> str:
+        return os.path.join(self.root, stage, f'{key}.pkl')
+
+    def get(self, stage: str, key: str) -> Optional[Dict]:
+        """Cached entry {value, hash, seconds, created} or None"""
+        path = self._path(stage, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None  # unreadable entry: recompute
+        os.utime(path)
+        return entry
+
+    def put(self, stage: str, key: str, value, value_hash: str, seconds: float):
+        """Store a stage output"""
+        path = self._path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump({'value': value, 'hash': value_hash, 'seconds': seconds, 'created': time.time()},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+
+        entries = sorted(glob.glob(os.path.join(os.path.dirname(path), '*.pkl')), key=os.path.getmtime)
+        for stale in entries[:-self.keep]:
+            os.remove(stale)
+
+
+class Stage:
+    """One named pipeline step"""
+
+    def __init__(self, name: str, func: Callable, inputs: Iterable[str] = (), key: Optional[Dict] = None,
+                 code: Iterable = (), cache: bool = True, cache_if: Optional[Callable] = None,
+                 title: Optional[str] = None, describe: Optional[Callable] = None):
+        """
+        Initialize stage
+
+        Args:
+            name: Stage name (unique)
+            func: Called with the outputs of `inputs`, in order
+            inputs: Upstream stage names
+            key: Extra values the output depends on (file hashes, settings, rule version)
+            code: Functions / modules whose source versions the stage (func is always included)
+            cache: Memoize the output (False for stages with side effects)
+            cache_if: Called with the output; False keeps that run's output out of the
+                cache (e.g. partial results worth retrying)
+            title: Banner text
+            describe: Called with the output after the stage (ran or cached) to print a summary
+        """
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.key = key or {}
+        self.code = code_version(func, *code)
+        self.cache = cache
+        self.cache_if = cache_if
+        self.title = title or name
+        self.describe = describe
+
+
+class StagePipeline:
+    """
+    DAG of memoized stages
+
+    A stage's cache key hashes its name, code version, key values and the
+    content hashes of its inputs. When a stage reruns but produces the
+    same output, everything downstream is still a cache hit; when only a
+    late stage's key changes (e.g. the failure rules), only it and its
+    dependents run.
+    """
+
+    def __init__(self, cache: Optional[StageCache] = None, enabled: bool = True,
+                 profiler: Optional[StageProfiler] = None):
+        """
+        Initialize pipeline
+
+        Args:
+            cache: StageCache (default: StageCache())
+            enabled: Read / write the cache (False = run every stage)
+            profiler: StageProfiler measuring every stage, ran or cached (default: none)
+        """
+        self.cache = cache or StageCache()
+        self.enabled = enabled
+        self.profiler = profiler
+        self.stages: Dict[str, Stage] = {}
+        self.last_report: List[Dict] = []
+
+    def add(self, name: str, func: Callable, **kwargs) -> Stage:
+        """
+        Add a stage (after the stages it depends on); see Stage for arguments
+
+        Returns:
+            Stage
+        """
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage '{name}'")
+        stage = Stage(name, func, **kwargs)
+        missing = [i for i in stage.inputs if i not in self.stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stages {missing}")
+        self.stages[name] = stage
+        return stage
+
+    def stage_key(self, stage: Stage, input_hashes: List[str]) -> str:
+        material = json.dumps([stage.name, stage.code, stage.key, input_hashes], sort_keys=True, default=str)
+        return hashlib.sha1(material.encode('utf-8')).hexdigest()[:20]
+
+    def run(self) -> Dict:
+        """
+        Run (or load) every stage in order
+
+        Returns:
+            Dictionary of stage name → output
+        """
+        outputs, hashes = {}, {}
+        self.last_report = []
+
+        for number, stage in enumerate(self.stages.values(), 1):
+            print("\n" + "="*70)
+            print(f"STEP {number}: {stage.title}")
+            print("="*70)
+
+            inputs = [outputs[i] for i in stage.inputs]
+            measure = self.profiler.stage(stage.name, inputs) if self.profiler else nullcontext()
+
+            with measure as record:
+                key = self.stage_key(stage, [hashes[i] for i in stage.inputs])
+                entry = self.cache.get(stage.name, key) if self.enabled and stage.cache else None
+
+                start = time.time()
+                if entry is not None:
+                    value, value_hash = entry['value'], entry['hash']
+                    print(f"♻️  Cached ({key[:8]}, saved {entry['seconds']:.1f}s)")
+                else:
+                    value = stage.func(*inputs)
+                    value_hash = content_hash(value)
+                    if self.enabled and stage.cache and (stage.cache_if is None or stage.cache_if(value)):
+                        self.cache.put(stage.name, key, value, value_hash, time.time() - start)
+                seconds = time.time() - start
+
+                if record is not None:
+                    record.update(cached=entry is not None, rows_out=row_count(value))
+
+            outputs[stage.name], hashes[stage.name] = value, value_hash
+            self.last_report.append({'stage': stage.name, 'cached': entry is not None,
+                                     'seconds': seconds, 'key': key})
+
+            if stage.describe is not None:
+                stage.describe(value)
+
+        return outputs
+
+    def print_report(self):
+        print("\nStages:")
+        for row in self.last_report:
+            status = 'cached' if row['cached'] else 'ran'
+            print(f"  • {row['stage']:<16} {status:<7} {row['seconds']:6.2f}s")
@@ -0,0 +1,250 @@
+"""
+Streaming Pipeline Module
+Fetch → parse → power features → failure labels in fixed-size chunks, appended to a partitioned Parquet dataset
+"""
+
+import glob
+import hashlib
+import json
+import os
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from feature_engineering import (FAILURE_COLUMNS, add_temporal_features, failure_label_frame,
+                                 power_feature_frame)
+from failure_labels import FailureLabelEngine
+from incremental import current_issuance
+
+DEFAULT_OUTPUT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'processed', 'facilities_dataset'
+)
+
+MANIFEST_FILE = '_stream_manifest.json'
+
+
+def iter_facility_chunks(path: str, chunk_size: int = 1000) -> Iterator[pd.DataFrame]:
+    """
+    Read a facility CSV lazily
+
+    Args:
+        path: Facility CSV
+        chunk_size: Facilities per chunk
+
+    Yields:
+        DataFrame of up to chunk_size facilities
+    """
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        yield chunk.reset_index(drop=True)
+
+
+class StreamingPipeline:
+    """
+    Bounded-memory pipeline over facility chunks
+
+    Each chunk is fetched, featurized and labelled on its own, then written
+    as one Parquet file per forecast_date partition:
+
+        <output_dir>/forecast_date=YYYY-MM-DD/part-00000.parquet
+
+    Only running totals are kept between chunks, so peak memory depends on
+    chunk_size, not on the number of facilities. Files are written
+    atomically, and _stream_manifest.json records which chunks of which
+    run are done. A run is identified by its source (e.g. input file hash
+    and chunk size), the forecast issuance window and the day; a rerun with
+    resume=True and the same identity skips finished chunks, so a crash
+    only loses the chunk in flight. Any other run starts over and replaces
+    today's partition.
+    """
+
+    def __init__(self, fetcher, output_dir: Optional[str] = None, days: int = 5,
+                 planner=None, scheduler=None, labeler: Optional[FailureLabelEngine] = None):
+        """
+        Initialize pipeline
+
+        Args:
+            fetcher: ForecastFetcher
+            output_dir: Parquet dataset root (default: data/processed/facilities_dataset)
+            days: Forecast days per facility
+            planner: Optional GridPlanner (dedup is per chunk)
+            scheduler: Optional RefreshScheduler - reserves quota per chunk and
+                learns priorities from each chunk's labels
+            labeler: FailureLabelEngine (default: rules from load_rules())
+        """
+        self.fetcher = fetcher
+        self.output_dir = os.path.abspath(output_dir or DEFAULT_OUTPUT_DIR)
+        self.days = days
+        self.planner = planner
+        self.scheduler = scheduler
+        self.labeler = labeler or FailureLabelEngine(days=len(FAILURE_COLUMNS))
+        self._schema: Optional[pa.Schema] = None
+
+    def _fetch(self, facilities: pd.DataFrame):
+        if self.scheduler is None:
+            return self.fetcher.fetch(facilities, days=self.days, planner=self.planner)
+
+        cached = getattr(self.fetcher.weather_api, 'has_cached_forecast', None)
+        refresh = self.scheduler.plan(facilities, planner=self.planner, cached=cached)
+        calls_before = self.fetcher.api_calls
+        weather_data, failed = self.fetcher.fetch(refresh['selected'], days=self.days, planner=self.planner,
+                                                  max_calls=refresh['reserved'])
+        self.scheduler.complete(refresh, weather_data, self.fetcher.api_calls - calls_before)
+        return weather_data, failed + refresh['deferred']
+
+    def process_chunk(self, facilities: pd.DataFrame):
+        """
+        Run one chunk through fetch, features and labels
+
+        Args:
+            facilities: Facility rows (facility_id, name, latitude, longitude,
+                facility_type, power_source)
+
+        Returns:
+            (dataset rows, failed facility_ids)
+        """
+        weather_data, failed = self._fetch(facilities)
+        df = pd.DataFrame(weather_data)
+        if df.empty:
+            return df, failed
+
+        add_temporal_features(df)
+        df = pd.concat([df, power_feature_frame(df)], axis=1)
+        df = pd.concat([df, failure_label_frame(df, self.labeler)], axis=1)
+
+        if self.scheduler is not None:
+            self.scheduler.update_priorities(df)
+
+        return df, failed
+
+    def _partition(self, forecast_date) -> str:
+        return os.path.join(self.output_dir, f"forecast_date={forecast_date}")
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.output_dir, MANIFEST_FILE)
+
+    def _load_manifest(self) -> Optional[Dict]:
+        try:
+            with open(self._manifest_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_manifest(self, manifest: Dict):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = self._manifest_path()
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    def _start(self, source: Optional[Dict], resume: bool) -> Dict:
+        """Manifest for this run: the stored one if it can be resumed, else a fresh one"""
+        # Forecasts are dated by fetch day, so a run only ever writes today's partition
+        identity = {'source': source, 'issuance': current_issuance(), 'day': str(date.today()),
+                    'days': self.days, 'rules': self.labeler.rules.version}
+        run_id = hashlib.sha1(json.dumps(identity, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:12]
+
+        manifest = self._load_manifest()
+        # Without a source the input can't be checked, so never resume
+        if resume and source is not None and manifest and manifest.get('run_id') == run_id:
+            return manifest
+
+        # Parts from an earlier or interrupted run today would mix with this one
+        for path in glob.glob(os.path.join(self._partition(date.today()), 'part-*.parquet')):
+            os.remove(path)
+
+        manifest = {'run_id': run_id, 'identity': identity, 'chunks': []}
+        self._save_manifest(manifest)
+        return manifest
+
+    def _to_table(self, df: pd.DataFrame) -> pa.Table:
+        # Text columns as pandas strings so an all-missing chunk keeps a string type
+        text = [c for c in df.columns if df[c].dtype == object]
+        df = df.astype({c: 'string' for c in text})
+
+        if self._schema is None:
+            self._schema = pa.Table.from_pandas(df, preserve_index=False).schema
+        return pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+
+    def write_chunk(self, df: pd.DataFrame, chunk_no: int) -> List[str]:
+        """
+        Append a processed chunk to the dataset
+
+        Args:
+            df: Rows from process_chunk
+            chunk_no: Chunk sequence number (names the part file)
+
+        Returns:
+            Paths written
+        """
+        paths = []
+        name = f"part-{chunk_no:05d}.parquet"
+
+        for forecast_date, part in df.groupby('forecast_date', sort=True):
+            partition = self._partition(forecast_date)
+            os.makedirs(partition, exist_ok=True)
+
+            path = os.path.join(partition, name)
+            tmp_path = path + '.tmp'
+            pq.write_table(self._to_table(part.drop(columns='forecast_date')), tmp_path)
+            os.replace(tmp_path, path)
+            paths.append(path)
+
+        return paths
+
+    def run(self, chunks: Iterable[pd.DataFrame], resume: bool = True,
+            source: Optional[Dict] = None) -> Dict:
+        """
+        Stream every chunk through the pipeline
+
+        Args:
+            chunks: Iterable of facility DataFrames (e.g. iter_facility_chunks)
+            resume: Skip chunks an interrupted run with the same identity already wrote
+            source: What the chunks are, e.g. {'file': file_hash(path), 'chunk_size': n};
+                required for resuming
+
+        Returns:
+            Dictionary of running totals: chunks, skipped_chunks, facilities,
+            rows, failed, facility_days, failures, failures_by_day, rule_hits,
+            rule_seconds, files
+        """
+        summary = {
+            'chunks': 0, 'skipped_chunks': 0, 'facilities': 0, 'rows': 0, 'failed': 0,
+            'facility_days': 0, 'failures': 0, 'failures_by_day': [0] * len(FAILURE_COLUMNS),
+            'rule_hits': {rule: 0 for rule in self.labeler.rules.names},
+            'rule_seconds': {rule: 0.0 for rule in self.labeler.rules.names}, 'files': 0
+        }
+
+        manifest = self._start(source, resume)
+        done = set(manifest['chunks'])
+
+        for chunk_no, facilities in enumerate(chunks):
+            summary['chunks'] += 1
+            summary['facilities'] += len(facilities)
+
+            if chunk_no in done:
+                summary['skipped_chunks'] += 1
+                continue
+
+            print(f"\nChunk {chunk_no}: {len(facilities)} facilities")
+            df, failed = self.process_chunk(facilities)
+            summary['failed'] += len(failed)
+
+            if df.empty:
+                continue
+
+            summary['files'] += len(self.write_chunk(df, chunk_no))
+            manifest['chunks'].append(chunk_no)
+            self._save_manifest(manifest)
+            counts = df[FAILURE_COLUMNS].sum().tolist()
+            summary['rows'] += len(df)
+            summary['facility_days'] += len(df) * len(FAILURE_COLUMNS)
+            summary['failures'] += int(sum(counts))
+            summary['failures_by_day'] = [a + int(b) for a, b in zip(summary['failures_by_day'], counts)]
+            for rule, hits in self.labeler.last_report['rule_hits'].items():
+                summary['rule_hits'][rule] += hits
+                summary['rule_seconds'][rule] += self.labeler.last_report['rule_seconds'][rule]
+
+        return summary
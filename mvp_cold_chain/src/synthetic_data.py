@@ -0,0 +1,329 @@
+"""
+Synthetic Data Module
+Seeded, vectorized facility and 3-hourly forecast generator driven by a region config, streamed to CSV / Parquet
+"""
+
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config_loader import load_config_file
+
+DEFAULT_REGIONS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'sample_regions.yaml'
+)
+
+# Random draws come in fixed blocks of rows, each seeded by (seed, stream,
+# block), so row i gets the same values whatever the chunk size
+BLOCK_SIZE = 10_000
+
+FORECAST_STEPS = 40
+STEP_SECONDS = 3 * 3600
+TIMEZONE_SECONDS = 3 * 3600  # East Africa Time
+
+FACILITY_COLUMNS = ['facility_id', 'name', 'latitude', 'longitude', 'facility_type', 'power_source']
+FORECAST_COLUMNS = ['facility_id', 'dt', 'temp', 'humidity', 'pressure', 'clouds', 'wind_speed', 'weather_main']
+
+
+def load_regions(path: Optional[str] = None) -> Dict:
+    """
+    Load a YAML or JSON region config
+
+    Args:
+        path: Region file (default: SAMPLE_REGIONS_PATH or config/sample_regions.yaml)
+
+    Returns:
+        Dictionary with country and regions
+    """
+    path = path or os.getenv('SAMPLE_REGIONS_PATH') or DEFAULT_REGIONS_PATH
+
+    spec = load_config_file(path)
+    if not spec.get('regions'):
+        raise ValueError(f"No regions defined in {path}")
+    for region in spec['regions']:
+        missing = [k for k in ['code', 'name_template', 'weight', 'center', 'spread_deg',
+                               'facility_type', 'power_source'] if k not in region]
+        if missing:
+            raise ValueError(f"Region {region.get('code', '?')} is missing {missing}")
+        if region['weight'] <= 0:
+            raise ValueError(f"Region {region['code']}: weight must be positive")
+    return spec
+
+
+def apportion(n: int, weights) -> np.ndarray:
+    """
+    Split n into integer counts proportional to weights (largest remainder)
+
+    Args:
+        n: Total
+        weights: Relative weights
+
+    Returns:
+        int64 array summing to n
+    """
+    shares = np.asarray(weights, dtype=float)
+    shares = n * shares / shares.sum()
+    counts = np.floor(shares).astype(np.int64)
+    remainder = n - counts.sum()
+    counts[np.argsort(-(shares - counts), kind='stable')[:remainder]] += 1
+    return counts
+
+
+def _cdf_table(regions: List[Dict], key: str) -> Tuple[np.ndarray, np.ndarray]:
+    # Union of labels (first-seen order) and a per-region cumulative probability row
+    labels = list(dict.fromkeys(str(label) for region in regions for label in region[key]))
+    probs = np.array([[float(region[key].get(label, 0)) for label in labels] for region in regions])
+    if (probs.sum(axis=1) <= 0).any():
+        raise ValueError(f"Every region needs a positive {key} probability")
+    return np.array(labels, dtype=object), np.cumsum(probs / probs.sum(axis=1, keepdims=True), axis=1)
+
+
+def _sample(u: np.ndarray, labels: np.ndarray, cdf: np.ndarray, region: np.ndarray) -> np.ndarray:
+    # Inverse-CDF lookup of one label per row against its region's probabilities
+    idx = (u[:, None] >= cdf[region]).sum(axis=1)
+    return labels[np.minimum(idx, len(labels) - 1)]
+
+
+class SyntheticGenerator:
+    """
+    Synthetic facilities and matching 5-day / 3-hour forecasts
+
+    Facilities are laid out region by region in config order (counts by
+    weight), so row i of an n-facility dataset is fully determined by
+    (seed, n, i): any chunk can be generated on its own, in any order.
+    Forecasts follow the local API stand-in's climate (hotter and drier
+    towards the north) and are written in long form, one row per
+    facility × 3-hour step; payloads_from_steps rebuilds API-shaped
+    payloads from them.
+    """
+
+    def __init__(self, spec: Optional[Dict] = None, seed: Optional[int] = None,
+                 issued_at: Optional[float] = None):
+        """
+        Initialize generator
+
+        Args:
+            spec: Region config (default: load_regions())
+            seed: Random seed (default: SAMPLE_SEED or 42)
+            issued_at: Forecast issuance time (default: now)
+        """
+        spec = spec or load_regions()
+        self.country = spec.get('country', 'KE')
+        self.regions = spec['regions']
+        self.seed = seed if seed is not None else int(os.getenv('SAMPLE_SEED', 42))
+        self.issued_at = int(issued_at or time.time())
+
+        self.codes = [r['code'] for r in self.regions]
+        self.templates = [r['name_template'] for r in self.regions]
+        self.weights = np.array([r['weight'] for r in self.regions], dtype=float)
+        self.centers = np.array([r['center'] for r in self.regions], dtype=float)
+        self.spreads = np.array([r['spread_deg'] for r in self.regions], dtype=float)
+        self.facility_types, self.type_cdf = _cdf_table(self.regions, 'facility_type')
+        self.power_sources, self.power_cdf = _cdf_table(self.regions, 'power_source')
+
+    def layout(self, n: int) -> np.ndarray:
+        """First row of each region (plus n at the end)"""
+        return np.concatenate([[0], np.cumsum(apportion(n, self.weights))])
+
+    def _draws(self, stream: int, start: int, stop: int, width: int, normal: bool = False) -> np.ndarray:
+        parts = []
+        for block in range(start // BLOCK_SIZE, (stop - 1) // BLOCK_SIZE + 1):
+            rng = np.random.default_rng([self.seed, stream, block])
+            values = rng.standard_normal((BLOCK_SIZE, width)) if normal else rng.random((BLOCK_SIZE, width))
+            lo, hi = max(start, block * BLOCK_SIZE), min(stop, (block + 1) * BLOCK_SIZE)
+            parts.append(values[lo - block * BLOCK_SIZE:hi - block * BLOCK_SIZE])
+        return np.concatenate(parts) if parts else np.empty((0, width))
+
+    def facilities(self, n: int, start: int = 0, stop: Optional[int] = None) -> pd.DataFrame:
+        """
+        Rows [start, stop) of an n-facility list
+
+        Args:
+            n: Total facilities in the dataset
+            start: First row
+            stop: End row (default: n)
+
+        Returns:
+            DataFrame with FACILITY_COLUMNS, indexed by row number
+        """
+        stop = n if stop is None else min(stop, n)
+        rows = np.arange(start, stop)
+        offsets = self.layout(n)
+        region = np.searchsorted(offsets, rows, side='right') - 1
+        number = rows - offsets[region]
+        digits = max(3, len(str(max(int(np.diff(offsets).max()) - 1, 0))))
+
+        u = self._draws(0, start, stop, 4)
+        spread = self.spreads[region]
+
+        return pd.DataFrame({
+            'facility_id': [f'{self.country}_{self.codes[r]}_{k:0{digits}d}' for r, k in zip(region, number)],
+            'name': [self.templates[r].format(n=k + 1) for r, k in zip(region, number)],
+            'latitude': self.centers[region, 0] + (2 * u[:, 0] - 1) * spread,
+            'longitude': self.centers[region, 1] + (2 * u[:, 1] - 1) * spread,
+            'facility_type': _sample(u[:, 2], self.facility_types, self.type_cdf, region),
+            'power_source': _sample(u[:, 3], self.power_sources, self.power_cdf, region)
+        }, index=rows)
+
+    def forecasts(self, facilities: pd.DataFrame) -> pd.DataFrame:
+        """
+        3-hourly forecast rows for facilities from facilities()
+
+        Args:
+            facilities: Output of facilities() (its index gives the row numbers)
+
+        Returns:
+            Long DataFrame with FORECAST_COLUMNS, FORECAST_STEPS rows per facility
+        """
+        steps = FORECAST_STEPS
+        start = int(facilities.index[0]) if len(facilities) else 0
+        z = self._draws(1, start, start + len(facilities), 1 + 5 * steps, normal=True)
+        noise = {name: z[:, 1 + i * steps:1 + (i + 1) * steps]
+                 for i, name in enumerate(['temp', 'clouds', 'humidity', 'wind', 'pressure'])}
+        lat = facilities['latitude'].to_numpy()[:, None]
+
+        first = self.issued_at - self.issued_at % STEP_SECONDS + STEP_SECONDS
+        hours = (np.arange(steps) * 3 + 3) % 24
+
+        temp = 27 + 3 * lat + 2 * z[:, :1] + 6 * np.sin((hours - 9) / 24 * 2 * np.pi) + 1.5 * noise['temp']
+        clouds = np.clip(55 - 8 * lat + 25 * noise['clouds'], 0, 100).round()
+
+        return pd.DataFrame({
+            'facility_id': np.repeat(facilities['facility_id'].to_numpy(), steps),
+            'dt': np.tile(first + np.arange(steps, dtype=np.int64) * STEP_SECONDS, len(facilities)),
+            'temp': temp.round(2).ravel(),
+            'humidity': np.clip(65 - 6 * lat + 10 * noise['humidity'], 5, 100).round().astype(np.int64).ravel(),
+            'pressure': (1012 + 3 * noise['pressure']).round().astype(np.int64).ravel(),
+            'clouds': clouds.astype(np.int64).ravel(),
+            'wind_speed': np.abs(4 + 2 * noise['wind']).round(2).ravel(),
+            'weather_main': np.where(clouds > 80, 'Rain', np.where(clouds > 30, 'Clouds', 'Clear')).ravel()
+        })
+
+    def iter_chunks(self, n: int, chunk_size: int = 100_000,
+                    forecasts: bool = False) -> Iterator[Tuple[pd.DataFrame, Optional[pd.DataFrame]]]:
+        """
+        Generate an n-facility dataset chunk by chunk
+
+        Args:
+            n: Total facilities
+            chunk_size: Facilities per chunk
+            forecasts: Also generate forecast rows
+
+        Yields:
+            (facilities, forecast rows or None)
+        """
+        for start in range(0, n, chunk_size):
+            chunk = self.facilities(n, start, start + chunk_size)
+            yield chunk, self.forecasts(chunk) if forecasts else None
+
+    def write(self, n: int, path: str, forecasts_path: Optional[str] = None,
+              chunk_size: int = 100_000) -> Dict:
+        """
+        Stream an n-facility dataset to disk (.csv or .parquet by extension)
+
+        Files are appended chunk by chunk (CSV rows / Parquet row groups)
+        and moved into place when complete.
+
+        Args:
+            n: Total facilities
+            path: Facility file
+            forecasts_path: Forecast rows file (default: no forecasts)
+            chunk_size: Facilities per chunk
+
+        Returns:
+            Report: facilities, forecast_rows, chunks, seconds, facility_type
+            and power_source counts, latitude / longitude range
+        """
+        start_time = time.time()
+        writers = [_ChunkWriter(path)] + ([_ChunkWriter(forecasts_path)] if forecasts_path else [])
+        report = {'facilities': 0, 'forecast_rows': 0, 'chunks': 0,
+                  'facility_type': pd.Series(dtype=np.int64), 'power_source': pd.Series(dtype=np.int64),
+                  'latitude': [np.inf, -np.inf], 'longitude': [np.inf, -np.inf]}
+
+        for facilities, forecasts in self.iter_chunks(n, chunk_size, forecasts=bool(forecasts_path)):
+            writers[0].write(facilities)
+            if forecasts is not None:
+                writers[1].write(forecasts)
+                report['forecast_rows'] += len(forecasts)
+
+            report['facilities'] += len(facilities)
+            report['chunks'] += 1
+            for col in ['facility_type', 'power_source']:
+                report[col] = report[col].add(facilities[col].value_counts(), fill_value=0).astype(np.int64)
+            for col in ['latitude', 'longitude']:
+                report[col] = [min(report[col][0], facilities[col].min()), max(report[col][1], facilities[col].max())]
+
+        for writer in writers:
+            writer.close()
+
+        report['seconds'] = time.time() - start_time
+        return report
+
+
+class _ChunkWriter:
+    """Append DataFrame chunks to one CSV or Parquet file, moved into place on close"""
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self.tmp = self.path + '.tmp'
+        self.parquet = self.path.lower().endswith('.parquet')
+        self.rows = 0
+        self._writer = None
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    def write(self, df: pd.DataFrame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.tmp, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.tmp, mode='a' if self.rows else 'w', header=not self.rows, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self.rows:
+            os.replace(self.tmp, self.path)
+
+
+def payloads_from_steps(steps: pd.DataFrame, facilities: Optional[pd.DataFrame] = None) -> Dict[str, Dict]:
+    """
+    Rebuild /data/2.5/forecast payloads from forecast rows
+
+    Args:
+        steps: Forecast rows (FORECAST_COLUMNS), contiguous per facility
+        facilities: Optional facility rows to add city.coord
+
+    Returns:
+        Dictionary of facility_id → payload, in row order
+    """
+    if steps.empty:
+        return {}
+
+    ids = steps['facility_id'].to_numpy()
+    bounds = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1], True])
+    coords = facilities.set_index('facility_id')[['latitude', 'longitude']] if facilities is not None else None
+
+    records = zip(steps['dt'].tolist(), steps['temp'].tolist(), steps['humidity'].tolist(),
+                  steps['pressure'].tolist(), steps['clouds'].tolist(), steps['wind_speed'].tolist(),
+                  steps['weather_main'].tolist())
+    items = [{'dt': dt, 'main': {'temp': temp, 'humidity': humidity, 'pressure': pressure},
+              'clouds': {'all': clouds}, 'wind': {'speed': wind}, 'weather': [{'main': weather}]}
+             for dt, temp, humidity, pressure, clouds, wind, weather in records]
+
+    payloads = {}
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        city = {'timezone': TIMEZONE_SECONDS}
+        if coords is not None:
+            lat, lon = coords.loc[ids[lo]]
+            city['coord'] = {'lat': float(lat), 'lon': float(lon)}
+        payloads[ids[lo]] = {'cod': '200', 'cnt': int(hi - lo), 'list': items[lo:hi], 'city': city}
+    return payloads
@@ -10,6 +10,10 @@ from typing import Dict, List, Optional
 import os
 from dotenv import load_dotenv
 
+from forecast_cache import ForecastCache
+from http_transport import HttpTransport, get_default_transport
+from run_length import detect_runs
+
 # Load environment variables
 load_dotenv()
 
@@ -22,12 +26,16 @@ class WeatherAPI:
     - 7-day forecast available
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[ForecastCache] = None,
+                 use_cache: bool = True, transport: Optional[HttpTransport] = None):
         """
         Initialize Weather API client
 
         Args:
             api_key: OpenWeatherMap API key (or set OPENWEATHER_API_KEY in .env)
+            cache: Forecast cache to use (default: shared on-disk cache)
+            use_cache: Set False to always call the API
+            transport: HTTP transport (default: shared pooled transport)
         """
         self.api_key = api_key or os.getenv('OPENWEATHER_API_KEY')
 
@@ -37,7 +45,11 @@ class WeatherAPI:
                 "Set OPENWEATHER_API_KEY in .env file or pass as argument."
             )
 
-        self.base_url = "https://api.openweathermap.org/data/2.5"
+        self.cache = (cache or ForecastCache()) if use_cache else None
+        self.transport = transport or get_default_transport()
+
+        api_root = os.getenv('OPENWEATHER_API_ROOT', 'https://api.openweathermap.org')
+        self.base_url = f"{api_root}/data/2.5"
 
     def get_7day_forecast(self, lat: float, lon: float) -> Dict:
         """
@@ -61,10 +73,19 @@ class WeatherAPI:
             'exclude': 'minutely,hourly,alerts'  # Only need daily forecast
         }
 
+        if self.cache:
+            cached = self.cache.get('onecall', lat, lon)
+            if cached is not None:
+                return cached
+
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            response = self.transport.get(url, params=params, timeout=10)
+            data = response.json()
+
+            if self.cache:
+                self.cache.put('onecall', lat, lon, data)
+
+            return data
 
         except requests.exceptions.RequestException as e:
             print(f"Error fetching weather for ({lat}, {lon}): {e}")
@@ -160,20 +181,7 @@ class WeatherAPI:
         Returns:
             True if heat wave detected
         """
-        high_temps = (df['temp_max'] > threshold).astype(int)
-
-        # Find consecutive sequences
-        consecutive = 0
-        max_consecutive = 0
-
-        for is_high in high_temps:
-            if is_high:
-                consecutive += 1
-                max_consecutive = max(max_consecutive, consecutive)
-            else:
-                consecutive = 0
-
-        return max_consecutive >= days
+        return bool(detect_runs(df['temp_max'].to_numpy(), threshold, days)['indicator'][0])
 
     def batch_forecast(self, locations: List[Dict]) -> pd.DataFrame:
         """
@@ -5,11 +5,16 @@ Uses 5-day/3-hour forecast (free) instead of One Call API
 
 import requests
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
 import os
 from dotenv import load_dotenv
 
+from forecast_cache import ForecastCache
+from forecast_parser import BatchForecastParser
+from http_transport import HttpTransport, get_default_transport
+from run_length import detect_runs
+
 # Load environment variables
 load_dotenv()
 
@@ -20,12 +25,16 @@ class WeatherAPI:
     Uses 5 Day / 3 Hour Forecast API (completely free, no payment needed)
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[ForecastCache] = None,
+                 use_cache: bool = True, transport: Optional[HttpTransport] = None):
         """
         Initialize Weather API client
 
         Args:
             api_key: OpenWeatherMap API key (or set OPENWEATHER_API_KEY in .env)
+            cache: Forecast cache to use (default: shared on-disk cache)
+            use_cache: Set False to always call the API
+            transport: HTTP transport (default: shared pooled transport)
         """
         self.api_key = api_key or os.getenv('OPENWEATHER_API_KEY')
 
@@ -35,16 +44,23 @@ class WeatherAPI:
                 "Set OPENWEATHER_API_KEY in .env file or pass as argument."
             )
 
+        self.cache = (cache or ForecastCache()) if use_cache else None
+        self.transport = transport or get_default_transport()
+        self.parser = BatchForecastParser()
+
         # Use free tier forecast endpoint
-        self.base_url = "https://api.openweathermap.org/data/2.5/forecast"
+        api_root = os.getenv('OPENWEATHER_API_ROOT', 'https://api.openweathermap.org')
+        self.base_url = f"{api_root}/data/2.5/forecast"
 
-    def get_5day_forecast(self, lat: float, lon: float) -> Dict:
+    def get_5day_forecast(self, lat: float, lon: float,
+                          before_request: Optional[Callable[[], None]] = None) -> Dict:
         """
         Fetch 5-day / 3-hour weather forecast for a location (FREE TIER)
 
         Args:
             lat: Latitude
             lon: Longitude
+            before_request: Passed to the transport; called before every request sent
 
         Returns:
             Dictionary with forecast data
@@ -57,15 +73,38 @@ class WeatherAPI:
             'cnt': 40  # 5 days × 8 forecasts per day = 40 data points
         }
 
+        if self.cache:
+            cached = self.cache.get('forecast', lat, lon)
+            if cached is not None:
+                return cached
+
         try:
-            response = requests.get(self.base_url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            response = self.transport.get(self.base_url, params=params, timeout=10,
+                                          before_request=before_request)
+            data = response.json()
+
+            if self.cache:
+                self.cache.put('forecast', lat, lon, data)
+
+            return data
 
         except requests.exceptions.RequestException as e:
             print(f"Error fetching weather for ({lat}, {lon}): {e}")
             return None
 
+    def has_cached_forecast(self, lat: float, lon: float) -> bool:
+        """
+        Check whether get_5day_forecast would be served from cache
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+
+        Returns:
+            True if no API call is needed
+        """
+        return bool(self.cache) and self.cache.contains('forecast', lat, lon)
+
     def parse_forecast_to_daily(self, forecast_data: Dict) -> pd.DataFrame:
         """
         Parse 3-hour forecast into daily summaries
@@ -79,46 +118,23 @@ class WeatherAPI:
         if not forecast_data or 'list' not in forecast_data:
             return pd.DataFrame()
 
-        # Group 3-hour forecasts by day
-        daily_data = {}
-
-        for item in forecast_data['list']:
-            dt = datetime.fromtimestamp(item['dt'])
-            date = dt.date()
-
-            if date not in daily_data:
-                daily_data[date] = {
-                    'temps': [],
-                    'clouds': [],
-                    'humidity': [],
-                    'wind_speed': [],
-                    'weather_main': [],
-                    'pressure': []
-                }
-
-            daily_data[date]['temps'].append(item['main']['temp'])
-            daily_data[date]['clouds'].append(item['clouds']['all'])
-            daily_data[date]['humidity'].append(item['main']['humidity'])
-            daily_data[date]['wind_speed'].append(item['wind']['speed'])
-            daily_data[date]['weather_main'].append(item['weather'][0]['main'])
-            daily_data[date]['pressure'].append(item['main']['pressure'])
-
-        # Convert to daily summaries
-        daily_summaries = []
-        for date, data in sorted(daily_data.items())[:5]:  # Max 5 days
-            daily_summaries.append({
-                'date': date,
-                'temp_min': min(data['temps']),
-                'temp_max': max(data['temps']),
-                'temp_day': sum(data['temps']) / len(data['temps']),
-                'clouds': sum(data['clouds']) / len(data['clouds']),
-                'humidity': sum(data['humidity']) / len(data['humidity']),
-                'wind_speed': sum(data['wind_speed']) / len(data['wind_speed']),
-                'pressure': sum(data['pressure']) / len(data['pressure']),
-                'weather_main': max(set(data['weather_main']), key=data['weather_main'].count)
-            })
-
-        return pd.DataFrame(daily_summaries)
+        # Days are bucketed in the location's own timezone (city.timezone)
+        batch = self.parser.stack([forecast_data])
+        daily = self.parser.daily(batch, days=5, pad=False)
+
+        if not daily['has_data'][0]:
+            return pd.DataFrame()
+
+        n_days = int((daily['local_day'][0] >= 0).sum())
+        df = pd.DataFrame({
+            'date': [datetime.fromtimestamp(day * 86400, tz=timezone.utc).date()
+                     for day in daily['local_day'][0, :n_days]],
+            **{name: daily[name][0, :n_days] for name in
+               ['temp_min', 'temp_max', 'temp_day', 'clouds', 'humidity', 'wind_speed', 'pressure']},
+            'weather_main': [batch.weather_labels[c] for c in daily['weather_main'][0, :n_days]]
+        })
+
+        return df
 
     def get_forecast_features(self, lat: float, lon: float, days: int = 5) -> Dict:
         """
@@ -137,47 +153,13 @@ class WeatherAPI:
         if not forecast_data:
             return None
 
-        df = self.parse_forecast_to_daily(forecast_data)
+        # Same vectorized path used for batches (BatchForecastParser)
+        df = self.parser.features([forecast_data], days=days)
 
         if df.empty:
             return None
 
-        # Ensure we have exactly 'days' rows (pad with last day if needed)
-        while len(df) < days:
-            last_row = df.iloc[-1].copy()
-            last_row['date'] = last_row['date'] + timedelta(days=1)
-            df = pd.concat([df, pd.DataFrame([last_row])], ignore_index=True)
-
-        df = df.head(days)
-
-        # Calculate features
-        features = {
-            'forecast_date': datetime.now().date(),
-            'num_days': len(df),
-
-            # Aggregate features
-            'max_temp_7d': df['temp_max'].max(),
-            'min_temp_7d': df['temp_min'].min(),
-            'avg_temp_7d': df['temp_day'].mean(),
-            'temp_above_35_days': (df['temp_max'] > 35).sum(),
-            'temp_above_38_days': (df['temp_max'] > 38).sum(),
-            'avg_cloud_cover_7d': df['clouds'].mean(),
-            'cloudy_days': (df['clouds'] > 60).sum(),
-            'avg_humidity_7d': df['humidity'].mean(),
-            'heat_wave_indicator': self._detect_heat_wave(df)
-        }
-
-        # Add daily features (for temporal model)
-        for i, row in df.iterrows():
-            day_num = i + 1
-            features[f'temp_max_day{day_num}'] = row['temp_max']
-            features[f'temp_min_day{day_num}'] = row['temp_min']
-            features[f'temp_day{day_num}'] = row['temp_day']
-            features[f'clouds_day{day_num}'] = row['clouds']
-            features[f'humidity_day{day_num}'] = row['humidity']
-            features[f'wind_speed_day{day_num}'] = row['wind_speed']
-
-        return features
+        return df.iloc[0].to_dict()
 
     def _detect_heat_wave(self, df: pd.DataFrame, threshold: float = 35.0, days: int = 3) -> bool:
         """
@@ -193,19 +175,7 @@ class WeatherAPI:
         Returns:
             True if heat wave detected
         """
-        high_temps = (df['temp_max'] > threshold).astype(int)
-
-        consecutive = 0
-        max_consecutive = 0
-
-        for is_high in high_temps:
-            if is_high:
-                consecutive += 1
-                max_consecutive = max(max_consecutive, consecutive)
-            else:
-                consecutive = 0
-
-        return max_consecutive >= days
+        return bool(detect_runs(df['temp_max'].to_numpy(), threshold, days)['indicator'][0])
 
 
 # Example usage